@@ -0,0 +1,198 @@
+#   author: Lubomir Jagos
+#
+#   Command line generator of openEMS simulation scripts, generates same files as "Generate script" button in GUI
+#   from FreeCAD document and settings .ini file saved by GUI.
+#
+#   Example:
+#       python ExportOpenEMSCli.py --freecad-lib /usr/lib/freecad/lib --type python antenna.FCStd antenna_settings.ini
+#       python ExportOpenEMSCli.py --jobs 4 design1.FCStd design1.ini design2.FCStd design2.ini
+#
+#   If there are more designs with --jobs > 1 each design is generated in its own process, FreeCAD can have just one active
+#   document so designs are not generated in threads.
+#
+#   Parametric sweep, each variant is generated into <output dir>/variant_NNN, see ParametricSweep for sweep file format:
+#       python ExportOpenEMSCli.py --sweep substrate_sweep.json --jobs 4 antenna.FCStd antenna_settings.ini
+#
+#   Variant 0 is generated first and exports STL files, remaining variants link them and are generated in parallel processes.
+#
+#   Generation is windowless, not Qt-free: generators read settings from dialog widgets, so FreeCAD python modules and PySide
+#   with QtWidgets and QtUiTools are required, settings are loaded into hidden dialog form which is created offscreen, so Qt widgets
+#   libraries are needed also on build server without display.
+#
+import argparse
+import concurrent.futures
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REQUIREMENTS_HELP = """requirements:
+  FreeCAD python modules (use --freecad-lib if FreeCAD is not importable) and PySide with QtWidgets and QtUiTools,
+  as shipped with FreeCAD. No window is shown, but settings are loaded into hidden dialog form created from ui/dialog.ui
+  on Qt offscreen platform (QT_QPA_PLATFORM=offscreen is set when it's not defined), so Qt widgets libraries and the
+  offscreen platform plugin are needed also on build server without display."""
+
+def importHeadlessModules(args):
+    """
+    Import FreeCAD and headless simulation model, exit with message describing requirements if some of them is missing.
+    :return: FreeCAD module, HeadlessSimulationModel class
+    """
+    if args.freecad_lib is not None and not args.freecad_lib in sys.path:
+        sys.path.append(args.freecad_lib)
+    sys.path.insert(0, APP_DIR)
+
+    try:
+        import FreeCAD
+    except ImportError as e:
+        sys.exit(f"ERROR: cannot import FreeCAD ({e}), set FreeCAD lib directory by --freecad-lib.\n{REQUIREMENTS_HELP}")
+
+    try:
+        from utilsOpenEMS.Headless.HeadlessSimulationModel import HeadlessSimulationModel
+    except ImportError as e:
+        sys.exit(f"ERROR: cannot import Qt modules needed by headless generator ({e}).\n{REQUIREMENTS_HELP}")
+
+    return FreeCAD, HeadlessSimulationModel
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(description="Generate openEMS simulation scripts from FreeCAD document and simulation settings .ini file.",
+                                     epilog=REQUIREMENTS_HELP, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("designs", nargs="+", metavar="FILE", help="pairs of FreeCAD document and settings file: design.FCStd settings.ini [design.FCStd settings.ini ...]")
+    parser.add_argument("--type", choices=["octave", "python", "both"], default="octave", help="generated script language (default: octave)")
+    parser.add_argument("--output-dir", default=None, help="simulation output directory, by default <settings name>_openEMS_simulation next to .ini file as in GUI, allowed just for one design")
+    parser.add_argument("--freecad-lib", default=None, help="FreeCAD lib directory added into python path if FreeCAD module is not importable")
+    parser.add_argument("--stl-workers", type=int, default=None, help="number of parallel STL export worker processes (default: 1)")
+    parser.add_argument("--jobs", type=int, default=1, help="number of designs or sweep variants generated in parallel processes")
+    parser.add_argument("--sweep", default=None, help="parametric sweep definition .json file, allowed just for one design")
+    parser.add_argument("--sweep-variant", type=int, action="append", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if len(args.designs) % 2 != 0:
+        parser.error("designs must be given as pairs of FreeCAD document and settings .ini file")
+    if args.output_dir is not None and len(args.designs) > 2:
+        parser.error("--output-dir can be used just for one design")
+    if args.sweep is not None and len(args.designs) > 2:
+        parser.error("--sweep can be used just for one design")
+
+    return args
+
+def generateDesign(args, fcstdFileName, iniFileName):
+    """
+    Open FreeCAD document, load settings into headless model and generate simulation scripts, runs in this process.
+    """
+    FreeCAD, HeadlessSimulationModel = importHeadlessModules(args)
+
+    doc = FreeCAD.openDocument(os.path.abspath(fcstdFileName))
+    FreeCAD.setActiveDocument(doc.Name)
+
+    model = HeadlessSimulationModel(APP_DIR)
+    outputDir = model.loadSettings(os.path.abspath(iniFileName))
+    if args.output_dir is not None:
+        outputDir = os.path.abspath(args.output_dir)
+
+    scriptTypes = ["octave", "python"] if args.type == "both" else [args.type]
+    print(f"Generating {', '.join(scriptTypes)} simulation script for {fcstdFileName} into {outputDir}")
+    model.generateScripts(scriptTypes, outputDir, args.stl_workers)
+
+    FreeCAD.closeDocument(doc.Name)
+
+def generateSweepVariants(args, fcstdFileName, iniFileName, variantIndexes):
+    """
+    Open FreeCAD document, load settings and generate given sweep variants one after another in this process.
+    """
+    FreeCAD, HeadlessSimulationModel = importHeadlessModules(args)
+    from utilsOpenEMS.Headless.ParametricSweep import ParametricSweep
+
+    sweep = ParametricSweep.fromFile(args.sweep)
+
+    doc = FreeCAD.openDocument(os.path.abspath(fcstdFileName))
+    FreeCAD.setActiveDocument(doc.Name)
+
+    model = HeadlessSimulationModel(APP_DIR)
+    outputDir = model.loadSettings(os.path.abspath(iniFileName))
+    if args.output_dir is not None:
+        outputDir = os.path.abspath(args.output_dir)
+
+    scriptTypes = ["octave", "python"] if args.type == "both" else [args.type]
+    for variantIndex in variantIndexes:
+        model.generateSweepVariant(sweep, variantIndex, scriptTypes, outputDir, args.stl_workers)
+
+    FreeCAD.closeDocument(doc.Name)
+
+def generateInSubprocess(args, fcstdFileName, iniFileName, variantIndexes=None):
+    cmd = [sys.executable, os.path.abspath(__file__), "--type", args.type, fcstdFileName, iniFileName]
+    if args.freecad_lib is not None:
+        cmd += ["--freecad-lib", args.freecad_lib]
+    if args.stl_workers is not None:
+        cmd += ["--stl-workers", str(args.stl_workers)]
+    if args.output_dir is not None:
+        cmd += ["--output-dir", args.output_dir]
+    if variantIndexes is not None:
+        cmd += ["--sweep", args.sweep]
+        for variantIndex in variantIndexes:
+            cmd += ["--sweep-variant", str(variantIndex)]
+    return subprocess.run(cmd).returncode
+
+def runSweep(args, fcstdFileName, iniFileName):
+    """
+    Generate all sweep variants. Variant 0 is generated first so STL files exist before other variants start, remaining variants
+    are split into --jobs chunks each generated by its own process as each process has to open document and load settings.
+    """
+    sys.path.insert(0, APP_DIR)
+    from utilsOpenEMS.Headless.ParametricSweep import ParametricSweep
+
+    variantsCount = len(ParametricSweep.fromFile(args.sweep).getVariants())
+    print(f"Parametric sweep {args.sweep} has {variantsCount} variants")
+
+    if args.sweep_variant is not None:
+        generateSweepVariants(args, fcstdFileName, iniFileName, args.sweep_variant)
+        return 0
+
+    if args.jobs <= 1 or variantsCount <= 2:
+        generateSweepVariants(args, fcstdFileName, iniFileName, range(variantsCount))
+        return 0
+
+    if generateInSubprocess(args, fcstdFileName, iniFileName, [0]) != 0:
+        print("ERROR: generation failed for sweep variant 0")
+        return 1
+
+    remainingVariants = list(range(1, variantsCount))
+    jobsCount = min(args.jobs, len(remainingVariants))
+    variantsChunks = [remainingVariants[k::jobsCount] for k in range(jobsCount)]
+
+    failedChunks = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobsCount) as executor:
+        futures = {executor.submit(generateInSubprocess, args, fcstdFileName, iniFileName, variantsChunk): variantsChunk for variantsChunk in variantsChunks}
+        for future in concurrent.futures.as_completed(futures):
+            if future.result() != 0:
+                failedChunks.append(futures[future])
+
+    for variantsChunk in failedChunks:
+        print(f"ERROR: generation failed for sweep variants {variantsChunk}")
+    return 1 if len(failedChunks) > 0 else 0
+
+def main(argv):
+    args = parseArguments(argv)
+    designs = [(args.designs[k], args.designs[k+1]) for k in range(0, len(args.designs), 2)]
+
+    if args.sweep is not None:
+        return runSweep(args, designs[0][0], designs[0][1])
+
+    if args.jobs <= 1 or len(designs) == 1:
+        for fcstdFileName, iniFileName in designs:
+            generateDesign(args, fcstdFileName, iniFileName)
+        return 0
+
+    failedDesigns = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(generateInSubprocess, args, fcstdFileName, iniFileName): fcstdFileName for fcstdFileName, iniFileName in designs}
+        for future in concurrent.futures.as_completed(futures):
+            if future.result() != 0:
+                failedDesigns.append(futures[future])
+
+    for fcstdFileName in failedDesigns:
+        print(f"ERROR: generation failed for {fcstdFileName}")
+    return 1 if len(failedDesigns) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
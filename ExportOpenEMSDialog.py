@@ -75,11 +75,17 @@ from utilsOpenEMS.ScriptLinesGenerator.PythonScriptLinesGenerator import PythonS
 
 from utilsOpenEMS.ScriptLinesGenerator.OctaveScriptLinesGenerator2 import OctaveScriptLinesGenerator2	#EXPERIMENTAL JUST FOR DEBUGGING TILL MOVE TO RELEASE
 from utilsOpenEMS.ScriptLinesGenerator.PythonScriptLinesGenerator2 import PythonScriptLinesGenerator2	#EXPERIMENTAL JUST FOR DEBUGGING TILL MOVE TO RELEASE
+from utilsOpenEMS.ScriptLinesGenerator.SimulationCostEstimator import SimulationCostEstimator
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine
 
 from utilsOpenEMS.GuiHelpers.GuiHelpers import GuiHelpers
 from utilsOpenEMS.GuiHelpers.FactoryCadInterface import FactoryCadInterface
 
 from utilsOpenEMS.GuiHelpers.GuiSignals import GuiSignals
+from utilsOpenEMS.GuiHelpers.AuxGridLines import AuxGridLines
+from utilsOpenEMS.GuiHelpers.ObjectListModel import ObjectListModel
+from utilsOpenEMS.GuiHelpers.ObjectReferenceIndex import ObjectReferenceIndex
+from utilsOpenEMS.GuiHelpers.ObjectFilter import ObjectFilter
 
 from utilsOpenEMS.SaveLoad.IniFile0v1 import IniFile0v1
 
@@ -202,9 +208,17 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 		self.internalObjectNameLabelList = {}
 
+		#objects list is model, document changes are applied into it as deltas without rebuilding whole list
+		self.objectListModel = ObjectListModel(self.APP_DIR)
+		self.form.objectAssignmentLeftTreeWidget.setModel(self.objectListModel)
+
 		self.initLeftColumnTopLevelItems()
-		self.form.objectAssignmentLeftTreeWidget.itemDoubleClicked.connect(self.objectAssignmentLeftTreeWidgetItemDoubleClicked)
-		self.form.objectAssignmentLeftTreeWidget.itemSelectionChanged.connect(self.objectAssignmentLeftTreeWidgetItemSelectionChanged)
+
+		#index of tree items referencing objects, used when object is renamed or deleted
+		self.objectReferenceIndex = ObjectReferenceIndex(self.form.objectAssignmentRightTreeWidget, [self.form.objectAssignmentPriorityTreeView, self.form.meshPriorityTreeView], self.internalObjectNameLabelList)
+
+		self.form.objectAssignmentLeftTreeWidget.doubleClicked.connect(self.objectAssignmentLeftTreeWidgetItemDoubleClicked)
+		self.form.objectAssignmentLeftTreeWidget.selectionModel().selectionChanged.connect(self.objectAssignmentLeftTreeWidgetItemSelectionChanged)
 
 		#########################################################################################################
 		#	RIGHT COLUMN - Simulation Object Assignment
@@ -257,6 +271,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		self.form.fixedCountRadioButton.clicked.connect(self.fixedCountRadioButtonClicked)
 		self.form.fixedDistanceRadioButton.clicked.connect(self.fixedDistanceRadioButtonClicked)
 		self.form.smoothMeshRadioButton.clicked.connect(self.smoothMeshRadioButtonClicked)
+		self.form.autoMeshRadioButton.clicked.connect(self.autoMeshRadioButtonClicked)
 
 		# Handle function for MATERIAL RADIO BUTTONS
 		self.form.materialUserDefinedRadioButton.toggled.connect(self.materialUserDeinedRadioButtonToggled)
@@ -267,6 +282,11 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		#
 		self.form.generateOpenEMSScriptButton.clicked.connect(self.generateOpenEMSScriptButtonClicked)
 
+		#
+		# Clicked on "Estimate Cost"
+		#
+		self.form.estimateSimulationCostButton.clicked.connect(self.estimateSimulationCostButtonClicked)
+
 		#
 		# Clicked on BUTTONS FOR OBJECT PRIORITIES
 		#
@@ -296,6 +316,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		#
 		self.form.createUserdefGridLinesFromCurrentButton.clicked.connect(self.createUserdefGridLinesFromCurrentButtonClicked)
 		self.form.displayXYGridLinesInModelButton.clicked.connect(self.displayXYGridLinesInModelButtonClicked)
+		self.form.previewFinalMeshButton.clicked.connect(self.previewFinalMeshButtonClicked)
 		self.form.gridRectangularRadio.toggled.connect(self.gridCoordsTypeChoosed)
 		self.form.gridCylindricalRadio.toggled.connect(self.gridCoordsTypeChoosed)
 
@@ -303,21 +324,21 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			element.setEnabled(True)
 			if self.form.gridXEnable.checkState() == QtCore.Qt.Checked else
 			element.setEnabled(False)
-			for element in [self.form.fixedCountXNumberInput, self.form.fixedDistanceXNumberInput, self.form.smoothMeshXMaxRes]
+			for element in [self.form.fixedCountXNumberInput, self.form.fixedDistanceXNumberInput, self.form.smoothMeshXMaxRes, self.form.autoMeshXMaxRes]
 		])
 
 		self.form.gridYEnable.stateChanged.connect(lambda:[
 			element.setEnabled(True)
 			if self.form.gridYEnable.checkState() == QtCore.Qt.Checked else
 			element.setEnabled(False)
-			for element in [self.form.fixedCountYNumberInput, self.form.fixedDistanceYNumberInput, self.form.smoothMeshYMaxRes]
+			for element in [self.form.fixedCountYNumberInput, self.form.fixedDistanceYNumberInput, self.form.smoothMeshYMaxRes, self.form.autoMeshYMaxRes]
 		])
 
 		self.form.gridZEnable.stateChanged.connect(lambda:[
 			element.setEnabled(True)
 			if self.form.gridZEnable.checkState() == QtCore.Qt.Checked else
 			element.setEnabled(False)
-			for element in [self.form.fixedCountZNumberInput, self.form.fixedDistanceZNumberInput, self.form.smoothMeshZMaxRes]
+			for element in [self.form.fixedCountZNumberInput, self.form.fixedDistanceZNumberInput, self.form.smoothMeshZMaxRes, self.form.autoMeshZMaxRes]
 		])
 
 		# grid offset gui form enable/disable
@@ -432,8 +453,15 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 		#
 		# FILTER LEFT COLUMN ITEMS
+		#	- filter is applied after user stops typing for short time or immediately when enter is pressed
 		#
+		self.objectAssignmentFilterTimer = QtCore.QTimer()
+		self.objectAssignmentFilterTimer.setSingleShot(True)
+		self.objectAssignmentFilterTimer.setInterval(300)
+		self.objectAssignmentFilterTimer.timeout.connect(self.applyObjectAssignmentFilter)
+		self.form.objectAssignmentFilterLeft.textChanged.connect(lambda: self.objectAssignmentFilterTimer.start())
 		self.form.objectAssignmentFilterLeft.returnPressed.connect(self.applyObjectAssignmentFilter)
+		self.form.objectAssignmentFilterModeLeft.currentIndexChanged.connect(lambda: self.applyObjectAssignmentFilter())
 
 		# MinDecrement changed
 		self.form.simParamsMinDecrement.valueChanged.connect(self.simParamsMinDecrementValueChanged)
@@ -539,11 +567,11 @@ class ExportOpenEMSDialog(QtCore.QObject):
 	def freecadObjectCreated(self, obj):
 		print("freecadObjectCreated :{} ('{}')".format(obj.FullName, obj.Label))
 		# A new object has been created. Only the list of available objects needs to be updated.
-		filterStr = self.form.objectAssignmentFilterLeft.text()
-		self.initLeftColumnTopLevelItems(filterStr)
+		self.objectListModel.objectCreated(obj.Name, obj.Label)
+		self.internalObjectNameLabelList[obj.Name] = obj.Label
 
 
-	def freecadObjectChanged(self, obj, prop, enableReInitLeftColumn=True):
+	def freecadObjectChanged(self, obj, prop):
 		print("freecadObjectChanged :{} ('{}') property changed: {}".format(obj.FullName, obj.Label, prop))
 
 		#property label was changes, object was renamed in freecad
@@ -551,36 +579,33 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			# The label (displayed name) of an object has changed.
 			# (TODO) Update all mentions in the ObjectAssigments panel.
 
-			#
-			#	Rename items in right column where objects are assigned to categories
-			#
-			itemsWithOriginalLabel = self.form.objectAssignmentRightTreeWidget.findItems(self.internalObjectNameLabelList[obj.Name], QtCore.Qt.MatchExactly | QtCore.Qt.MatchFlag.MatchRecursive)
-			print(f"RIGHT ASSIGNMENT WIDGET found {len(itemsWithOriginalLabel)}")
-			for itemToRename in itemsWithOriginalLabel:
-				reResult = re.search("([A-Za-z]*)SettingsItem'", str(type(itemToRename.data(0, QtCore.Qt.UserRole))))
-				if (reResult.group(1).lower() == "freecad"):
-					itemToRename.setText(0, obj.Label)
+			#object which wasn't listed yet has nothing assigned, just left column is updated
+			if obj.Name not in self.internalObjectNameLabelList:
+				self.objectListModel.objectRenamed(obj.Name, obj.Label)
+				self.internalObjectNameLabelList[obj.Name] = obj.Label
+				return
 
 			#
-			#	Renames items in priority list and mesh priority list, names there are like:
-			#		Material, some name, objectName
-			#							 so this object name from end must be replace by new name
+			#	Rename items which reference object:
+			#		- in right column where objects are assigned to categories
+			#		- in priority list and mesh priority list, names there are like:
+			#			Material, some name, objectName
+			#								 so this object name from end must be replace by new name
 			#
-			itemsWithOriginalLabel = []
-			itemsWithOriginalLabel += self.form.objectAssignmentPriorityTreeView.findItems(self.internalObjectNameLabelList[obj.Name], QtCore.Qt.MatchEndsWith | QtCore.Qt.MatchFlag.MatchRecursive)
-			itemsWithOriginalLabel += self.form.meshPriorityTreeView.findItems(self.internalObjectNameLabelList[obj.Name], QtCore.Qt.MatchEndsWith | QtCore.Qt.MatchFlag.MatchRecursive)
-			print(f"OBJECT PRIORITIES found {len(itemsWithOriginalLabel)}")
-			for itemToRename in itemsWithOriginalLabel:
-				newLabel = itemToRename.text(0)
-				newLabel = newLabel[:-len(self.internalObjectNameLabelList[obj.Name])] + obj.Label
-				itemToRename.setText(0, newLabel)
+			itemsToRename = self.objectReferenceIndex.getItems(obj.Name)
+			print(f"OBJECT REFERENCES found {len(itemsToRename)}")
+			for treeWidget, itemToRename in itemsToRename:
+				if treeWidget == self.form.objectAssignmentRightTreeWidget:
+					itemToRename.setText(0, obj.Label)
+				else:
+					newLabel = ", ".join(itemToRename.text(0).split(", ", 2)[:2] + [obj.Label])
+					itemToRename.setText(0, newLabel)
 
 			#
-			#	TinitLeftCOlumnToLevelItems refill internalObjectNameLabelList, so when working in bulk this reinit must be supressed till last item
+			#	Update label in left column and internal list
 			#
-			if enableReInitLeftColumn:
-				filterStr = self.form.objectAssignmentFilterLeft.text()
-				self.initLeftColumnTopLevelItems(filterStr)
+			self.objectListModel.objectRenamed(obj.Name, obj.Label)
+			self.internalObjectNameLabelList[obj.Name] = obj.Label
 
 	def freecadBeforeObjectDeleted(self,obj):
 		# event is generated before object is being removed, so observing instances have to
@@ -592,36 +617,23 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		print("freecadObjectDeleted :{} ('{}')".format(obj.FullName, obj.Label))
 
 		#
-		#	Rename items in right column where objects are assigned to categories
-		#
-		itemsWithOriginalLabel = self.form.objectAssignmentRightTreeWidget.findItems(obj.Label, QtCore.Qt.MatchExactly | QtCore.Qt.MatchFlag.MatchRecursive)
-		for itemToRename in itemsWithOriginalLabel:
-			reResult = re.search("([A-Za-z]*)SettingsItem'", str(type(itemToRename.data(0, QtCore.Qt.UserRole))))
-			if (reResult.group(1).lower() == "freecad"):
-				itemToRename.parent().removeChild(itemToRename)
-
-		#
-		#	Renames items in priority list and mesh priority list, names there are like:
-		#		Material, some name, objectName
-		#							 so this object name from end must be replace by new name
+		#	Remove items which reference object in right column where objects are assigned to categories and in priority list
+		#	and mesh priority list
 		#
-		itemsWithOriginalLabel = self.form.objectAssignmentPriorityTreeView.findItems(obj.Label, QtCore.Qt.MatchEndsWith | QtCore.Qt.MatchFlag.MatchRecursive)
-		for itemToRename in itemsWithOriginalLabel:
-			self.form.objectAssignmentPriorityTreeView.invisibleRootItem().removeChild(itemToRename)
-
-		itemsWithOriginalLabel = self.form.meshPriorityTreeView.findItems(obj.Label, QtCore.Qt.MatchEndsWith | QtCore.Qt.MatchFlag.MatchRecursive)
-		for itemToRename in itemsWithOriginalLabel:
-			self.form.meshPriorityTreeView.invisibleRootItem().removeChild(itemToRename)
+		for treeWidget, itemToRemove in self.objectReferenceIndex.getItems(obj.Name):
+			if treeWidget == self.form.objectAssignmentRightTreeWidget:
+				itemToRemove.parent().removeChild(itemToRemove)
+			else:
+				treeWidget.invisibleRootItem().removeChild(itemToRemove)
+		self.objectReferenceIndex.removeObject(obj.Name)
 
 		#
 		#	Remove from left widget object because this is running before delete so if init function for left widget would be executed object will be still there
 		#
-		itemsWithOriginalLabel = self.form.objectAssignmentLeftTreeWidget.findItems(obj.Label, QtCore.Qt.MatchEndsWith | QtCore.Qt.MatchFlag.MatchRecursive)
-		for itemToRename in itemsWithOriginalLabel:
-			self.form.meshPriorityTreeView.invisibleRootItem().removeChild(itemToRename)
+		self.objectListModel.objectDeleted(obj.Name)
 
 		# remove object label from internal list
-		del self.internalObjectNameLabelList[obj.Name]
+		self.internalObjectNameLabelList.pop(obj.Name, None)
 
 	def blenderWindowActivatedHandler(self):
 		"""
@@ -656,7 +668,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			#	internal list for objects which is created during initLetfColumn is not populated, so now repopulate it and internal
 			#	list will have right values of name, id
 			#
-			self.initLeftColumnTopLevelItems(self.form.objectAssignmentFilterLeft.text())
+			self.initLeftColumnTopLevelItems()
 		else:
 			newObjects_Name_Id = dict([(key,value) for key,value in currentObjectsList_Name_Id.items() if value not in self.previousObjectsList_Name_Id.values()])
 			deletedObjects_Id_Name = dict([(key,value) for key,value in self.previousObjectsList_Id_Name.items() if key not in currentObjectsList_Id_Name.keys()])
@@ -678,10 +690,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		#
 		if len(renamedObjects_Id_Name) > 0:
 			for id,name in renamedObjects_Id_Name.items():
-				self.freecadObjectChanged(BlenderToCadObject(name, id), 'Label', enableReInitLeftColumn=False)
-
-			#reinit left column due it was supressed during bulk renaming
-			self.initLeftColumnTopLevelItems(self.form.objectAssignmentFilterLeft.text())
+				self.freecadObjectChanged(BlenderToCadObject(name, id), 'Label')
 
 		if len(deletedObjects_Id_Name) > 0:
 			for id,name in deletedObjects_Id_Name.items():
@@ -721,11 +730,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 	def eraseAuxGridButtonClicked(self):
 		print("--> Start removing auxiliary gridlines from 3D view.")
-		auxGridLines = self.cadHelpers.getObjects()
-		for gridLine in auxGridLines:
-			print("--> Removing " + gridLine.Label + " from 3D view.")
-			if "auxGridLine" in gridLine.Label:
-				self.cadHelpers.removeObject(gridLine.Name)
+		self.cadHelpers.removeAuxGrid(removeLegacyLines=True)
 		print("--> End removing auxiliary gridlines from 3D view.")
 
 	def createUserdefGridLinesFromCurrentButtonClicked(self):
@@ -750,12 +755,64 @@ class ExportOpenEMSDialog(QtCore.QObject):
 	def displayXYGridLinesInModelButtonClicked(self):
 		print('displayXYGridLinesInModelButtonClicked: start draw whole XY grid for each object')
 
+		#lines of all objects are collected and drawn at once
+		auxGridLines = AuxGridLines()
 		gridCategory = self.form.objectAssignmentRightTreeWidget.findItems("Grid", QtCore.Qt.MatchFixedString)[0]
 		for gridItemIndex in range(gridCategory.childCount()):
 			for objIndex in range(gridCategory.child(gridItemIndex).childCount()):
 				currItem = gridCategory.child(gridItemIndex).child(objIndex)
 				print(currItem.text(0))
-				self.objectDrawGrid(currItem)
+				self.objectDrawGrid(currItem, auxGridLines)
+		self.cadHelpers.drawAuxGrid(auxGridLines)
+
+	def previewFinalMeshButtonClicked(self):
+		"""
+		Draw final mesh of whole model at once, lines are resolved for all grids (priorities, minimal gridlines spacing) and drawn
+		as three planes XY, XZ, YZ on model boundary, each plane is one object in 3D view. When axis has more lines than 3D view
+		has pixels lines are decimated, dense parts of mesh are still drawn dense.
+		"""
+		print('previewFinalMeshButtonClicked: start draw final mesh')
+
+		if self.getModelCoordsType() == "cylindrical":
+			self.guiHelpers.displayMessage("Final mesh preview is available just for rectangular grid.")
+			return
+
+		meshLines = self.scriptGenerator.getFinalMeshLines()
+		if meshLines is None or any([len(meshLines[axis]) < 2 for axis in ("x", "y", "z")]):
+			self.guiHelpers.displayMessage("Final mesh cannot be previewed, grid lines are not known before simulation script runs (User Defined grid), excitation is not defined or grid has less than 2 lines in some direction.")
+			return
+
+		#lines are in simulation units, converted back to FreeCAD units to draw them
+		sf = self.scriptGenerator.getFreeCADUnitLength_m() / self.scriptGenerator.getUnitLengthFromUI_m()
+		maxLinesCount = max(self.cadHelpers.getViewSizePixels())
+		lines = {axis: MeshEngine.decimateLines(np.asarray(axisLines) / sf, maxLinesCount) for axis, axisLines in meshLines.items()}
+		print("Final mesh lines count: " + ", ".join([f"{axis}: {len(meshLines[axis])} (drawn {len(lines[axis])})" for axis in ("x", "y", "z")]))
+
+		minX, maxX = lines["x"][0], lines["x"][-1]
+		minY, maxY = lines["y"][0], lines["y"][-1]
+		minZ, maxZ = lines["z"][0], lines["z"][-1]
+
+		auxGridLines = AuxGridLines()
+
+		#XY plane at bottom of model
+		for x in lines["x"]:
+			auxGridLines.addLine("xy", [x, minY, minZ], [x, maxY, minZ])
+		for y in lines["y"]:
+			auxGridLines.addLine("xy", [minX, y, minZ], [maxX, y, minZ])
+
+		#XZ plane at front of model
+		for x in lines["x"]:
+			auxGridLines.addLine("xz", [x, minY, minZ], [x, minY, maxZ])
+		for z in lines["z"]:
+			auxGridLines.addLine("xz", [minX, minY, z], [maxX, minY, z])
+
+		#YZ plane at left side of model
+		for y in lines["y"]:
+			auxGridLines.addLine("yz", [minX, y, minZ], [minX, y, maxZ])
+		for z in lines["z"]:
+			auxGridLines.addLine("yz", [minX, minY, z], [minX, maxY, z])
+
+		self.cadHelpers.drawAuxGrid(auxGridLines)
 
 	def updateComboboxWithAllowedItems(self, comboboxRef, sourceCategory="", allowedTypes=[], isActive=None):
 		currentItemText = comboboxRef.currentText()
@@ -869,12 +926,12 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			self.cadHelpers.selectObjectByLabel(currItemLabel)
 
 	def objectAssignmentLeftTreeWidgetItemSelectionChanged(self):
-		currItem = self.form.objectAssignmentLeftTreeWidget.currentItem()
+		currIndex = self.form.objectAssignmentLeftTreeWidget.currentIndex()
 		currItemLabel = None
 
-		#check if there is some current item due this function is trigered also during deleting all items in right assignment widget and then currItem is None
-		if currItem:
-			currItemLabel = currItem.text(0)
+		#check if there is some current item due this function is trigered also during reset of objects list and then index is invalid
+		if currIndex.isValid():
+			currItemLabel = currIndex.data(QtCore.Qt.DisplayRole)
 
 		if (currItemLabel):
 			self.cadHelpers.clearSelection()
@@ -907,11 +964,18 @@ class ExportOpenEMSDialog(QtCore.QObject):
 	#
 	#	Draw auxiliary grid in FreeCAD 3D view
 	#
-	def objectDrawGrid(self, currItem):
+	def objectDrawGrid(self, currItem, auxGridLines=None):
 		#
 		#	Drawing auxiliary object grid for meshing.
 		#
-		#		example how to draw line for grid: self.cadHelpers.drawDraftLine("gridXY", [-78.0, -138.0, 0.0], [5.0, -101.0, 0.0])
+		#		example how to draw line for grid: auxGridLines.addLine("x", [-78.0, -138.0, 0.0], [-78.0, -101.0, 0.0])
+		#
+		#		Lines are collected and drawn at end as one object per axis which replaces previously drawn grid, when auxGridLines is given
+		#		lines are just added into it and caller draws them (used to draw grid of more objects at once).
+		#
+		drawCollectedLines = auxGridLines is None
+		if drawCollectedLines:
+			auxGridLines = AuxGridLines()
 
 		currSetting = currItem.data(0, QtCore.Qt.UserRole)
 		genScript = ""
@@ -1012,7 +1076,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							xlines = np.linspace(minRadius, maxRadius, int(currSetting.getXYZ(refUnit)['x']))
 
 						for xGridLine in xlines:
-							self.cadHelpers.drawDraftCircle("auxGridLine", self.cadHelpers.Vector(0,0,zAuxGridCoord), xGridLine)
+							auxGridLines.addCircle("x", [0, 0, zAuxGridCoord], xGridLine)
 
 					#DRAW Y LINES auxiliary grid in 3D view
 					if (currSetting.yenabled):
@@ -1024,7 +1088,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 						print(ylines)
 
 						for yGridLine in ylines:
-							self.cadHelpers.drawDraftLine("auxGridLine", [0, 0, zAuxGridCoord], [math.cos(yGridLine)*radius, math.sin(yGridLine)*radius, zAuxGridCoord])
+							auxGridLines.addLine("y", [0, 0, zAuxGridCoord], [math.cos(yGridLine)*radius, math.sin(yGridLine)*radius, zAuxGridCoord])
 
 		elif (currSetting.coordsType == 'rectangular' and currGridAxis == "z"):
 
@@ -1053,7 +1117,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							xlines = np.arange(bbCoords.XMin, bbCoords.XMax, currSetting.getXYZ(refUnit)['x'])
 							for xGridLine in xlines:
 								#self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, bbCoords.YMin, zAuxGridCoord], [xGridLine, bbCoords.YMax, zAuxGridCoord])
-								self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, modelMinY, zAuxGridCoord], [xGridLine, modelMaxY, zAuxGridCoord])
+								auxGridLines.addLine("x", [xGridLine, modelMinY, zAuxGridCoord], [xGridLine, modelMaxY, zAuxGridCoord])
 
 					#DRAW Y LINES auxiliary grid in 3D view
 					if (currSetting.yenabled):
@@ -1061,7 +1125,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							ylines = np.arange(bbCoords.YMin, bbCoords.YMax, currSetting.getXYZ(refUnit)['y'])
 							for yGridLine in ylines:
 								#self.cadHelpers.drawDraftLine("auxGridLine", [bbCoords.XMin, yGridLine, zAuxGridCoord], [bbCoords.XMax, yGridLine, zAuxGridCoord])
-								self.cadHelpers.drawDraftLine("auxGridLine", [modelMinX, yGridLine, zAuxGridCoord], [modelMaxX, yGridLine, zAuxGridCoord])
+								auxGridLines.addLine("y", [modelMinX, yGridLine, zAuxGridCoord], [modelMaxX, yGridLine, zAuxGridCoord])
 
 			elif (currSetting.getType() == 'Fixed Count'):
 
@@ -1090,7 +1154,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 						for xGridLine in xlines:
 							#self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, bbCoords.YMin, zAuxGridCoord], [xGridLine, bbCoords.YMax, zAuxGridCoord])
-							self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, modelMinY, zAuxGridCoord], [xGridLine, modelMaxY, zAuxGridCoord])
+							auxGridLines.addLine("x", [xGridLine, modelMinY, zAuxGridCoord], [xGridLine, modelMaxY, zAuxGridCoord])
 
 					#DRAW Y LINES auxiliary grid in 3D view
 					if (currSetting.yenabled):
@@ -1101,7 +1165,37 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 						for yGridLine in ylines:
 							#self.cadHelpers.drawDraftLine("auxGridLine", [bbCoords.XMin, yGridLine, zAuxGridCoord], [bbCoords.XMax, yGridLine, zAuxGridCoord])
-							self.cadHelpers.drawDraftLine("auxGridLine", [modelMinX, yGridLine, zAuxGridCoord], [modelMaxX, yGridLine, zAuxGridCoord])
+							auxGridLines.addLine("y", [modelMinX, yGridLine, zAuxGridCoord], [modelMaxX, yGridLine, zAuxGridCoord])
+
+			elif (currSetting.getType() in ['Smooth Mesh', 'Auto Mesh']):
+
+				#smooth mesh lines are computed for whole grid group from all objects assigned to it, max resolution 0 is taken from excitation
+				#auto mesh lines are computed same way from edges of material objects inside objects assigned to grid
+				self.scriptGenerator.initGenerationCaches()
+				if 0 in currSetting.getXYZ().values():
+					self.scriptGenerator.getExcitationScriptLines(definitionsOnly=True)
+				if (currSetting.getType() == 'Smooth Mesh'):
+					smoothMeshLines = self.scriptGenerator.getSmoothMeshLines(currItem.parent(), currSetting)
+				else:
+					smoothMeshLines = self.scriptGenerator.getAutoMeshLines(currItem.parent(), currSetting)
+				if smoothMeshLines is None:
+					self.guiHelpers.displayMessage(f"{currSetting.getType()} max resolution is taken from excitation, please define excitation first.")
+					return
+
+				#lines are in simulation units, converted back to FreeCAD units to draw them
+				sf = self.scriptGenerator.getFreeCADUnitLength_m() / self.scriptGenerator.getUnitLengthFromUI_m()
+				smoothLines = {axis: axisLines / sf for axis, (fixedLines, axisLines) in smoothMeshLines.items()}
+				print(f"{currSetting.getType()} lines count: " + ", ".join([f"{axis}: {len(axisLines)}" for axis, axisLines in smoothLines.items()]))
+
+				zAuxGridCoordList = list(smoothLines['z']) if 'z' in smoothLines else [bbCoords.ZMax]
+				for zAuxGridCoord in zAuxGridCoordList:
+					#DRAW X LINES auxiliary grid in 3D view
+					for xGridLine in smoothLines.get('x', []):
+						auxGridLines.addLine("x", [xGridLine, modelMinY, zAuxGridCoord], [xGridLine, modelMaxY, zAuxGridCoord])
+
+					#DRAW Y LINES auxiliary grid in 3D view
+					for yGridLine in smoothLines.get('y', []):
+						auxGridLines.addLine("y", [modelMinX, yGridLine, zAuxGridCoord], [modelMaxX, yGridLine, zAuxGridCoord])
 
 			elif (currSetting.getType() == 'User Defined'):
 				#UNIT FOR MESH
@@ -1134,14 +1228,14 @@ class ExportOpenEMSDialog(QtCore.QObject):
 						if float(currSetting.getXYZ(refUnit)['z']) !=  0:
 							zlines = np.arange(bbCoords.ZMin, bbCoords.ZMax, currSetting.getXYZ(refUnit)['z'])
 							for zGridLine in zlines:
-								self.cadHelpers.drawDraftLine("auxGridLine", [xAuxGridCoord, modelMinY, zGridLine], [xAuxGridCoord, modelMaxY, zGridLine])
+								auxGridLines.addLine("z", [xAuxGridCoord, modelMinY, zGridLine], [xAuxGridCoord, modelMaxY, zGridLine])
 
 					#DRAW Y LINES auxiliary grid in 3D view
 					if (currSetting.yenabled):
 						if float(currSetting.getXYZ(refUnit)['y']) != 0:
 							ylines = np.arange(bbCoords.YMin, bbCoords.YMax, currSetting.getXYZ(refUnit)['y'])
 							for yGridLine in ylines:
-								self.cadHelpers.drawDraftLine("auxGridLine", [xAuxGridCoord, yGridLine, modelMinZ], [xAuxGridCoord, yGridLine, modelMaxZ])
+								auxGridLines.addLine("y", [xAuxGridCoord, yGridLine, modelMinZ], [xAuxGridCoord, yGridLine, modelMaxZ])
 
 			elif (currSetting.getType() == 'Fixed Count'):
 
@@ -1169,7 +1263,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							zlines = np.linspace(bbCoords.ZMin, bbCoords.ZMax, int(currSetting.getXYZ(refUnit)['z']))
 
 						for zGridLine in zlines:
-							self.cadHelpers.drawDraftLine("auxGridLine", [xAuxGridCoord, modelMinY, zGridLine], [xAuxGridCoord, modelMaxY, zGridLine])
+							auxGridLines.addLine("z", [xAuxGridCoord, modelMinY, zGridLine], [xAuxGridCoord, modelMaxY, zGridLine])
 
 					#DRAW Y LINES auxiliary grid in 3D view
 					if (currSetting.yenabled):
@@ -1179,7 +1273,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							ylines = np.linspace(bbCoords.YMin, bbCoords.YMax, int(currSetting.getXYZ(refUnit)['y']))
 
 						for yGridLine in ylines:
-								self.cadHelpers.drawDraftLine("auxGridLine", [xAuxGridCoord, yGridLine, modelMinZ], [xAuxGridCoord, yGridLine, modelMaxZ])
+								auxGridLines.addLine("y", [xAuxGridCoord, yGridLine, modelMinZ], [xAuxGridCoord, yGridLine, modelMaxZ])
 
 			elif (currSetting.getType() == 'User Defined'):
 				#UNIT FOR MESH
@@ -1212,14 +1306,14 @@ class ExportOpenEMSDialog(QtCore.QObject):
 						if float(currSetting.getXYZ(refUnit)['z']) !=  0:
 							zlines = np.arange(bbCoords.ZMin, bbCoords.ZMax, currSetting.getXYZ(refUnit)['z'])
 							for zGridLine in zlines:
-								self.cadHelpers.drawDraftLine("auxGridLine", [modelMinX, yAuxGridCoord, zGridLine], [modelMaxX, yAuxGridCoord, zGridLine])
+								auxGridLines.addLine("z", [modelMinX, yAuxGridCoord, zGridLine], [modelMaxX, yAuxGridCoord, zGridLine])
 
 					#DRAW X LINES auxiliary grid in 3D view
 					if (currSetting.xenabled):
 						if float(currSetting.getXYZ(refUnit)['x']) != 0:
 							xlines = np.arange(bbCoords.XMin, bbCoords.XMax, currSetting.getXYZ(refUnit)['x'])
 							for xGridLine in xlines:
-								self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, yAuxGridCoord, modelMinZ], [xGridLine, yAuxGridCoord, modelMaxZ])
+								auxGridLines.addLine("x", [xGridLine, yAuxGridCoord, modelMinZ], [xGridLine, yAuxGridCoord, modelMaxZ])
 
 			elif (currSetting.getType() == 'Fixed Count'):
 
@@ -1247,7 +1341,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							zlines = np.linspace(bbCoords.ZMin, bbCoords.ZMax, int(currSetting.getXYZ(refUnit)['z']))
 
 						for zGridLine in zlines:
-							self.cadHelpers.drawDraftLine("auxGridLine", [modelMinX, yAuxGridCoord, zGridLine], [modelMaxX, yAuxGridCoord, zGridLine])
+							auxGridLines.addLine("z", [modelMinX, yAuxGridCoord, zGridLine], [modelMaxX, yAuxGridCoord, zGridLine])
 
 					#DRAW X LINES auxiliary grid in 3D view
 					if (currSetting.xenabled):
@@ -1257,45 +1351,35 @@ class ExportOpenEMSDialog(QtCore.QObject):
 							xlines = np.linspace(bbCoords.XMin, bbCoords.XMax, int(currSetting.getXYZ(refUnit)['x']))
 
 						for xGridLine in xlines:
-							self.cadHelpers.drawDraftLine("auxGridLine", [xGridLine, yAuxGridCoord, modelMinZ], [xGridLine, yAuxGridCoord, modelMaxZ])
+							auxGridLines.addLine("x", [xGridLine, yAuxGridCoord, modelMinZ], [xGridLine, yAuxGridCoord, modelMaxZ])
 
 			elif (currSetting.getType() == 'User Defined'):
 				#UNIT FOR MESH
 				genScript += "meshUnit = " + currSetting.getUnitAsScriptLine() + "; % all length in mm\n"
 				genScript += "mesh = " + currSetting.getXYZ(refUnit) + ";\n"
 
-		#update whole document
-		self.cadHelpers.recompute()
-		print("---> Aux grid drawing finished. \n" + genScript)
+		#draw collected lines, one object per axis, document is recomputed once
+		if drawCollectedLines:
+			self.cadHelpers.drawAuxGrid(auxGridLines)
+		print(f"---> Aux grid drawing finished, {auxGridLines.getLinesCount()} lines. \n" + genScript)
 
 	#######################################################################################################################################################################
   	# END GRID DRAWING
 	#######################################################################################################################################################################
 
-	def initLeftColumnTopLevelItems(self, filterStr = ""):
-		self.form.objectAssignmentLeftTreeWidget.clear()
-
-		items = self.cadHelpers.getOpenEMSObjects(filterStr)
-		treeItems = []
+	def initLeftColumnTopLevelItems(self):
+		#
+		#	Full reload of objects list from document, used at start, document changes are applied as deltas by
+		#	freecadObjectCreated(), freecadObjectChanged(), freecadBeforeObjectDeleted() and filter is applied on cached labels
+		#
+		items = self.cadHelpers.getOpenEMSObjects()
 		for i in items:
-			#print("openEMS object to export:" + i.Label)
-
-			# ADDING ITEMS with UserData object which store them in intelligent way
-			#
-			topItem = QtWidgets.QTreeWidgetItem([i.Label])
-			itemData = FreeCADSettingsItem(name = i.Label, freeCadId = i.Name)
-			topItem.setData(0, QtCore.Qt.UserRole, itemData)
-			if (i.Name.find("Sketch") > -1):
-				topItem.setIcon(0, QtGui.QIcon(os.path.join(self.APP_DIR, "img", "wire.svg")))
-			elif (i.Name.find("Discretized_Edge") > -1):
-				topItem.setIcon(0, QtGui.QIcon(os.path.join(self.APP_DIR, "img", "curve.svg")))
-			else:
-				topItem.setIcon(0, QtGui.QIcon(os.path.join(self.APP_DIR, "img", "object.svg")))
-
-			treeItems.append(topItem)
 			self.internalObjectNameLabelList[i.Name] = i.Label		#add object label into internal list for case when label change to update all object labels in GUI
 
-		self.form.objectAssignmentLeftTreeWidget.insertTopLevelItems(0, treeItems)
+		self.objectListModel.setObjects(items, self.getObjectAssignmentFilter())
+
+	def getObjectAssignmentFilter(self):
+		return ObjectFilter(self.form.objectAssignmentFilterLeft.text(), self.form.objectAssignmentFilterModeLeft.currentText())
 
 	#
 	#	ABORT simulation button handler
@@ -1346,8 +1430,8 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 	def applyObjectAssignmentFilter(self):
 		print("Filter left column")
-		filterStr = self.form.objectAssignmentFilterLeft.text()
-		self.initLeftColumnTopLevelItems(filterStr)
+		self.objectAssignmentFilterTimer.stop()
+		self.objectListModel.setFilter(self.getObjectAssignmentFilter())
 
 	#
 	#	Get COORDINATION TYPE
@@ -1443,7 +1527,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 				self.guiHelpers.displayMessage("FreeCAD object cannot have child item.")
 				return
 
-			for itemToAdd in self.form.objectAssignmentLeftTreeWidget.selectedItems():
+			for itemToAdd in [self.objectListModel.createTreeWidgetItem(index) for index in sorted(self.form.objectAssignmentLeftTreeWidget.selectionModel().selectedRows(), key=lambda index: index.row())]:
 				# here are created 2 clones of item in left column to be putted into right column into some category
 				# as material, port or something and there is also priority list where another clone is inserted
 				leftItem = itemToAdd.clone()
@@ -1487,9 +1571,10 @@ class ExportOpenEMSDialog(QtCore.QObject):
 				#		- for LumpedPart, Material, ... name is "[category], [category name], [object name]"
 				#		- for Grid child other than Smooth Mesh name is "[category], [category name], [object name]"
 				#		- for Grid Smooth Mesh name is "[category], [category name]" there is no object name as Smooth Mesh group is taken whole as it is
+				#		- for Grid Auto Mesh it's same as for Smooth Mesh, name ends with AUTO MESH GROUP
 				#
-				if (hasattr(rightItem.data(0, QtCore.Qt.UserRole), 'type') and rightItem.data(0, QtCore.Qt.UserRole).type == "Smooth Mesh"):
-					newAddedItemName = rightItem.parent().text(0) + ", " + rightItem.text(0) + ", SMOOTH MESH GROUP"
+				if (isinstance(rightItem.data(0, QtCore.Qt.UserRole), GridSettingsItem) and rightItem.data(0, QtCore.Qt.UserRole).isGroupType()):
+					newAddedItemName = rightItem.parent().text(0) + ", " + rightItem.text(0) + ", " + rightItem.data(0, QtCore.Qt.UserRole).type.upper() + " GROUP"
 				else:
 					newAddedItemName = rightItem.parent().text(0) + ", " + rightItem.text(0) + ", " + leftItem2.text(0)
 				leftItem2.setData(0, QtCore.Qt.UserRole, rightItem.data(0, QtCore.Qt.UserRole))
@@ -1722,6 +1807,16 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		#self.scriptGenerator2.generateOpenEMSScript(self.simulationOutputDir + "_2nd_generator")
 		#self.scriptGenerator3.generateOpenEMSScript(self.simulationOutputDir + "_3rd_generator")
 
+	def estimateSimulationCostButtonClicked(self):
+		estimate = self.scriptGenerator.estimateSimulationCost()
+		if estimate is None:
+			self.guiHelpers.displayMessage("Simulation cost cannot be estimated, grid lines are not known before simulation script runs (User Defined grid) or grid has less than 2 lines in some direction.")
+			return
+
+		report = SimulationCostEstimator.getReport(estimate)
+		print(report)
+		self.guiHelpers.displayMessage(report)
+
 	def drawS11ButtonClicked(self):
 		portName = self.form.drawS11Port.currentText()
 
@@ -1801,6 +1896,10 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		self.form.userDefinedGridLinesTextInput.setEnabled(False)
 		self.form.gridTopPriorityLinesCheckbox.setEnabled(True)
 
+	def autoMeshRadioButtonClicked(self):
+		self.form.userDefinedGridLinesTextInput.setEnabled(False)
+		self.form.gridTopPriorityLinesCheckbox.setEnabled(True)
+
 	def userDefinedRadioButtonClicked(self):
 		self.form.userDefinedGridLinesTextInput.setEnabled(True)
 		self.form.gridTopPriorityLinesCheckbox.setEnabled(True)
@@ -1871,6 +1970,15 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			gridItem.smoothMesh['yMaxRes'] = self.form.smoothMeshYMaxRes.value()
 			gridItem.smoothMesh['zMaxRes'] = self.form.smoothMeshZMaxRes.value()
 
+		if (self.form.autoMeshRadioButton.isChecked()):
+			gridItem.type = "Auto Mesh"
+
+			gridItem.autoMesh = {}
+			gridItem.autoMesh['xMaxRes'] = self.form.autoMeshXMaxRes.value()
+			gridItem.autoMesh['yMaxRes'] = self.form.autoMeshYMaxRes.value()
+			gridItem.autoMesh['zMaxRes'] = self.form.autoMeshZMaxRes.value()
+			gridItem.autoMesh['edgeResDivider'] = self.form.autoMeshEdgeResDivider.value()
+
 		if (self.form.userDefinedRadioButton.isChecked()):
 			gridItem.type = "User Defined"
 			gridItem.userDefined['data'] = self.form.userDefinedGridLinesTextInput.toPlainText()
@@ -1968,14 +2076,14 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			if (selectedItems[0].text(0) != settingsInst.name):
 				self.guiSignals.gridRenamed.emit(selectedItems[0].text(0), settingsInst.name)
 
-			# SPECIAL CASE when grid type changed to Smooth Mesh
-			if (oldSettingsInst.type != "Smooth Mesh" and settingsInst.type == "Smooth Mesh"):
-				self.guiSignals.gridTypeChangedToSmoothMesh.emit(settingsInst.name)
-
-			# SPECIAL CASE when grid type changed to Smooth Mesh
-			if (oldSettingsInst.type == "Smooth Mesh" and settingsInst.type != "Smooth Mesh"):
+			# SPECIAL CASE when grid type changed from group type (Smooth Mesh, Auto Mesh), group entry in mesh priority is replaced by objects
+			if (oldSettingsInst.isGroupType() and oldSettingsInst.type != settingsInst.type):
 				self.guiSignals.gridTypeChangedFromSmoothMesh.emit(settingsInst.name)
 
+			# SPECIAL CASE when grid type changed to group type (Smooth Mesh, Auto Mesh), objects in mesh priority are replaced by group entry
+			if (settingsInst.isGroupType() and oldSettingsInst.type != settingsInst.type):
+				self.guiSignals.gridTypeChangedToSmoothMesh.emit(settingsInst.name)
+
 			self.guiHelpers.displayMessage(f"Grid {settingsInst.name} was updated", forceModal=False)
 			self.guiSignals.gridCoordsTypeChanged.emit()		#emit signal to update items dependant on coordinate system (rectangular or cartesian)
 
@@ -2311,8 +2419,9 @@ class ExportOpenEMSDialog(QtCore.QObject):
 
 	@Slot(str)
 	def gridTypeChangedToSmoothMesh(self, groupName):
-		searchStr = "Grid, " + groupName
-		newName = "Grid, " + groupName + ", SMOOTH MESH GROUP"
+		gridItem = self.guiHelpers.getGridGroupObjectAssignmentTreeItem(groupName)
+		searchStr = "Grid, " + groupName + ", "
+		newName = "Grid, " + groupName + ", " + gridItem.data(0, QtCore.Qt.UserRole).type.upper() + " GROUP"
 		[item.setText(0, newName) for item in self.form.meshPriorityTreeView.findItems(searchStr, QtCore.Qt.MatchStartsWith)]
 		[self.form.meshPriorityTreeView.invisibleRootItem().removeChild(item) for item in self.form.meshPriorityTreeView.findItems(newName, QtCore.Qt.MatchStartsWith)[1:]]
 		self.cadHelpers.printWarning(f"Updated {groupName} in mesh priority list")
@@ -2322,7 +2431,7 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		gridItem = self.guiHelpers.getGridGroupObjectAssignmentTreeItem(groupName)
 		assignedObjectNames = [gridItem.child(k).text(0) for k in range(gridItem.childCount())]
 
-		meshPrioritySmoothMeshItem = self.form.meshPriorityTreeView.findItems("Grid, " + groupName + ", SMOOTH MESH GROUP", QtCore.Qt.MatchExactly)[0]
+		meshPrioritySmoothMeshItem = [item for item in self.form.meshPriorityTreeView.findItems("Grid, " + groupName + ", ", QtCore.Qt.MatchStartsWith) if item.text(0).endswith(" MESH GROUP")][0]
 		meshPrioritySmoothMeshItemIndex = self.form.meshPriorityTreeView.invisibleRootItem().indexOfChild(meshPrioritySmoothMeshItem)
 		self.form.meshPriorityTreeView.invisibleRootItem().removeChild(meshPrioritySmoothMeshItem)
 
@@ -3276,6 +3385,10 @@ class ExportOpenEMSDialog(QtCore.QObject):
 		self.form.smoothMeshXMaxRes.setValue(0)
 		self.form.smoothMeshYMaxRes.setValue(0)
 		self.form.smoothMeshZMaxRes.setValue(0)
+		self.form.autoMeshXMaxRes.setValue(0)
+		self.form.autoMeshYMaxRes.setValue(0)
+		self.form.autoMeshZMaxRes.setValue(0)
+		self.form.autoMeshEdgeResDivider.setValue(4)
 		self.form.gridGenerateLinesInsideCheckbox.setChecked(False)
 		self.form.gridTopPriorityLinesCheckbox.setChecked(False)
 		self.form.gridOffsetX.setValue(0)
@@ -3326,6 +3439,17 @@ class ExportOpenEMSDialog(QtCore.QObject):
 			except:
 				pass
 
+		elif (currSetting.type == "Auto Mesh"):
+			try:
+				self.form.autoMeshRadioButton.click()
+
+				self.form.autoMeshXMaxRes.setValue(currSetting.autoMesh['xMaxRes'])
+				self.form.autoMeshYMaxRes.setValue(currSetting.autoMesh['yMaxRes'])
+				self.form.autoMeshZMaxRes.setValue(currSetting.autoMesh['zMaxRes'])
+				self.form.autoMeshEdgeResDivider.setValue(currSetting.autoMesh['edgeResDivider'])
+			except:
+				pass
+
 		elif (currSetting.type == "User Defined"):
 			self.form.userDefinedRadioButton.click()
 			self.form.userDefinedGridLinesTextInput.setPlainText(currSetting.userDefined['data'])
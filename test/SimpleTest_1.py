@@ -26,9 +26,9 @@ if __name__ == '__main__':
     #[appWindow.form.objectAssignmentLeftTreeWidget.topLevelItem(k).setSelected(True) for k in (3,4,8,9)]
 
     leftItems = []
-    leftItems.append(appWindow.form.objectAssignmentLeftTreeWidget.findItems("top part", QtCore.Qt.MatchExactly)[0])
-    leftItems.append(appWindow.form.objectAssignmentLeftTreeWidget.findItems("bottom part", QtCore.Qt.MatchExactly)[0])
-    [item.setSelected(True) for item in leftItems]
+    leftItems.append(appWindow.objectListModel.getIndexByLabel("top part"))
+    leftItems.append(appWindow.objectListModel.getIndexByLabel("bottom part"))
+    [appWindow.form.objectAssignmentLeftTreeWidget.selectionModel().select(index, QtCore.QItemSelectionModel.Select) for index in leftItems]
 
 
     materialCategoryItem = appWindow.form.objectAssignmentRightTreeWidget.findItems(
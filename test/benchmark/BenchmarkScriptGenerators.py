@@ -0,0 +1,203 @@
+#   author: Lubomir Jagos
+#
+#   Benchmark of openEMS script generators on synthetic document, runs without FreeCAD.
+#
+#   Document is fabricated by MockCadInterface and simulation settings are put into hidden dialog form same way as when they are
+#   loaded from .ini file, then PythonScriptLinesGenerator2 and OctaveScriptLinesGenerator2 generate scripts and wall time and
+#   peak python memory are reported.
+#
+#   Example:
+#       python test/benchmark/BenchmarkScriptGenerators.py --boxes 500 --sketches 20 --sketch-points 2000 --output results.json
+#       python test/benchmark/BenchmarkScriptGenerators.py --boxes 500 --sketches 20 --sketch-points 2000 --baseline results.json
+#
+#   With --baseline script exits with code 1 if some generator median time or peak memory is worse than baseline by more than --tolerance.
+#
+#   Requirements: FreeCAD is not needed, but settings are put into hidden dialog form, so PySide with QtWidgets and QtUiTools is needed,
+#   Qt modules are imported after arguments are parsed, so --help works also without them.
+#
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import contextlib
+
+currentdir = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(os.path.dirname(currentdir))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, currentdir)
+
+from utilsOpenEMS.SettingsItem.ExcitationSettingsItem import ExcitationSettingsItem
+from utilsOpenEMS.SettingsItem.MaterialSettingsItem import MaterialSettingsItem
+from utilsOpenEMS.SettingsItem.GridSettingsItem import GridSettingsItem
+from utilsOpenEMS.SettingsItem.PortSettingsItem import PortSettingsItem
+from utilsOpenEMS.SettingsItem.FreeCADSettingsItem import FreeCADSettingsItem
+
+REQUIREMENTS_HELP = "Benchmark needs PySide with QtWidgets and QtUiTools (as shipped with FreeCAD), settings are put into hidden dialog form " \
+                    "created offscreen from ui/dialog.ui, FreeCAD itself is not needed."
+
+def importBenchmarkModules():
+    """
+    Import headless simulation model and mock CAD interface, both need Qt modules, exit with message describing requirements if they are missing.
+    :return: HeadlessSimulationModel class, MockCadInterface class
+    """
+    try:
+        from utilsOpenEMS.Headless.HeadlessSimulationModel import HeadlessSimulationModel
+        from MockCadInterface import MockCadInterface
+    except ImportError as e:
+        sys.exit(f"ERROR: cannot import Qt modules needed by benchmark ({e}).\n{REQUIREMENTS_HELP}")
+    return HeadlessSimulationModel, MockCadInterface
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(description="Benchmark openEMS script generators on synthetic document.", epilog=REQUIREMENTS_HELP)
+    parser.add_argument("--boxes", type=int, default=200, help="number of solid boxes exported as STL")
+    parser.add_argument("--sketches", type=int, default=10, help="number of closed sketches")
+    parser.add_argument("--sketch-points", type=int, default=200, help="number of vertices of each sketch")
+    parser.add_argument("--edges", type=int, default=10, help="number of discretized edges")
+    parser.add_argument("--edge-points", type=int, default=1000, help="number of points of each discretized edge")
+    parser.add_argument("--ports", type=int, default=4, help="number of lumped ports")
+    parser.add_argument("--grids", type=int, default=3, help="number of fixed distance grids, each is assigned to one box")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of each generator")
+    parser.add_argument("--generators", choices=["octave", "python", "both"], default="both")
+    parser.add_argument("--output", default=None, help="write results into .json file")
+    parser.add_argument("--baseline", default=None, help="compare results with .json file written by --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression against baseline (default: 0.2)")
+    parser.add_argument("--section-cache", action="store_true", help="keep section cache enabled, repeated runs then measure regeneration of unchanged document")
+    parser.add_argument("--verbose", action="store_true", help="don't suppress generators console output")
+    return parser.parse_args(argv)
+
+def addAssignedObject(form, category, settingsName, objLabel, priorityTreeView=None):
+    """
+    Assign object to settings item in object assignment tree and optionally add it into priority list, same as IniFile0v1.read() does.
+    """
+    from PySide import QtCore, QtWidgets
+
+    targetGroup = form.objectAssignmentRightTreeWidget.findItems(category, QtCore.Qt.MatchExactly)[0]
+    for k in range(targetGroup.childCount()):
+        if targetGroup.child(k).text(0) == settingsName:
+            treeItem = QtWidgets.QTreeWidgetItem([objLabel])
+            treeItem.setData(0, QtCore.Qt.UserRole, FreeCADSettingsItem(objLabel))
+            targetGroup.child(k).addChild(treeItem)
+            break
+
+    if priorityTreeView is not None:
+        priorityName = f"{category}, {settingsName}, {objLabel}"
+        priorityItem = QtWidgets.QTreeWidgetItem([priorityName])
+        priorityItem.setData(0, QtCore.Qt.UserRole, priorityName.split(", "))
+        priorityTreeView.insertTopLevelItem(0, priorityItem)
+
+def buildDocument(args, model, cadHelpers):
+    form = model.form
+
+    model.guiHelpers.addSettingsItemGui(ExcitationSettingsItem(name="excitation", type="gaussian", gaussian={'f0': 2, 'fc': 1}, units="GHz"))
+
+    model.guiHelpers.addSettingsItemGui(MaterialSettingsItem(name="metal", type="metal"))
+    model.guiHelpers.addSettingsItemGui(MaterialSettingsItem(name="substrate", type="userdefined", constants={'epsilon': 4.4, 'mue': 1.0, 'kappa': 0.0, 'sigma': 0.0}))
+
+    for k in range(args.boxes):
+        obj = cadHelpers.addBox(f"box {k}", k, 0, 0, k + 0.8, 1, 1)
+        addAssignedObject(form, "Material", "metal" if k % 2 == 0 else "substrate", obj.Label, form.objectAssignmentPriorityTreeView)
+
+    for k in range(args.sketches):
+        obj = cadHelpers.addSketch(f"sketch {k}", args.sketch_points, radius=10.0 + k, z=2.0)
+        addAssignedObject(form, "Material", "metal", obj.Label, form.objectAssignmentPriorityTreeView)
+
+    for k in range(args.edges):
+        obj = cadHelpers.addDiscretizedEdge(f"edge {k}", args.edge_points, radius=5.0 + k)
+        addAssignedObject(form, "Material", "metal", obj.Label, form.objectAssignmentPriorityTreeView)
+
+    for k in range(args.ports):
+        model.guiHelpers.addSettingsItemGui(PortSettingsItem(name=f"port {k}", type="lumped", R="50", RUnits="Ohm", isActive=(k == 0), direction="z"))
+        obj = cadHelpers.addBox(f"port box {k}", k, 1, 0, k + 0.2, 1.2, 1)
+        addAssignedObject(form, "Port", f"port {k}", obj.Label, form.objectAssignmentPriorityTreeView)
+
+    for k in range(min(args.grids, max(args.boxes, 1))):
+        model.guiHelpers.addSettingsItemGui(GridSettingsItem(name=f"grid {k}", type="Fixed Distance", fixedDistance={'x': 0.1*(k+1), 'y': 0.1*(k+1), 'z': 0.1*(k+1)},
+                                                             units="mm", xenabled=True, yenabled=True, zenabled=True))
+        addAssignedObject(form, "Grid", f"grid {k}", f"box {k}", form.meshPriorityTreeView)
+
+def runGenerator(generator, outputDir, verbose):
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        generator.generateOpenEMSScript(outputDir)
+
+def getScriptSize(outputDir):
+    return sum([os.path.getsize(os.path.join(outputDir, fileName)) for fileName in os.listdir(outputDir) if fileName.endswith((".m", ".py"))])
+
+def benchmarkGenerator(args, generator, outputDir):
+    times = []
+    for k in range(args.repeat):
+        startTime = time.perf_counter()
+        runGenerator(generator, outputDir, args.verbose)
+        times.append(time.perf_counter() - startTime)
+
+    #
+    #   memory is measured in separate run as tracemalloc slows down execution
+    #
+    tracemalloc.start()
+    runGenerator(generator, outputDir, args.verbose)
+    currentMemory, peakMemory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "timeMin": min(times),
+        "timeMedian": statistics.median(times),
+        "peakMemory": peakMemory,
+        "scriptBytes": getScriptSize(outputDir),
+    }
+
+def compareWithBaseline(results, baselineFileName, tolerance):
+    with open(baselineFileName, "r", encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for generatorName, result in results["generators"].items():
+        baselineResult = baseline.get("generators", {}).get(generatorName, None)
+        if baselineResult is None:
+            continue
+        for key in ("timeMedian", "peakMemory"):
+            if result[key] > baselineResult[key] * (1 + tolerance):
+                regressions.append(f"{generatorName} {key}: {result[key]:.4g} > baseline {baselineResult[key]:.4g}")
+    return regressions
+
+def main(argv):
+    args = parseArguments(argv)
+    HeadlessSimulationModel, MockCadInterface = importBenchmarkModules()
+
+    with tempfile.TemporaryDirectory() as workDir:
+        model = HeadlessSimulationModel(APP_DIR)
+        cadHelpers = MockCadInterface(APP_DIR, os.path.join(workDir, "benchmark.FCStd"))
+        buildDocument(args, model, cadHelpers)
+
+        generatorNames = ["octave", "python"] if args.generators == "both" else [args.generators]
+        results = {"document": {key: getattr(args, key) for key in ("boxes", "sketches", "sketch_points", "edges", "edge_points", "ports", "grids")}, "generators": {}}
+        for generatorName in generatorNames:
+            generator = model.scriptGenerators[generatorName]
+            generator.cadHelpers = cadHelpers
+            generator.sectionCacheEnabled = args.section_cache
+            outputDir = os.path.join(workDir, generatorName)
+            results["generators"][generatorName] = benchmarkGenerator(args, generator, outputDir)
+
+    print(f"{'generator':<10} {'min [s]':>10} {'median [s]':>12} {'peak memory [MB]':>18} {'script [kB]':>12}")
+    for generatorName, result in results["generators"].items():
+        print(f"{generatorName:<10} {result['timeMin']:>10.3f} {result['timeMedian']:>12.3f} {result['peakMemory']/1024/1024:>18.2f} {result['scriptBytes']/1024:>12.1f}")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline is not None:
+        regressions = compareWithBaseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
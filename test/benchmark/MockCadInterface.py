@@ -0,0 +1,142 @@
+#   author: Lubomir Jagos
+#
+#   Synthetic CAD backend for benchmarking script generators without FreeCAD, objects have just members which generators read
+#   (Name, Label, Shape with BoundBox, Vertexes, OrderedVertexes, Faces, discretized edge Points, sketch OpenVertices).
+#
+import os
+import math
+import struct
+
+from utilsOpenEMS.GuiHelpers.CadInterface import CadInterface
+
+class MockVector:
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+class MockVertex:
+    def __init__(self, X, Y, Z):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+
+class MockBoundBox:
+    def __init__(self, XMin, YMin, ZMin, XMax, YMax, ZMax):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.ZMin = ZMin
+        self.XMax = XMax
+        self.YMax = YMax
+        self.ZMax = ZMax
+
+    @property
+    def XLength(self):
+        return self.XMax - self.XMin
+
+    @property
+    def YLength(self):
+        return self.YMax - self.YMin
+
+    @property
+    def ZLength(self):
+        return self.ZMax - self.ZMin
+
+    def __repr__(self):
+        return f"BoundBox ({self.XMin}, {self.YMin}, {self.ZMin}, {self.XMax}, {self.YMax}, {self.ZMax})"
+
+class MockFace:
+    def __init__(self, vertexes):
+        self.Vertexes = vertexes
+
+class MockShape:
+    def __init__(self, vertexes, faces=None):
+        self.Vertexes = vertexes
+        self.OrderedVertexes = vertexes
+        self.Faces = [] if faces is None else faces
+        self.BoundBox = MockBoundBox(
+            min([v.X for v in vertexes]), min([v.Y for v in vertexes]), min([v.Z for v in vertexes]),
+            max([v.X for v in vertexes]), max([v.Y for v in vertexes]), max([v.Z for v in vertexes])
+        )
+
+class MockObject:
+    def __init__(self, name, label, shape, points=None, openVertices=None):
+        self.Name = name
+        self.Label = label
+        self.Shape = shape
+        self.Points = [] if points is None else points
+        self.OpenVertices = [] if openVertices is None else openVertices
+        self.Geometry = []
+
+class MockCadInterface(CadInterface):
+    """
+    CAD interface serving synthetic document, STL export writes box made of 12 triangles for each exported object.
+    """
+
+    def __init__(self, APP_DIR="", documentFileName="benchmark.FCStd"):
+        super(MockCadInterface, self).__init__(APP_DIR)
+        self.type = "Mock"
+        self.documentFileName = documentFileName
+        self.objects = []
+        self.objectsCounters = {}
+
+    def getNextObjectName(self, baseName):
+        self.objectsCounters[baseName] = self.objectsCounters.get(baseName, 0) + 1
+        return f"{baseName}{self.objectsCounters[baseName]:03d}"
+
+    def addBox(self, label, XMin, YMin, ZMin, XMax, YMax, ZMax):
+        corners = [MockVertex(x, y, z) for x in (XMin, XMax) for y in (YMin, YMax) for z in (ZMin, ZMax)]
+        faces = [
+            MockFace([v for v in corners if v.X == XMin]), MockFace([v for v in corners if v.X == XMax]),
+            MockFace([v for v in corners if v.Y == YMin]), MockFace([v for v in corners if v.Y == YMax]),
+            MockFace([v for v in corners if v.Z == ZMin]), MockFace([v for v in corners if v.Z == ZMax]),
+        ]
+        obj = MockObject(self.getNextObjectName("Box"), label, MockShape(corners, faces))
+        self.objects.append(obj)
+        return obj
+
+    def addSketch(self, label, pointsCount, radius=10.0, z=0.0):
+        """
+        Closed polygon sketch in XY plane.
+        """
+        vertexes = [MockVertex(radius*math.cos(2*math.pi*k/pointsCount), radius*math.sin(2*math.pi*k/pointsCount), z) for k in range(pointsCount)]
+        obj = MockObject(self.getNextObjectName("Sketch"), label, MockShape(vertexes, [MockFace(vertexes)]))
+        self.objects.append(obj)
+        return obj
+
+    def addDiscretizedEdge(self, label, pointsCount, radius=5.0, pitch=1.0):
+        """
+        Helix curve.
+        """
+        points = [MockVector(radius*math.cos(0.1*k), radius*math.sin(0.1*k), pitch*0.1*k/(2*math.pi)) for k in range(pointsCount)]
+        vertexes = [MockVertex(p.x, p.y, p.z) for p in points]
+        obj = MockObject(self.getNextObjectName("Discretized_Edge"), label, MockShape(vertexes), points=points)
+        self.objects.append(obj)
+        return obj
+
+    def getObjects(self):
+        return self.objects
+
+    def getObjectsByLabel(self, objLabel):
+        return [obj for obj in self.objects if obj.Label == objLabel]
+
+    def getObjectById(self, objId):
+        for obj in self.objects:
+            if obj.Name == objId:
+                return obj
+        return None
+
+    def getCurrDocumentFileName(self):
+        return self.documentFileName
+
+    def getObjectGeometryKey(self, obj, brepProvider=None):
+        return (obj.Name, tuple([(v.X, v.Y, v.Z) for v in obj.Shape.Vertexes]), tuple([(p.x, p.y, p.z) for p in obj.Points]))
+
+    def exportSTL(self, partToExport, exportFileName):
+        with open(exportFileName, "wb") as f:
+            f.write(b"\0" * 80)
+            f.write(struct.pack("<I", 12 * len(partToExport)))
+            for obj in partToExport:
+                bb = obj.Shape.BoundBox
+                for k in range(12):
+                    f.write(struct.pack("<12fH", 0, 0, 0, bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax, 0))
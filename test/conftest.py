@@ -0,0 +1,12 @@
+#   author: Lubomir Jagos
+#
+#   pytest configuration, plugin modules are imported from repository root and synthetic CAD backend from test/benchmark.
+#
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(TEST_DIR, "benchmark"))
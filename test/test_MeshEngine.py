@@ -0,0 +1,102 @@
+#   author: Lubomir Jagos
+#
+#   Tests of native mesh engine, plain numpy, no Qt or FreeCAD needed.
+#
+import numpy as np
+
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine, IntervalSet
+
+def getMaxNeighbourRatio(lines):
+    cells = np.diff(lines)
+    return float(np.max(np.maximum(cells[1:] / cells[:-1], cells[:-1] / cells[1:])))
+
+def test_intervalSetMergesOverlappingAndTouchingIntervals():
+    intervals = IntervalSet()
+    intervals.add(5, 6)
+    intervals.add(0, 1)
+    intervals.add(1, 2)
+    intervals.add(5.5, 8)
+    np.testing.assert_array_equal(intervals.starts, [0, 5])
+    np.testing.assert_array_equal(intervals.stops, [2, 8])
+
+    intervals.add(1.5, 5)
+    np.testing.assert_array_equal(intervals.starts, [0])
+    np.testing.assert_array_equal(intervals.stops, [8])
+
+def test_intervalSetContainsIncludesBoundaries():
+    intervals = IntervalSet()
+    assert not intervals.contains([0, 1]).any()
+
+    intervals.add(0, 1)
+    intervals.add(3, 4)
+    np.testing.assert_array_equal(intervals.contains([-1, 0, 0.5, 1, 2, 3, 4, 5]), [False, True, True, True, False, True, True, False])
+
+def test_smoothMeshLinesKeepsLinesAndLimitsCellSize():
+    fixedLines = [0, 0.1, 10, 10.5, 30]
+    lines = MeshEngine.smoothMeshLines(fixedLines, 2.0)
+
+    assert np.all(np.isin(fixedLines, lines))
+    assert np.all(np.diff(lines) > 0)
+    assert np.max(np.diff(lines)) <= 2.0 * (1 + 1e-9)
+    assert getMaxNeighbourRatio(lines) <= 1.5 * (1 + MeshEngine.RATIO_WARNING_TOLERANCE)
+
+def test_smoothMeshLinesLeavesDenseLinesUntouched():
+    fixedLines = [0, 1, 2, 3]
+    np.testing.assert_array_equal(MeshEngine.smoothMeshLines(fixedLines, 2.0), fixedLines)
+    np.testing.assert_array_equal(MeshEngine.smoothMeshLines([1.0], 2.0), [1.0])
+
+def test_smoothRangeSpreadsRatioOverShortInterval(capsys):
+    #
+    #   big cell on one side and small one on the other, interval is too short to grade between them by 1.5
+    #
+    lines = MeshEngine.smoothMeshLines([87.051, 95.628, 95.724], 8.565)
+
+    assert np.max(np.diff(lines)) <= 8.565 * (1 + 1e-9)
+    assert getMaxNeighbourRatio(lines[lines <= 95.724]) < 2.1
+    output = capsys.readouterr().out
+    assert output.count("Smooth mesh warning") == 1
+
+def test_smoothMeshWarningNotPrintedWhenRatioIsMet(capsys):
+    MeshEngine.smoothMeshLines([0, 1, 2, 50, 51], 4.0)
+    assert capsys.readouterr().out == ""
+
+def test_smoothMeshWarningsAreSummarized(capsys):
+    #
+    #   each block has tiny cell followed by interval too short to grade up to max resolution cell of next interval
+    #
+    fixedLines = np.concatenate([[50.0*k, 50.0*k + 0.001, 50.0*k + 12] for k in range(5)])
+    MeshEngine.smoothMeshLines(fixedLines, 10.0)
+    output = capsys.readouterr().out
+    assert output.count("Smooth mesh warning") == 1
+    assert "5 interval(s)" in output
+
+def test_gradeLinesFillsCellsBiggerThanRatioOfNeighbour(capsys):
+    fixedLines = [0, 0.1, 0.2, 3]
+    lines = MeshEngine.gradeLines(fixedLines)
+
+    assert np.all(np.isin(fixedLines, lines))
+    assert getMaxNeighbourRatio(lines) <= 1.5 * (1 + 1e-9)
+    assert capsys.readouterr().out == ""
+
+def test_gradeLinesReportsJustFinalRatio(capsys):
+    lines = MeshEngine.gradeLines([0, 0.1, 0.2, 2])
+
+    output = capsys.readouterr().out
+    assert output.count("Smooth mesh warning") == 1
+    assert f"worst used ratio {getMaxNeighbourRatio(lines):.3g}" in output
+
+def test_removeCloseLinesRemovesEverySecondCloseLine():
+    np.testing.assert_allclose(MeshEngine.removeCloseLines([0, 0.05, 0.1, 0.15, 1, 2], 0.06), [0, 0.1, 1, 2])
+    np.testing.assert_allclose(MeshEngine.removeCloseLines([0, 1, 2], 0.5), [0, 1, 2])
+
+    lines = MeshEngine.removeCloseLines(np.linspace(0, 1, 101), 0.025)
+    assert np.min(np.diff(lines)) > 0.025
+
+def test_decimateLinesKeepsEndsAndLimitsCount():
+    lines = np.concatenate((np.linspace(0, 1, 1000), np.linspace(2, 100, 50)))
+    decimated = MeshEngine.decimateLines(lines, 100)
+
+    assert len(decimated) <= 100
+    assert decimated[0] == 0 and decimated[-1] == 100
+    assert np.all(np.isin(decimated, lines))
+    np.testing.assert_array_equal(MeshEngine.decimateLines([0, 1, 2], 100), [0, 1, 2])
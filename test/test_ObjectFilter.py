@@ -0,0 +1,43 @@
+#   author: Lubomir Jagos
+#
+#   Tests of object label filter, no Qt or FreeCAD needed.
+#
+from utilsOpenEMS.GuiHelpers.ObjectFilter import ObjectFilter
+
+class LabeledObject:
+    def __init__(self, Label):
+        self.Label = Label
+
+def test_emptyFilterMatchesAll():
+    objectFilter = ObjectFilter("", "Regex")
+    assert objectFilter.isEmpty()
+    assert objectFilter.isMatching("anything")
+
+def test_regexIsSearchedCaseInsensitive():
+    objectFilter = ObjectFilter("port.*y", "Regex")
+    assert objectFilter.isMatching("portXY")
+    assert objectFilter.isMatching("my PORT y")
+    assert not objectFilter.isMatching("portX")
+
+def test_invalidRegexIsUsedAsSubstring(capsys):
+    objectFilter = ObjectFilter("port[", "Regex")
+    assert objectFilter.isMatching("PORT[1]")
+    assert not objectFilter.isMatching("port1")
+    assert "not valid regular expression" in capsys.readouterr().out
+
+def test_substringDoesNotInterpretSpecialCharacters():
+    objectFilter = ObjectFilter("a.b", "Substring")
+    assert objectFilter.isMatching("xA.By")
+    assert not objectFilter.isMatching("aXb")
+
+def test_globMatchesWholeLabel():
+    objectFilter = ObjectFilter("port*", "Glob")
+    assert objectFilter.isMatching("Port 1")
+    assert not objectFilter.isMatching("my port")
+    assert ObjectFilter("box?", "Glob").isMatching("box1")
+    assert not ObjectFilter("box?", "Glob").isMatching("box12")
+
+def test_filterObjectsKeepsOrder():
+    objects = [LabeledObject(label) for label in ["port 2", "box", "port 1"]]
+    assert [obj.Label for obj in ObjectFilter("port", "Substring").filterObjects(objects)] == ["port 2", "port 1"]
+    assert ObjectFilter("", "Glob").filterObjects(objects) == objects
@@ -0,0 +1,83 @@
+#   author: Lubomir Jagos
+#
+#   Tests of script generators on synthetic document, settings are put into hidden dialog form of headless model, so PySide with
+#   QtUiTools is needed, tests are skipped without it.
+#
+import os
+import pytest
+import numpy as np
+
+pytest.importorskip("PySide")
+headless = pytest.importorskip("utilsOpenEMS.Headless.HeadlessSimulationModel")
+
+from conftest import APP_DIR
+from utilsOpenEMS.SettingsItem.ExcitationSettingsItem import ExcitationSettingsItem
+from utilsOpenEMS.SettingsItem.GridSettingsItem import GridSettingsItem
+from utilsOpenEMS.SettingsItem.MaterialSettingsItem import MaterialSettingsItem
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine
+
+from MockCadInterface import MockCadInterface
+from BenchmarkScriptGenerators import addAssignedObject
+
+#
+#   speed of light as defined in openEMS.physical_constants, generated python script computes max_res with it
+#
+C0 = 299792458
+
+@pytest.fixture
+def model(tmp_path):
+    model = headless.HeadlessSimulationModel(APP_DIR)
+    model.cadHelpers = MockCadInterface(APP_DIR, str(tmp_path / "test.FCStd"))
+    for generator in model.scriptGenerators.values():
+        generator.cadHelpers = model.cadHelpers
+    return model
+
+def addSmoothMeshDocument(model):
+    model.guiHelpers.addSettingsItemGui(ExcitationSettingsItem(name="excitation", type="gaussian", gaussian={'f0': 2, 'fc': 1}, units="GHz"))
+    model.guiHelpers.addSettingsItemGui(GridSettingsItem(name="smooth", type="Smooth Mesh", units="mm", xenabled=True, yenabled=True, zenabled=True))
+    for k in range(3):
+        obj = model.cadHelpers.addBox(f"box {k}", 30*k, 0, 0, 30*k + 7.5, 2, 0.5)
+        addAssignedObject(model.form, "Grid", "smooth", obj.Label, model.form.meshPriorityTreeView)
+
+def test_pythonSmoothMeshUsesRuntimeMaxResOfGaussianExcitation(model):
+    addSmoothMeshDocument(model)
+    generator = model.scriptGenerators["python"]
+    generator.initGenerationCaches()
+
+    #
+    #   max_res is evaluated from excitation lines same way as generated script does it, then lines are smoothed as by
+    #   SmoothMeshLines(smoothMesh.x, max_res/unit) in script before grid was resolved in plugin
+    #
+    scriptVariables = {"C0": C0}
+    exec(generator.getExcitationScriptLines(definitionsOnly=True), scriptVariables)
+    runtimeMaxRes = scriptVariables["max_res"] / generator.getUnitLengthFromUI_m()
+    assert runtimeMaxRes == pytest.approx(C0 / 3e9 / 20 / generator.getUnitLengthFromUI_m())
+
+    gridItem, gridSettingsInst = generator.getCategoryItems("Grid")[0]
+    smoothMeshLines = generator.getSmoothMeshLines(gridItem, gridSettingsInst)
+    assert sorted(smoothMeshLines.keys()) == ["x", "y", "z"]
+    for axis, (fixedLines, lines) in smoothMeshLines.items():
+        np.testing.assert_allclose(lines, MeshEngine.smoothMeshLines(fixedLines, runtimeMaxRes))
+        assert np.diff(lines).max() <= runtimeMaxRes * (1 + 1e-9)
+
+def test_sectionCacheHitWhenSameModelIsGeneratedAgain(model, tmp_path):
+    addSmoothMeshDocument(model)
+    model.guiHelpers.addSettingsItemGui(MaterialSettingsItem(name="metal", type="metal"))
+    for k in range(3):
+        addAssignedObject(model.form, "Material", "metal", f"box {k}", model.form.objectAssignmentPriorityTreeView)
+
+    for generatorName, generator in model.scriptGenerators.items():
+        generator.sectionCacheEnabled = True
+        generator.sectionCache.clear()
+        outputDir = str(tmp_path / generatorName)
+
+        generator.generateOpenEMSScript(outputDir)
+        missesCount = generator.sectionCache.missesCount
+        hitsCount = generator.sectionCache.hitsCount
+        scriptFiles = {fileName: open(os.path.join(outputDir, fileName)).read() for fileName in os.listdir(outputDir) if fileName.endswith((".py", ".m"))}
+
+        generator.generateOpenEMSScript(outputDir)
+        assert generator.sectionCache.missesCount == missesCount, generatorName
+        assert generator.sectionCache.hitsCount > hitsCount, generatorName
+        for fileName, text in scriptFiles.items():
+            assert open(os.path.join(outputDir, fileName)).read() == text
@@ -0,0 +1,53 @@
+#   author: Lubomir Jagos
+#
+#   Tests of script output buffer, no Qt or FreeCAD needed.
+#
+import pytest
+
+from utilsOpenEMS.ScriptLinesGenerator.ScriptWriter import ScriptWriter
+
+def test_inMemoryWriterCollectsText():
+    writer = ScriptWriter()
+    writer.write("a = 1\n")
+    writer += "b = 2\n"
+    writer += ""
+    assert writer.getvalue() == "a = 1\nb = 2\n"
+    assert writer.writtenLength == 12
+    writer.close()
+
+def test_fileIsFlushedAndRenamedOnClose(tmp_path):
+    fileName = str(tmp_path / "script.py")
+    with ScriptWriter(fileName, bufferSize=4) as writer:
+        writer += "first line\n"
+        assert writer.getvalue() == ""
+        writer += "x"
+        assert not (tmp_path / "script.py").exists()
+    assert (tmp_path / "script.py").read_text(encoding="utf-8") == "first line\nx"
+    assert not (tmp_path / "script.py.part").exists()
+
+def test_failedGenerationKeepsPreviousScript(tmp_path):
+    fileName = tmp_path / "script.py"
+    fileName.write_text("previous", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with ScriptWriter(str(fileName)) as writer:
+            writer += "new"
+            raise RuntimeError("generation failed")
+    assert fileName.read_text(encoding="utf-8") == "previous"
+    assert not (tmp_path / "script.py.part").exists()
+
+def test_captureReturnsTextWrittenSinceStart():
+    writer = ScriptWriter()
+    writer += "before\n"
+    writer.startCapture()
+    writer += "section\n"
+    assert writer.stopCapture() == "section\n"
+    writer += "after\n"
+    assert writer.getvalue() == "before\nsection\nafter\n"
+
+def test_captureIsDroppedWhenExceedingMaxLength():
+    writer = ScriptWriter()
+    writer.startCapture(maxLength=5)
+    writer += "12345"
+    writer += "6"
+    assert writer.stopCapture() is None
+    assert writer.getvalue() == "123456"
@@ -0,0 +1,57 @@
+#   author: Lubomir Jagos
+#
+#   Tests of generated sections cache, no Qt or FreeCAD needed.
+#
+from utilsOpenEMS.ScriptLinesGenerator.SectionCache import SectionCache
+
+class GeneratorState:
+    def __init__(self):
+        self.internalPortIndexNamesList = {"port 1": 1}
+        self.internalMaterialIndexNamesList = {}
+        self.internalNF2FFIndexNamesList = {}
+        self.maxGridResolution_m = 0.01
+
+def test_lookupHitsJustForSameInputs():
+    cache = SectionCache()
+    assert cache.lookup("ports", "key1") is None
+
+    cache.store("ports", "key1", "port lines\n", {}, [])
+    assert cache.lookup("ports", "key1").scriptLines == "port lines\n"
+    assert cache.lookup("ports", "key2") is None
+    assert cache.lookup("materials", "key1") is None
+    assert (cache.hitsCount, cache.missesCount) == (1, 3)
+
+def test_lookupMissesWhenOutputFileIsMissing(tmp_path):
+    outputFile = tmp_path / "object.stl"
+    outputFile.write_text("solid", encoding="utf-8")
+    cache = SectionCache()
+    cache.store("materials", "key", "material lines\n", {}, [str(outputFile)])
+    assert cache.lookup("materials", "key") is not None
+
+    outputFile.unlink()
+    assert cache.lookup("materials", "key") is None
+
+def test_clearRemovesEntries():
+    cache = SectionCache()
+    cache.store("ports", "key", "port lines\n", {}, [])
+    cache.clear()
+    assert cache.lookup("ports", "key") is None
+
+def test_stateIsCopiedAndRestored():
+    cache = SectionCache()
+    generator = GeneratorState()
+    state = cache.getState(generator)
+    stateKey = cache.getStateKey(generator)
+
+    generator.internalPortIndexNamesList["port 2"] = 2
+    generator.maxGridResolution_m = 0.02
+    assert state["internalPortIndexNamesList"] == {"port 1": 1}
+    assert cache.getStateKey(generator) != stateKey
+
+    cache.restoreState(generator, state)
+    assert generator.internalPortIndexNamesList == {"port 1": 1}
+    assert generator.maxGridResolution_m == 0.01
+    assert cache.getStateKey(generator) == stateKey
+
+    generator.internalPortIndexNamesList["port 3"] = 3
+    assert state["internalPortIndexNamesList"] == {"port 1": 1}
@@ -0,0 +1,54 @@
+#   author: Lubomir Jagos
+#
+#   Tests of simulation cost estimate, no Qt or FreeCAD needed.
+#
+import math
+import pytest
+import numpy as np
+
+from utilsOpenEMS.ScriptLinesGenerator.SimulationCostEstimator import SimulationCostEstimator
+from utilsOpenEMS.SettingsItem.ExcitationSettingsItem import ExcitationSettingsItem
+
+def getMeshLines():
+    return {"x": np.linspace(0, 10, 11), "y": np.linspace(0, 20, 41), "z": [0, 0.25, 1, 2]}
+
+def test_estimateCellsTimestepAndMemory():
+    estimate = SimulationCostEstimator(cellsPerSecond=1e6).estimate(getMeshLines(), 1e-3, "rectangular", 1000)
+
+    assert estimate["cellsCount"] == {"x": 10, "y": 40, "z": 3}
+    assert estimate["totalCells"] == 1200
+    assert estimate["smallestCell_m"] == pytest.approx({"x": 1e-3, "y": 0.5e-3, "z": 0.25e-3})
+    expectedTimestep = 1.0 / (SimulationCostEstimator.C0 * math.sqrt(1/1e-3**2 + 1/0.5e-3**2 + 1/0.25e-3**2))
+    assert estimate["timestep_s"] == pytest.approx(expectedTimestep)
+    assert estimate["memory_B"] == 1200 * SimulationCostEstimator.BYTES_PER_CELL
+    assert estimate["maxRuntime_s"] == pytest.approx(1200 * 1000 / 1e6)
+
+def test_estimateWithoutExcitationRunsMaxTimesteps():
+    estimate = SimulationCostEstimator(cellsPerSecond=1e6).estimate(getMeshLines(), 1e-3, "rectangular", 1000)
+    assert estimate["excitationDurationTimesteps"] == 1000
+    assert estimate["minRuntime_s"] == estimate["maxRuntime_s"]
+
+def test_estimateGaussianExcitationIsLowerBoundOfTimesteps():
+    excitation = ExcitationSettingsItem(name="excitation", type="gaussian", gaussian={'f0': 2, 'fc': 1}, units="GHz")
+    assert SimulationCostEstimator.getExcitationLength_s(excitation) == pytest.approx(9.0 / (math.pi * 1e9))
+
+    estimate = SimulationCostEstimator(cellsPerSecond=1e6).estimate(getMeshLines(), 1e-3, "rectangular", 100000, excitation)
+    expectedTimesteps = int(math.floor(9.0 / (math.pi * 1e9) / estimate["timestep_s"])) + 1
+    assert estimate["excitationDurationTimesteps"] == expectedTimesteps
+    assert estimate["minRuntime_s"] < estimate["maxRuntime_s"]
+
+    report = SimulationCostEstimator.getReport(estimate)
+    assert f"Timesteps: {expectedTimesteps:,} to 100,000" in report
+
+def test_estimateCylindricalUsesArcOnSmallestRadius():
+    meshLines = {"x": [0, 2, 4], "y": np.linspace(0, math.pi, 7), "z": [0, 1]}
+    estimate = SimulationCostEstimator(cellsPerSecond=1e6).estimate(meshLines, 1.0, "cylindrical", 1000)
+    assert estimate["smallestCell_m"]["y"] == pytest.approx(2 * math.pi / 6)
+
+def test_estimateNeedsTwoLinesInEachAxis():
+    assert SimulationCostEstimator(cellsPerSecond=1e6).estimate({"x": [0, 1], "y": [0], "z": [0, 1]}, 1e-3, "rectangular", 1000) is None
+
+def test_formatDuration():
+    assert SimulationCostEstimator.formatDuration(12.34) == "12.3 s"
+    assert SimulationCostEstimator.formatDuration(90) == "1.5 min"
+    assert SimulationCostEstimator.formatDuration(5400) == "1.5 h"
@@ -0,0 +1,39 @@
+#   author: Lubomir Jagos
+#
+#
+class AuxGridLines:
+    """
+    Auxiliary grid lines collected before they are drawn into 3D view. Lines are kept per group, by default grid axis (axis which
+    coordinate they show), final mesh preview groups them by plane ("xy", "xz", "yz"). CAD interface draws each group as one object
+    by drawAuxGrid() instead of creating one document object for each line.
+    """
+
+    AXES = ("x", "y", "z")
+
+    def __init__(self):
+        self.lines = {axis: [] for axis in AuxGridLines.AXES}
+        self.circles = {axis: [] for axis in AuxGridLines.AXES}
+
+    def addLine(self, axis, p1Array, p2Array):
+        """
+        :param axis: grid axis or group which line belongs to
+        :param p1Array: line start point [x, y, z]
+        :param p2Array: line end point [x, y, z]
+        """
+        self.lines.setdefault(axis, []).append((tuple(p1Array), tuple(p2Array)))
+
+    def addCircle(self, axis, centerArray, radius):
+        """
+        Circle in XY plane, used for radius lines of cylindrical grid.
+        """
+        self.circles.setdefault(axis, []).append((tuple(centerArray), radius))
+
+    def getGroups(self):
+        """
+        :return: list of groups which have some lines or circles
+        """
+        groups = list(self.lines.keys()) + [group for group in self.circles.keys() if group not in self.lines]
+        return [group for group in groups if len(self.lines.get(group, [])) + len(self.circles.get(group, [])) > 0]
+
+    def getLinesCount(self):
+        return sum([len(self.lines.get(group, [])) + len(self.circles.get(group, [])) for group in self.getGroups()])
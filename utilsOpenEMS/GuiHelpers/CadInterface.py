@@ -4,6 +4,8 @@ import os
 import PySide.QtWidgets
 from PySide import QtGui, QtCore, QtWidgets, QtUiTools
 
+from utilsOpenEMS.GuiHelpers.ObjectFilter import ObjectFilter
+
 class CadInterface:
     def __init__(self, APP_DIR=""):
         self.type = "None"
@@ -62,18 +64,14 @@ class CadInterface:
     #   CAD SPECIFIC FUNCTIONS
     ###############################################################################################################################
 
-    def getOpenEMSObjects(self, filterStr=""):
-        currentObjects = self.getObjects()
-
-        objToExport = []
-
-        for obj in currentObjects:
-            if (len(filterStr) > 0 and re.search(filterStr, obj.Label, re.IGNORECASE)):
-                objToExport.append(obj)
-            elif (len(filterStr) == 0):
-                objToExport.append(obj)
-
-        return objToExport
+    def getOpenEMSObjects(self, filterStr="", filterMode="Regex"):
+        """
+        :param filterStr: filter string or ObjectFilter, pattern is compiled once for all objects
+        :param filterMode: ObjectFilter mode used when filterStr is string
+        :return: document objects which label matches filter
+        """
+        objectFilter = filterStr if isinstance(filterStr, ObjectFilter) else ObjectFilter(filterStr, filterMode)
+        return objectFilter.filterObjects(self.getObjects())
 
     def selectObjectByLabel(self, objLabel):
         return None
@@ -84,6 +82,26 @@ class CadInterface:
     def drawDraftCircle(self, lineName, centerPoint, radius):
         return None
 
+    def drawAuxGrid(self, auxGridLines, gridLineStyle="Solid"):
+        """
+        Draw auxiliary grid into 3D view, each axis (or group) is one object which replaces auxiliary grid of this axis drawn before.
+        :param auxGridLines: AuxGridLines
+        """
+        return None
+
+    def removeAuxGrid(self, removeLegacyLines=False):
+        """
+        Remove auxiliary grid drawn by drawAuxGrid() from 3D view.
+        :param removeLegacyLines: remove also grid lines drawn by older plugin versions as separate objects
+        """
+        return None
+
+    def getViewSizePixels(self):
+        """
+        :return: (width, height) of 3D view in pixels, used to limit number of drawn grid lines
+        """
+        return (1000, 1000)
+
     # return x,y,z boundary box of model, going through all assigned objects into model and return boundary coordinates
     def getModelBoundaryBox(self, treeWidget):
         return None
@@ -139,5 +157,36 @@ class CadInterface:
         print(f"{__file__} > exportSTL()")
         return None
 
+    def getObjectBrepString(self, obj):
+        """
+        Returns object shape with its global placement serialized as BREP string, None if CAD doesn't provide it.
+        """
+        return None
+
+    def getSTLExportFingerprint(self, partToExport, brepProvider=None):
+        """
+        Returns string which changes when exported geometry changes, None means fingerprint is not available and objects are always exported.
+        :param brepProvider: function returning BREP string of object, used so object is serialized just once per generation run
+        """
+        return None
+
+    def getObjectGeometryKey(self, obj, brepProvider=None):
+        """
+        Returns value which changes whenever object geometry or placement changes, used to find out if generated script section
+        has to be generated again. None means key is not available and sections with this object are always generated.
+        :param brepProvider: function returning BREP string of object, see getSTLExportFingerprint()
+        """
+        return None
+
+    def exportSTLBatch(self, exportJobs, workersCount=1, brepProvider=None):
+        """
+        Export more objects into STL files, default implementation exports them one by one using exportSTL().
+        :param exportJobs: list of (partToExport, exportFileName)
+        :param workersCount: number of parallel workers, CAD specific implementation can use it
+        :param brepProvider: function returning BREP string of object, see getSTLExportFingerprint()
+        """
+        for partToExport, exportFileName in exportJobs:
+            self.exportSTL(partToExport, exportFileName)
+
 if __name__ == "__main__":
     cadInterface = CadInterface()
@@ -1,4 +1,5 @@
 import FreeCAD as App
+from PySide import QtCore
 
 # evtHandler : helper class that manages adding, removing and calls to a list of event handlers.
 class evtHandler(object):
@@ -20,8 +21,15 @@ class evtHandler(object):
 # FreeCADDocObserver : implements a sub-set of the FreeCAD documentObserver to provide event handling. For a full list,
 # see https://github.com/FreeCAD/FreeCAD/blob/42a71ccbbd2937d270e46c1688b9411a7f82f13d/src/Gui/DocumentObserverPython.h#L37
 # and https://github.com/FreeCAD/FreeCAD/blob/8efe30c8a90305d688fa164048941be1fd474918/src/Mod/Test/Document.py#L1619 .
+#
+# Object created and changed events are queued and sent in one batch after document is idle for flushDelayMs, repeated changes of
+# same property of object are sent once, so recompute or import which generates thousands of events doesn't stall GUI.
+# Object deleted event is sent immediately as object still exists just in this moment, events queued before are sent first.
+# With flushDelayMs=0 events are sent immediately as they come.
 class FreeCADDocObserver():
-    def __init__(self):
+    DEFAULT_FLUSH_DELAY_MS = 200
+
+    def __init__(self, flushDelayMs=DEFAULT_FLUSH_DELAY_MS):
         self.documentCreated = evtHandler()
         self.documentActivated = evtHandler()
         self.documentDeleted = evtHandler()
@@ -30,6 +38,32 @@ class FreeCADDocObserver():
         self.objectChanged = evtHandler()
         self.objectDeleted = evtHandler()
 
+        # queued events, key is (event, object name, property) so repeated event replaces previous one, it's moved to end of queue
+        # so events are sent in order of their last occurrence (object created event is queued once so it stays before its changes)
+        self.pendingEvents = {}
+
+        self.flushDelayMs = flushDelayMs
+        self.flushTimer = QtCore.QTimer()
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.timeout.connect(self.flushEvents)
+
+    def queueEvent(self, key, handler, *args):
+        if self.flushDelayMs <= 0:
+            handler(*args)
+            return
+
+        self.pendingEvents.pop(key, None)
+        self.pendingEvents[key] = (handler, args)
+        self.flushTimer.start(self.flushDelayMs)     # restarted by each event, fires when events stop coming
+
+    def flushEvents(self):
+        self.flushTimer.stop()
+        pendingEvents = self.pendingEvents
+        self.pendingEvents = {}
+
+        for handler, args in pendingEvents.values():
+            handler(*args)
+
     def startObservation(self):
         # set up document observer
         App.addDocumentObserver(self)
@@ -38,6 +72,7 @@ class FreeCADDocObserver():
 
     def endObservation(self):
         App.removeDocumentObserver(self)
+        self.flushEvents()
 
     # print("Observation terminated.")
 
@@ -59,14 +94,15 @@ class FreeCADDocObserver():
 
     def slotCreatedObject(self, obj):
         #print("A new object was added")
-        self.objectCreated(obj)
+        self.queueEvent(("created", obj.Name, None), self.objectCreated, obj)
 
     def slotChangedObject(self, obj, prop):
         #print("you have changed an object: " + repr(obj))
-        self.objectChanged(obj, prop)
+        self.queueEvent(("changed", obj.Name, prop), self.objectChanged, obj, prop)
 
     def slotDeletedObject(self, obj):
         #print("you have queued an object for deletion: " + repr(obj))
+        self.flushEvents()
         self.objectDeleted(obj)
 
 
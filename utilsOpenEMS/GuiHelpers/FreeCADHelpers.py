@@ -1,16 +1,31 @@
 from utilsOpenEMS.GuiHelpers.CadInterface import CadInterface
+from utilsOpenEMS.GuiHelpers.STLExportWorker import exportBrepToSTL
 
 from PySide import QtCore
+import concurrent.futures
+import multiprocessing
+import hashlib
+import math
+import os
+import sys
 import FreeCAD
 import FreeCADGui
 import Draft
 import Mesh
+import Part
 
 class FreeCADHelpers(CadInterface):
 
     def __init__(self, APP_DIR=""):
         super(FreeCADHelpers, self).__init__(APP_DIR)
 
+        #
+        #   names of aux grid compounds drawn into documents {document name: [object names]}, documents already checked
+        #   for grid lines of older versions
+        #
+        self.auxGridObjectNames = {}
+        self.auxGridLegacyCheckedDocuments = set()
+
     def selectObjectByLabel(self, objLabel):
         freecadObj = FreeCAD.ActiveDocument.getObjectsByLabel(objLabel)
         if (freecadObj):
@@ -44,6 +59,70 @@ class FreeCADHelpers(CadInterface):
         circle.Label = lineName
         Draft.autogroup(circle)
 
+    #
+    #   Auxiliary grid is drawn as one compound object of line edges for each axis, named auxGridLineX, auxGridLineY, auxGridLineZ.
+    #   This is much faster than Draft wire for each line as document gets at most three new objects.
+    #   Names of created compounds are remembered so they are removed directly without going through all document objects.
+    #
+    AUX_GRID_OBJECT_NAME = "auxGridLine"
+    AUX_GRID_GROUPS = ("x", "y", "z", "xy", "xz", "yz")
+
+    def getAuxGridObjectName(self, axis):
+        return FreeCADHelpers.AUX_GRID_OBJECT_NAME + axis.upper()
+
+    def drawAuxGrid(self, auxGridLines, gridLineStyle="Solid"):
+        doc = FreeCAD.ActiveDocument
+
+        #
+        #   previous grid is replaced as whole, also groups which are not part of new grid are removed (ie. axis grid after plane preview)
+        #
+        self.removeAuxGrid()
+
+        for axis in auxGridLines.getGroups():
+            edges = [Part.LineSegment(FreeCAD.Vector(*p1), FreeCAD.Vector(*p2)).toShape() for p1, p2 in auxGridLines.lines.get(axis, []) if p1 != p2]
+            edges += [Part.makeCircle(radius, FreeCAD.Vector(*center)) for center, radius in auxGridLines.circles.get(axis, []) if radius > 0]
+            if len(edges) == 0:
+                continue
+
+            objName = self.getAuxGridObjectName(axis)
+            gridObj = doc.addObject("Part::Feature", objName)
+            gridObj.Label = objName
+            gridObj.Shape = Part.makeCompound(edges)
+            if gridObj.ViewObject is not None:
+                gridObj.ViewObject.DrawStyle = gridLineStyle
+                gridObj.ViewObject.Selectable = False
+            self.auxGridObjectNames.setdefault(doc.Name, []).append(gridObj.Name)
+            print(f"Aux grid {gridObj.Name}: {len(edges)} lines")
+
+        doc.recompute()
+
+    def removeAuxGrid(self, removeLegacyLines=False):
+        """
+        Remove aux grid compounds by their names, default group names are tried too so grid saved with document in previous session is removed.
+        Document is searched for grid lines drawn by older versions (Draft wires with generic names labeled auxGridLine) just once per document
+        or when removeLegacyLines is set.
+        """
+        doc = FreeCAD.ActiveDocument
+        if doc is None:
+            return
+
+        objNames = set(self.auxGridObjectNames.pop(doc.Name, []))
+        objNames.update([self.getAuxGridObjectName(group) for group in FreeCADHelpers.AUX_GRID_GROUPS])
+        if removeLegacyLines or not (doc.Name in self.auxGridLegacyCheckedDocuments):
+            objNames.update([obj.Name for obj in doc.Objects if FreeCADHelpers.AUX_GRID_OBJECT_NAME in obj.Label])
+            self.auxGridLegacyCheckedDocuments.add(doc.Name)
+
+        for objName in objNames:
+            if doc.getObject(objName) is not None:
+                doc.removeObject(objName)
+
+    def getViewSizePixels(self):
+        try:
+            return tuple(FreeCADGui.ActiveDocument.ActiveView.getSize())
+        except Exception as e:
+            print(f"Cannot get 3D view size, using default: {e}")
+            return CadInterface.getViewSizePixels(self)
+
     # return x,y,z boundary box of model, going through all assigned objects into model and return boundary coordinates
     def getModelBoundaryBox(self, treeWidget):
         root = treeWidget.invisibleRootItem()
@@ -129,3 +208,100 @@ class FreeCADHelpers(CadInterface):
 
     def exportSTL(self, partToExport, exportFileName):
         Mesh.export(partToExport, exportFileName)
+
+    def getMeshExportDeflection(self):
+        """
+        Returns tessellation settings used when objects are exported into STL, values are read from FreeCAD mesh preferences.
+        :return: linear deflection [mm], angular deflection [rad]
+        """
+        meshParams = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Mesh")
+        linearDeflection = meshParams.GetFloat("MaxDeviationExport", 0.1)
+        angularDeflection = meshParams.GetFloat("MaxAngleExport", 30.0) * math.pi / 180.0
+        return linearDeflection, angularDeflection
+
+    def getObjectBrepString(self, obj):
+        return Part.getShape(obj).exportBrepToString()
+
+    def getSTLExportFingerprint(self, partToExport, brepProvider=None):
+        """
+        Returns hash of geometry, placement and tessellation settings of objects exported into one STL file.
+        If fingerprint is same as for previously exported file, file doesn't have to be exported again.
+        """
+        getBrep = self.getObjectBrepString if brepProvider is None else brepProvider
+        fingerprint = hashlib.sha1()
+        fingerprint.update(repr(self.getMeshExportDeflection()).encode('utf-8'))
+        for obj in partToExport:
+            fingerprint.update(obj.Name.encode('utf-8'))
+            fingerprint.update(repr(obj.getGlobalPlacement()).encode('utf-8'))
+            fingerprint.update(getBrep(obj).encode('utf-8'))
+        return fingerprint.hexdigest()
+
+    def getObjectGeometryKey(self, obj, brepProvider=None):
+        """
+        Returns tuple describing object geometry: hash of shape BREP string (so any change of vertex, edge or face is detected, not just
+        change of bounding box or area), global placement and STL export tessellation settings, for discretized edges also hash of its points.
+        :param brepProvider: function returning BREP string of object, see getSTLExportFingerprint()
+        """
+        getBrep = self.getObjectBrepString if brepProvider is None else brepProvider
+        key = [obj.Name, obj.TypeId, repr(obj.getGlobalPlacement()), self.getMeshExportDeflection()]
+        if hasattr(obj, "Shape") and not obj.Shape.isNull():
+            key.append(hashlib.sha1(getBrep(obj).encode('utf-8')).hexdigest())
+        if hasattr(obj, "Points"):
+            key.append(hash(tuple([(p.x, p.y, p.z) for p in obj.Points])))
+        return tuple(key)
+
+    def getSTLExportPythonExecutable(self):
+        """
+        Returns python interpreter used to start STL export worker processes. Inside FreeCAD GUI sys.executable is FreeCAD itself,
+        so python bundled next to it is used, None if there is no such interpreter.
+        """
+        executableDir, executableName = os.path.split(sys.executable)
+        if executableName.lower().startswith("python"):
+            return sys.executable
+        for pythonName in ("python3", "python", "python.exe"):
+            pythonExecutable = os.path.join(executableDir, pythonName)
+            if os.path.isfile(pythonExecutable):
+                return pythonExecutable
+        return None
+
+    def exportSTLBatch(self, exportJobs, workersCount=1, brepProvider=None):
+        """
+        Export objects into STL files using process pool. Tessellation binds GIL so threads don't run in parallel, each worker process
+        gets shapes as BREP strings read from document in main process with their global placement and tessellates them by
+        MeshPart.meshFromShape() with deviation read from mesh export preferences.
+
+        For 1 worker (default) objects are exported by Mesh.export() one by one, same as before. Output of process pool can slightly
+        differ from Mesh.export() as tessellation is not done by same function. If process pool cannot be started or some worker fails
+        all objects are exported one by one.
+        :param exportJobs: list of (partToExport, exportFileName)
+        :param workersCount: number of worker processes
+        :param brepProvider: function returning BREP string of object, if None shapes are serialized here
+        """
+        if workersCount <= 1 or len(exportJobs) <= 1:
+            super(FreeCADHelpers, self).exportSTLBatch(exportJobs, workersCount)
+            return
+
+        pythonExecutable = self.getSTLExportPythonExecutable()
+        if pythonExecutable is None:
+            print("No python interpreter found to start STL export workers, objects are exported one by one.")
+            super(FreeCADHelpers, self).exportSTLBatch(exportJobs, workersCount)
+            return
+
+        linearDeflection, angularDeflection = self.getMeshExportDeflection()
+
+        getBrep = self.getObjectBrepString if brepProvider is None else brepProvider
+        shapesToExport = []
+        for partToExport, exportFileName in exportJobs:
+            brepList = [getBrep(obj) for obj in partToExport]
+            shapesToExport.append((brepList, exportFileName))
+
+        try:
+            processContext = multiprocessing.get_context("spawn")
+            processContext.set_executable(pythonExecutable)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(workersCount, len(shapesToExport)), mp_context=processContext) as executor:
+                futures = [executor.submit(exportBrepToSTL, brepList, exportFileName, linearDeflection, angularDeflection) for brepList, exportFileName in shapesToExport]
+                for future in futures:
+                    future.result()     #raise exception from worker if there was any
+        except Exception as e:
+            print(f"STL export worker processes failed ({e}), objects are exported one by one.")
+            super(FreeCADHelpers, self).exportSTLBatch(exportJobs, workersCount)
@@ -4,13 +4,21 @@ import os
 from utilsOpenEMS.GlobalFunctions.GlobalFunctions import _bool, _r
 
 class GuiHelpers:
+
+    #
+    #   when True messages are just printed to console, set by command line generator where no one can close message box
+    #
+    headless = False
+
     def __init__(self, form, statusBar = None, APP_DIR=""):
         self.APP_DIR = APP_DIR
         self.form = form
         self.statusBar = statusBar
 
     def displayMessage(self, msgText, forceModal=True):
-        if (not forceModal) and (self.statusBar is not None):
+        if GuiHelpers.headless:
+            print(msgText)
+        elif (not forceModal) and (self.statusBar is not None):
             self.statusBar.showMessage(msgText, 5000)
         else:
             msgBox = QtWidgets.QMessageBox()
@@ -21,6 +29,10 @@ class GuiHelpers:
     #   Display messagebox with Save/Cancel buttons and after user choice return True/False
     #
     def displayYesNoMessage(self, msgText):
+        if GuiHelpers.headless:
+            print(msgText + " -> Cancel")
+            return False
+
         msgBox = QtWidgets.QMessageBox()
         msgBox.setText(msgText)
         #msgBox.setInformativeText("Do you want to save your changes?")
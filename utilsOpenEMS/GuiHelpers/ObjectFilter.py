@@ -0,0 +1,52 @@
+#   author: Lubomir Jagos
+#
+#
+import re
+import fnmatch
+
+class ObjectFilter:
+    """
+    Filter of CAD objects by label, pattern is compiled once when filter is created and then used for all labels.
+    Modes:
+        - Regex: regular expression searched in label, ie. port.*y matches portXY, portYZ, invalid expression is used as substring
+        - Substring: label contains filter text
+        - Glob: whole label matches shell pattern with *, ? and [...], ie. port* matches labels starting with port
+    All modes are case insensitive, empty filter matches all objects.
+    """
+
+    MODES = ("Regex", "Substring", "Glob")
+
+    def __init__(self, filterStr="", mode="Regex"):
+        self.filterStr = filterStr
+        self.mode = mode
+
+        self.pattern = None
+        self.lowerFilterStr = filterStr.lower()
+        if len(filterStr) > 0 and mode == "Glob":
+            self.pattern = re.compile(fnmatch.translate(filterStr), re.IGNORECASE)
+        elif len(filterStr) > 0 and mode != "Substring":
+            try:
+                self.pattern = re.compile(filterStr, re.IGNORECASE)
+            except re.error as e:
+                print(f"Object filter '{filterStr}' is not valid regular expression ({e}), used as substring.")
+
+    def isEmpty(self):
+        return len(self.filterStr) == 0
+
+    def isMatching(self, label):
+        if self.isEmpty():
+            return True
+        elif self.pattern is None:
+            return self.lowerFilterStr in label.lower()
+        elif self.mode == "Glob":
+            return self.pattern.match(label) is not None
+        return self.pattern.search(label) is not None
+
+    def filterObjects(self, objects):
+        """
+        :param objects: list of CAD objects with .Label
+        :return: objects which label matches filter
+        """
+        if self.isEmpty():
+            return list(objects)
+        return [obj for obj in objects if self.isMatching(obj.Label)]
@@ -0,0 +1,167 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+from PySide import QtGui, QtCore, QtWidgets
+
+from utilsOpenEMS.SettingsItem.FreeCADSettingsItem import FreeCADSettingsItem
+from utilsOpenEMS.GuiHelpers.ObjectFilter import ObjectFilter
+
+class ObjectListModel(QtCore.QAbstractItemModel):
+    """
+    Model of CAD objects shown in left column of object assignment tab. Labels of all document objects are cached and rows are
+    list of [internal name, label] which passed filter, so filter change doesn't read document again. Document changes are applied
+    as deltas by objectCreated(), objectRenamed(), objectDeleted() so view is not rebuilt on each change. Icons are loaded from disk
+    just once and shared by all rows.
+    """
+
+    HEADER = "FreeCAD Object List"
+
+    def __init__(self, APP_DIR="", parent=None):
+        super(ObjectListModel, self).__init__(parent)
+        self.APP_DIR = APP_DIR
+        self.allObjectLabels = {}       # {object name: label} of all document objects in document order
+        self.objects = []
+        self.rowByName = {}
+        self.objectFilter = ObjectFilter()
+        self.iconCache = {}
+
+    def getIcon(self, objName):
+        if (objName.find("Sketch") > -1):
+            iconFileName = "wire.svg"
+        elif (objName.find("Discretized_Edge") > -1):
+            iconFileName = "curve.svg"
+        else:
+            iconFileName = "object.svg"
+
+        if iconFileName not in self.iconCache:
+            self.iconCache[iconFileName] = QtGui.QIcon(os.path.join(self.APP_DIR, "img", iconFileName))
+        return self.iconCache[iconFileName]
+
+    def isMatchingFilter(self, label):
+        return self.objectFilter.isMatching(label)
+
+    def updateRowByName(self, startRow=0):
+        for row in range(startRow, len(self.objects)):
+            self.rowByName[self.objects[row][0]] = row
+
+    #
+    #   QAbstractItemModel interface, objects are flat list so all items have invalid parent
+    #
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if parent.isValid() or row < 0 or row >= len(self.objects) or column != 0:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QtCore.QModelIndex()):
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.objects)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        objName, objLabel = self.objects[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return objLabel
+        elif role == QtCore.Qt.DecorationRole:
+            return self.getIcon(objName)
+        elif role == QtCore.Qt.UserRole:
+            return FreeCADSettingsItem(name=objLabel, freeCadId=objName)
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return ObjectListModel.HEADER
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    #
+    #   Document changes
+    #
+    def setObjects(self, objects, objectFilter=None):
+        """
+        Replace all objects, used when list is loaded first time.
+        :param objects: all CAD objects of document
+        :param objectFilter: ObjectFilter, if None current filter is kept
+        """
+        self.allObjectLabels = {obj.Name: obj.Label for obj in objects}
+        self.setFilter(self.objectFilter if objectFilter is None else objectFilter)
+
+    def setFilter(self, objectFilter):
+        """
+        Filter cached objects again, document is not read.
+        :param objectFilter: ObjectFilter
+        """
+        self.beginResetModel()
+        self.objectFilter = objectFilter
+        self.objects = [[objName, objLabel] for objName, objLabel in self.allObjectLabels.items() if objectFilter.isMatching(objLabel)]
+        self.rowByName = {}
+        self.updateRowByName()
+        self.endResetModel()
+
+    def objectCreated(self, objName, objLabel):
+        self.allObjectLabels[objName] = objLabel
+        if objName in self.rowByName or not self.isMatchingFilter(objLabel):
+            return
+
+        row = len(self.objects)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.objects.append([objName, objLabel])
+        self.rowByName[objName] = row
+        self.endInsertRows()
+
+    def objectDeleted(self, objName):
+        self.allObjectLabels.pop(objName, None)
+        self.removeObjectRow(objName)
+
+    def removeObjectRow(self, objName):
+        if objName not in self.rowByName:
+            return
+
+        row = self.rowByName.pop(objName)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.objects[row]
+        self.updateRowByName(row)
+        self.endRemoveRows()
+
+    def objectRenamed(self, objName, objLabel):
+        """
+        Update label of object, object is removed or added when new label doesn't pass or newly passes filter.
+        """
+        self.allObjectLabels[objName] = objLabel
+        if not self.isMatchingFilter(objLabel):
+            self.removeObjectRow(objName)
+        elif objName not in self.rowByName:
+            self.objectCreated(objName, objLabel)
+        else:
+            row = self.rowByName[objName]
+            self.objects[row][1] = objLabel
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+
+    #
+    #   Helpers for dialog
+    #
+    def getIndexByLabel(self, objLabel):
+        for row, (objName, label) in enumerate(self.objects):
+            if label == objLabel:
+                return self.index(row, 0)
+        return QtCore.QModelIndex()
+
+    def createTreeWidgetItem(self, index):
+        """
+        :return: QTreeWidgetItem for object at index, used when object is assigned into right column
+        """
+        treeItem = QtWidgets.QTreeWidgetItem([self.data(index, QtCore.Qt.DisplayRole)])
+        treeItem.setData(0, QtCore.Qt.UserRole, self.data(index, QtCore.Qt.UserRole))
+        treeItem.setIcon(0, self.data(index, QtCore.Qt.DecorationRole))
+        return treeItem
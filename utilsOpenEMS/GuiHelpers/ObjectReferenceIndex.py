@@ -0,0 +1,100 @@
+#   author: Lubomir Jagos
+#
+#
+from PySide import QtCore
+
+from utilsOpenEMS.SettingsItem.FreeCADSettingsItem import FreeCADSettingsItem
+
+class ObjectReferenceIndex:
+    """
+    Index from CAD object internal name to all tree items which reference this object:
+        - object items in object assignment tree (category -> settings -> object)
+        - items in object priority list and mesh priority list, named "[category], [settings name], [object label]"
+
+    Index is rebuilt lazily after rows are inserted into some of trees, removed items are filtered out when they are returned,
+    so rename or delete of object touches just items which reference it and label is matched exactly.
+    """
+
+    def __init__(self, assignmentTreeWidget, priorityTreeWidgets, objectNameLabelList):
+        """
+        :param assignmentTreeWidget: object assignment QTreeWidget
+        :param priorityTreeWidgets: list of priority QTreeWidgets
+        :param objectNameLabelList: dict {object name: object label}, used for items which don't store object name
+        """
+        self.assignmentTreeWidget = assignmentTreeWidget
+        self.priorityTreeWidgets = priorityTreeWidgets
+        self.objectNameLabelList = objectNameLabelList
+
+        self.index = {}
+        self.isDirty = True
+
+        for treeWidget in [assignmentTreeWidget] + priorityTreeWidgets:
+            treeWidget.model().rowsInserted.connect(self.invalidate)
+            treeWidget.model().modelReset.connect(self.invalidate)
+
+    def invalidate(self, *args):
+        self.isDirty = True
+
+    def rebuild(self):
+        self.index = {}
+
+        objectNamesByLabel = {}
+        for objName, objLabel in self.objectNameLabelList.items():
+            objectNamesByLabel.setdefault(objLabel, []).append(objName)
+
+        #
+        #   Object assignment tree, object name is stored in item data, older items have just label
+        #
+        assignedObjectNames = {}
+        root = self.assignmentTreeWidget.invisibleRootItem()
+        for i in range(root.childCount()):
+            categoryItem = root.child(i)
+            for j in range(categoryItem.childCount()):
+                settingsItem = categoryItem.child(j)
+                for k in range(settingsItem.childCount()):
+                    objItem = settingsItem.child(k)
+                    objData = objItem.data(0, QtCore.Qt.UserRole)
+                    if not isinstance(objData, FreeCADSettingsItem):
+                        continue
+
+                    if len(objData.getFreeCadId()) > 0:
+                        objNames = [objData.getFreeCadId()]
+                    else:
+                        objNames = objectNamesByLabel.get(objItem.text(0), [])
+                    for objName in objNames:
+                        self.index.setdefault(objName, []).append((self.assignmentTreeWidget, objItem))
+                        assignedObjectNames[(categoryItem.text(0), settingsItem.text(0), objItem.text(0))] = objName
+
+        #
+        #   Priority lists, object is found by same category, settings and label in assignment tree, groups (ie. smooth mesh group)
+        #   don't reference any object and are skipped
+        #
+        for treeWidget in self.priorityTreeWidgets:
+            for i in range(treeWidget.topLevelItemCount()):
+                priorityItem = treeWidget.topLevelItem(i)
+                nameParts = priorityItem.text(0).split(", ", 2)
+                if len(nameParts) < 3:
+                    continue
+
+                objName = assignedObjectNames.get(tuple(nameParts), None)
+                objNames = [objName] if objName is not None else objectNamesByLabel.get(nameParts[2], [])
+                for objName in objNames:
+                    self.index.setdefault(objName, []).append((treeWidget, priorityItem))
+
+        self.isDirty = False
+
+    def getItems(self, objName):
+        """
+        :return: list of (treeWidget, treeItem) referencing object, must be called before object label is changed in objectNameLabelList
+        """
+        if self.isDirty:
+            self.rebuild()
+
+        if objName not in self.index:
+            return []
+
+        self.index[objName] = [(treeWidget, treeItem) for treeWidget, treeItem in self.index[objName] if treeItem.treeWidget() is not None]
+        return self.index[objName]
+
+    def removeObject(self, objName):
+        self.index.pop(objName, None)
@@ -0,0 +1,22 @@
+#   author: Lubomir Jagos
+#
+#   Worker function of STL export process pool, it's in separate module so worker process imports just FreeCAD geometry modules
+#   and not FreeCADGui or PySide.
+#
+
+#
+#   Tessellate shapes given as BREP strings and write them into one STL file, runs in worker process so it doesn't touch FreeCAD document.
+#
+def exportBrepToSTL(brepList, exportFileName, linearDeflection, angularDeflection):
+    import FreeCAD
+    import Part
+    import Mesh
+    import MeshPart
+
+    mesh = Mesh.Mesh()
+    for brep in brepList:
+        shape = Part.Shape()
+        shape.importBrepFromString(brep)
+        mesh.addMesh(MeshPart.meshFromShape(Shape=shape, LinearDeflection=linearDeflection, AngularDeflection=angularDeflection, Relative=False))
+    mesh.write(exportFileName)
+    return exportFileName
@@ -0,0 +1,127 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+
+#
+#   Script generators read settings from form widgets, so headless model still needs Qt widgets stack (no display, offscreen platform is used)
+#
+QT_REQUIREMENTS_MESSAGE = "Headless generation needs PySide with QtWidgets and QtUiTools (as shipped with FreeCAD) and Qt offscreen platform plugin, " \
+                          "settings are loaded into hidden form created from ui/dialog.ui."
+
+try:
+    from PySide import QtCore, QtWidgets, QtUiTools
+except ImportError as e:
+    raise ImportError(f"{QT_REQUIREMENTS_MESSAGE} Import failed: {e}") from e
+
+from utilsOpenEMS.GuiHelpers.GuiHelpers import GuiHelpers
+from utilsOpenEMS.GuiHelpers.FactoryCadInterface import FactoryCadInterface
+from utilsOpenEMS.SaveLoad.IniFile0v1 import IniFile0v1
+from utilsOpenEMS.SaveLoad.IniValidator0v1 import IniValidator0v1
+from utilsOpenEMS.ScriptLinesGenerator.CommonScriptLinesGenerator import CommonScriptLinesGenerator
+from utilsOpenEMS.ScriptLinesGenerator.OctaveScriptLinesGenerator2 import OctaveScriptLinesGenerator2
+from utilsOpenEMS.ScriptLinesGenerator.PythonScriptLinesGenerator2 import PythonScriptLinesGenerator2
+
+class HeadlessSimulationModel:
+    """
+    Simulation settings loaded from .ini file without dialog window. Script generators are reading settings from form widgets, so the form
+    from ui/dialog.ui is created but never shown and it's filled by IniFile0v1 same way as when settings are loaded in GUI.
+    Messages which would open message box are printed to console.
+
+    Model is windowless, not Qt-free: no window is shown, but generators still read settings from widgets of the hidden form, so it needs
+    PySide with QtWidgets and QtUiTools and Qt offscreen platform, see QT_REQUIREMENTS_MESSAGE.
+    """
+
+    def __init__(self, APP_DIR):
+        self.APP_DIR = APP_DIR
+
+        GuiHelpers.headless = True
+
+        #
+        #   widgets can be created just when there is QApplication, if there is no display offscreen platform is used
+        #
+        self.app = QtWidgets.QApplication.instance()
+        if self.app is None:
+            if not "QT_QPA_PLATFORM" in os.environ:
+                os.environ["QT_QPA_PLATFORM"] = "offscreen"
+            self.app = QtWidgets.QApplication([])
+
+        loader = QtUiTools.QUiLoader()
+        uiFileName = os.path.join(APP_DIR, "ui", "dialog.ui")
+        uifile = QtCore.QFile(uiFileName)
+        if not uifile.open(QtCore.QFile.ReadOnly):
+            raise RuntimeError(f"Cannot open {uiFileName}. {QT_REQUIREMENTS_MESSAGE}")
+        self.form = loader.load(uifile)
+        uifile.close()
+        if self.form is None:
+            raise RuntimeError(f"Cannot load {uiFileName}: {loader.errorString()}. {QT_REQUIREMENTS_MESSAGE}")
+
+        self.cadHelpers = FactoryCadInterface.createHelper(APP_DIR)
+        self.guiHelpers = GuiHelpers(self.form, APP_DIR=APP_DIR)
+        self.guiHelpers.initRightColumnTopLevelItems()
+        self.simulationSettingsFile = IniFile0v1(self.form, APP_DIR=APP_DIR)
+
+        self.scriptGenerators = {
+            "octave": OctaveScriptLinesGenerator2(self.form),
+            "python": PythonScriptLinesGenerator2(self.form),
+        }
+
+    def loadSettings(self, iniFileName):
+        """
+        Load simulation settings from .ini file, CAD document to which settings belongs must be already opened and active.
+        :param iniFileName: settings file written by IniFile0v1
+        :return: default simulation output directory, same as GUI uses after settings file is loaded
+        """
+        IniValidator0v1.checkFile(iniFileName)
+        self.simulationSettingsFile.read(iniFileName)
+
+        programbase, ext = os.path.splitext(os.path.basename(iniFileName))
+        return f"{os.path.dirname(os.path.abspath(iniFileName))}/{programbase}_openEMS_simulation"
+
+    def generateScript(self, scriptType, outputDir, stlExportWorkersCount=None):
+        """
+        Generate simulation script and geometry files.
+        :param scriptType: "octave" or "python"
+        :param outputDir: directory where simulation files are generated
+        :param stlExportWorkersCount: number of workers for STL export, None keeps generator default
+        """
+        scriptGenerator = self.scriptGenerators[scriptType]
+        if stlExportWorkersCount is not None:
+            scriptGenerator.stlExportWorkersCount = stlExportWorkersCount
+        scriptGenerator.generateOpenEMSScript(outputDir)
+
+    def generateScripts(self, scriptTypes, outputDir, stlExportWorkersCount=None):
+        """
+        Generate simulation scripts of more types in one pass, all generators render same simulation model so geometry is read and
+        STL files are exported just once.
+        :param scriptTypes: list of "octave", "python"
+        """
+        scriptGenerators = [self.scriptGenerators[scriptType] for scriptType in scriptTypes]
+        if stlExportWorkersCount is not None:
+            for scriptGenerator in scriptGenerators:
+                scriptGenerator.stlExportWorkersCount = stlExportWorkersCount
+        CommonScriptLinesGenerator.generateOpenEMSScriptsInOnePass(scriptGenerators, outputDir)
+
+    def generateSweepVariant(self, sweep, variantIndex, scriptTypes, baseOutputDir, stlExportWorkersCount=None):
+        """
+        Apply one sweep variant on loaded settings and generate its scripts into variant directory. If variant 0 was already generated its
+        STL files are linked into variant directory so they are not exported again.
+        :param sweep: ParametricSweep
+        :param variantIndex: index into sweep.getVariants()
+        :param scriptTypes: list of "octave", "python"
+        :param baseOutputDir: sweep output directory, variants are generated into its subdirectories
+        :return: variant output directory
+        """
+        variant = sweep.getVariants()[variantIndex]
+        outputDir = sweep.getVariantOutputDir(baseOutputDir, variantIndex)
+
+        firstVariantDir = sweep.getVariantOutputDir(baseOutputDir, 0)
+        if variantIndex > 0 and os.path.exists(firstVariantDir):
+            sweep.shareGeometryFiles(firstVariantDir, outputDir)
+
+        sweep.applyVariant(self.form, variant)
+        print(f"Generating {', '.join(scriptTypes)} simulation script for sweep variant {variantIndex} into {outputDir}")
+        self.generateScripts(scriptTypes, outputDir, stlExportWorkersCount)
+        sweep.writeVariantInfo(outputDir, variantIndex, variant)
+
+        return outputDir
@@ -0,0 +1,131 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+import json
+import shutil
+import itertools
+
+from PySide import QtCore
+
+from utilsOpenEMS.ScriptLinesGenerator.CommonScriptLinesGenerator import CommonScriptLinesGenerator
+
+class ParametricSweep:
+    """
+    Sweep of simulation settings values, each combination of values is generated as one variant into its own output directory.
+
+    Sweep is defined in JSON file:
+        {
+            "mode": "product",
+            "parameters": [
+                {"category": "Material", "item": "substrate", "attribute": "constants.epsilon", "values": [3.8, 4.2, 4.6]},
+                {"category": "Port", "item": "port 1", "attribute": "R", "values": [50, 75]},
+                {"category": "Grid", "item": "fine grid", "attribute": "fixedDistance.x", "values": [0.1, 0.2]}
+            ]
+        }
+
+        category  - top level item in object assignment tree (Material, Port, Grid, LumpedPart, Probe, Excitation)
+        item      - settings item name
+        attribute - settings item attribute, dictionary members are separated by dot
+        mode      - "product" generates all combinations of values, "zip" takes n-th value of each parameter for n-th variant
+    """
+
+    VARIANT_INFO_FILE_NAME = "sweep_variant.json"
+
+    def __init__(self, sweepDefinition):
+        self.mode = sweepDefinition.get("mode", "product")
+        self.parameters = sweepDefinition["parameters"]
+
+        if not self.mode in ("product", "zip"):
+            raise ValueError(f"Unknown sweep mode {self.mode}, allowed are product, zip")
+        if self.mode == "zip" and len(set([len(parameter["values"]) for parameter in self.parameters])) > 1:
+            raise ValueError("Sweep mode zip requires same number of values for all parameters")
+
+    @classmethod
+    def fromFile(cls, fileName):
+        with open(fileName, "r", encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def getVariants(self):
+        """
+        :return: list of variants, variant is list of (parameter, value)
+        """
+        valuesLists = [parameter["values"] for parameter in self.parameters]
+        if self.mode == "zip":
+            valuesCombinations = zip(*valuesLists)
+        else:
+            valuesCombinations = itertools.product(*valuesLists)
+        return [list(zip(self.parameters, values)) for values in valuesCombinations]
+
+    def getSettingsItem(self, form, category, itemName):
+        categoryItems = form.objectAssignmentRightTreeWidget.findItems(category, QtCore.Qt.MatchExactly)
+        if len(categoryItems) == 0:
+            raise ValueError(f"Sweep parameter category {category} not found")
+        for k in range(categoryItems[0].childCount()):
+            settingsItem = categoryItems[0].child(k).data(0, QtCore.Qt.UserRole)
+            if settingsItem is not None and settingsItem.getName() == itemName:
+                return settingsItem
+        raise ValueError(f"Sweep parameter item {category}, {itemName} not found")
+
+    def applyVariant(self, form, variant):
+        """
+        Set variant values into settings items which are used by script generators, value is converted to type of current value
+        so ie. port resistance stays string as it's stored by GUI.
+        """
+        for parameter, value in variant:
+            settingsItem = self.getSettingsItem(form, parameter["category"], parameter["item"])
+            attributePath = parameter["attribute"].split(".")
+
+            target = getattr(settingsItem, attributePath[0])
+            if len(attributePath) == 1:
+                currentValue = target
+            else:
+                for key in attributePath[1:-1]:
+                    target = target[key]
+                currentValue = target[attributePath[-1]]
+
+            if isinstance(currentValue, (str, int, float)) and not isinstance(currentValue, bool):
+                value = type(currentValue)(value)
+
+            if len(attributePath) == 1:
+                setattr(settingsItem, attributePath[0], value)
+            else:
+                target[attributePath[-1]] = value
+
+            print(f"Sweep parameter {parameter['category']}, {parameter['item']}, {parameter['attribute']} = {value}")
+
+    def getVariantOutputDir(self, baseOutputDir, variantIndex):
+        return os.path.join(baseOutputDir, f"variant_{variantIndex:03d}")
+
+    def writeVariantInfo(self, outputDir, variantIndex, variant):
+        variantInfo = {
+            "variant": variantIndex,
+            "parameters": [dict(parameter, value=value) for parameter, value in variant],
+        }
+        for parameterInfo in variantInfo["parameters"]:
+            del parameterInfo["values"]
+        with open(os.path.join(outputDir, self.VARIANT_INFO_FILE_NAME), "w", encoding='utf-8') as f:
+            json.dump(variantInfo, f, indent=1)
+
+    def shareGeometryFiles(self, sourceDir, targetDir):
+        """
+        Link STL files and their export manifest from already generated variant into another variant directory, as geometry is same for all
+        variants STL export is then skipped as fingerprints match. If hard link is not possible files are copied.
+        Manifest is always copied as each variant rewrites its own manifest after export.
+        """
+        if not os.path.exists(targetDir):
+            os.makedirs(targetDir)
+
+        for fileName in os.listdir(sourceDir):
+            if not (fileName.endswith(".stl") or fileName == CommonScriptLinesGenerator.STL_EXPORT_MANIFEST_FILE_NAME):
+                continue
+            targetFileName = os.path.join(targetDir, fileName)
+            if os.path.exists(targetFileName):
+                os.remove(targetFileName)
+            if fileName == CommonScriptLinesGenerator.STL_EXPORT_MANIFEST_FILE_NAME:
+                shutil.copy2(os.path.join(sourceDir, fileName), targetFileName)
+                continue
+            try:
+                os.link(os.path.join(sourceDir, fileName), targetFileName)
+            except OSError:
+                shutil.copy2(os.path.join(sourceDir, fileName), targetFileName)
@@ -143,6 +143,11 @@ class IniFile0v1:
                 settings.setValue("yenabled", gridList[k].yenabled)
                 settings.setValue("zenabled", gridList[k].zenabled)
                 settings.setValue("smoothMesh", json.dumps(gridList[k].smoothMesh))
+            elif (gridList[k].type == "Auto Mesh"):
+                settings.setValue("xenabled", gridList[k].xenabled)
+                settings.setValue("yenabled", gridList[k].yenabled)
+                settings.setValue("zenabled", gridList[k].zenabled)
+                settings.setValue("autoMesh", json.dumps(gridList[k].autoMesh))
             elif (gridList[k].type == "User Defined"):
                 settings.setValue("xenabled", gridList[k].xenabled)
                 settings.setValue("yenabled", gridList[k].yenabled)
@@ -542,6 +547,11 @@ class IniFile0v1:
                         categorySettings.smoothMesh = json.loads(settings.value('smoothMesh'))
                     except Exception as e:
                         print(f"Error during load reading smooth mesh: {e}")
+                elif (categorySettings.type == "Auto Mesh"):
+                    try:
+                        categorySettings.autoMesh = json.loads(settings.value('autoMesh'))
+                    except Exception as e:
+                        print(f"Error during load reading auto mesh: {e}")
                 else:
                     print(f"Grid reading {categorySettings.type} cannot find aditional infor needed for settings, default values left set.")
 
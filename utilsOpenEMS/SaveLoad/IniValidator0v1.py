@@ -81,7 +81,7 @@ class IniValidator0v1:
                     {
                         'name': 'type',
                         'mandatory': True,
-                        'allowedValues': r"(Fixed Distance|Fixed Count|Smooth Mesh)"
+                        'allowedValues': r"(Fixed Distance|Fixed Count|Smooth Mesh|Auto Mesh)"
                     },
                     {
                         'name': 'generateLinesInside',
@@ -194,6 +194,28 @@ class IniValidator0v1:
                             },
                         }
                     },
+                    {
+                        'name': 'autoMesh',
+                        'mandatory': "settings.value('type') == 'Auto Mesh'",
+                        'allowedValues': {
+                            'xMaxRes': {
+                                'mandatory': True,
+                                'allowedValues': "float"
+                            },
+                            'yMaxRes': {
+                                'mandatory': True,
+                                'allowedValues': "float"
+                            },
+                            'zMaxRes': {
+                                'mandatory': True,
+                                'allowedValues': "float"
+                            },
+                            'edgeResDivider': {
+                                'mandatory': True,
+                                'allowedValues': "float"
+                            },
+                        }
+                    },
                 ]
             },
             {
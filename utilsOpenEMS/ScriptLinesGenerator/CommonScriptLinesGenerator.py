@@ -6,14 +6,32 @@ from PySide import QtGui, QtCore, QtWidgets
 import numpy as np
 import re
 import math
+import json
+import hashlib
 
 from utilsOpenEMS.GlobalFunctions.GlobalFunctions import _bool, _r
 from utilsOpenEMS.SettingsItem.SettingsItem import SettingsItem
 from utilsOpenEMS.GuiHelpers.GuiHelpers import GuiHelpers
 from utilsOpenEMS.GuiHelpers.FactoryCadInterface import FactoryCadInterface
+from utilsOpenEMS.ScriptLinesGenerator.ShapeSnapshot import ShapeSnapshot
+from utilsOpenEMS.ScriptLinesGenerator.GenerationProfiler import GenerationProfiler
+from utilsOpenEMS.ScriptLinesGenerator.SimulationIR import SimulationIR, IRPrimitive
+from utilsOpenEMS.ScriptLinesGenerator.SectionCache import SectionCache
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine
+from utilsOpenEMS.ScriptLinesGenerator.SimulationCostEstimator import SimulationCostEstimator
 
 class CommonScriptLinesGenerator:
 
+    #
+    #   file in simulation output directory which stores fingerprints of exported STL files
+    #
+    STL_EXPORT_MANIFEST_FILE_NAME = "stl_export_manifest.json"
+
+    #
+    #   speed of light as defined in openEMS physical constants, generated scripts compute max_res with it
+    #
+    C0 = 299792458.0
+
     #
     #   constructor, get access to form GUI
     #
@@ -24,6 +42,59 @@ class CommonScriptLinesGenerator:
         self.internalPortIndexNamesList = {}
         self.internalMaterialIndexNamesList = {}
         self.internalNF2FFIndexNamesList = {}
+        self.maxGridResolution_m = 0
+
+        #
+        #   lookup tables valid during one generation run, built by initGenerationCaches()
+        #
+        self.freeCadObjectsByLabel = None
+        self.freeCadObjectsByName = None
+        self.itemPriorityMap = None
+        self.shapeSnapshots = {}
+
+        #
+        #   simulation model of current generation run, built lazily by getSimulationIR(), if sharedSimulationIR is set it's used
+        #   instead so more generators render same model, see generateOpenEMSScriptsInOnePass()
+        #
+        self.simulationIR = None
+        self.sharedSimulationIR = None
+
+        #
+        #   script lines of sections from previous generation runs, section is generated again just if its inputs changed, geometry of objects
+        #   is compared by hash of their BREP, same serialization is used for STL export, can be disabled by environment variable OPENEMS_SECTION_CACHE=0
+        #
+        self.sectionCache = SectionCache()
+        self.sectionCacheEnabled = os.environ.get("OPENEMS_SECTION_CACHE", "1") != "0"
+        self.sectionOutputFiles = None
+
+        #
+        #   sections streamed into script writer are cached just up to this number of characters, bigger ones (ie. materials with
+        #   many discretized edges) are generated each time so their text is not held in memory
+        #
+        self.sectionCacheMaxLength = 8*1024*1024
+
+        #
+        #   number of parallel worker processes used to export material objects into STL files, can be set by environment variable
+        #   OPENEMS_STL_EXPORT_WORKERS, default 1 exports objects one by one by CAD export function so STL files don't depend on machine
+        #
+        self.stlExportWorkersCount = int(os.environ.get("OPENEMS_STL_EXPORT_WORKERS", 1))
+
+        #
+        #   point lists (curves, polygons) with more points than this are saved into binary sidecar file next to generated script,
+        #   shorter ones are written into script as one array literal
+        #
+        self.pointsSidecarThreshold = 10000
+
+        #
+        #   grid lines are resolved in plugin by MeshEngine and written into script as final arrays, can be disabled by environment
+        #   variable OPENEMS_MESH_ENGINE=0, then script resolves them when it runs
+        #
+        self.meshEngineEnabled = os.environ.get("OPENEMS_MESH_ENGINE", "1") != "0"
+
+        #
+        #   GenerationProfiler of running generateOpenEMSScript(), None outside of it
+        #
+        self.profiler = None
 
         #
         # GUI helpers function like display message box and so
@@ -62,27 +133,756 @@ class CommonScriptLinesGenerator:
 
         return itemsByClassName
 
+    def getCategoryItems(self, categoryName):
+        """
+        Returns settings items under category in object assignment tree in same format as getItemsByClassName().
+        """
+        categoryItems = self.form.objectAssignmentRightTreeWidget.findItems(categoryName, QtCore.Qt.MatchFixedString)
+        if len(categoryItems) == 0:
+            return []
+        return [[categoryItems[0].child(k), categoryItems[0].child(k).data(0, QtCore.Qt.UserRole)] for k in range(categoryItems[0].childCount())]
+
+    def initFreeCADObjectIndex(self):
+        """
+        Builds lookup tables of document objects keyed by Label and by internal Name. Must be called at start of each generation run,
+        so all sections share one pass over document objects instead of scanning them for every assigned child.
+        """
+        self.freeCadObjectsByLabel = {}
+        self.freeCadObjectsByName = {}
+        for obj in self.cadHelpers.getObjects():
+            if not (obj.Label in self.freeCadObjectsByLabel):
+                self.freeCadObjectsByLabel[obj.Label] = [obj]
+            else:
+                self.freeCadObjectsByLabel[obj.Label].append(obj)
+            self.freeCadObjectsByName[obj.Name] = obj
+
+    def getFreeCADObjectsByLabel(self, objLabel):
+        """
+        Returns list of document objects with given label, empty list if there is no such object.
+        :param objLabel: object label as displayed in tree widgets
+        :return: list of objects
+        """
+        if self.freeCadObjectsByLabel is None:
+            self.initFreeCADObjectIndex()
+        return self.freeCadObjectsByLabel.get(objLabel, [])
+
+    def getFreeCADObjectByName(self, objName):
+        """
+        Returns document object by its internal name or None if not found.
+        :param objName: object internal name (FreeCAD obj.Name)
+        :return: object or None
+        """
+        if self.freeCadObjectsByName is None:
+            self.initFreeCADObjectIndex()
+        return self.freeCadObjectsByName.get(objName, None)
+
+    def initItemPriorityMap(self):
+        """
+        Builds table "category, group, object" -> priority from objects priority tree view, must be called at start of each generation run.
+        Priority formula is same as it was when tree view was traversed for each object, see getItemPriority().
+        """
+        self.itemPriorityMap = {}
+        itemsCount = self.form.objectAssignmentPriorityTreeView.topLevelItemCount()
+        for k in range(itemsCount):
+            priorityItemName = self.form.objectAssignmentPriorityTreeView.topLevelItem(k).text(0)
+            #
+            #	THIS IS MY FORMULA TO HAVE AT LEAST TWO 0 AT END AND NOT HAVE PRIORITY INDEX 0 BUT START AT 100 AT LEAST!
+            #		ATTENTION: higher number means higher priority so fromual is: (1001 - k)     ...to get item at top of tree view with highest priority numbers!
+            #
+            if not (priorityItemName in self.itemPriorityMap):
+                self.itemPriorityMap[priorityItemName] = (100 - k) * 100
+
+    def initGenerationCaches(self):
+        """
+        Resets all lookup tables which are valid just during one generation run, called by each generation entry point
+        (script generation, S-parameters, NF2FF) before any section is generated.
+        If shared simulation model is set its tables are used so they are not built again.
+        """
+        #
+        #   members filled by sections are part of section cache key, they must start each run empty, otherwise key would see
+        #   values of previous run and cached sections would never match
+        #
+        self.internalPortIndexNamesList = {}
+        self.internalMaterialIndexNamesList = {}
+        self.internalNF2FFIndexNamesList = {}
+        self.maxGridResolution_m = 0
+
+        if self.sharedSimulationIR is not None:
+            self.simulationIR = self.sharedSimulationIR
+            self.freeCadObjectsByLabel = self.simulationIR.freeCadObjectsByLabel
+            self.freeCadObjectsByName = self.simulationIR.freeCadObjectsByName
+            self.itemPriorityMap = self.simulationIR.itemPriorityMap
+            self.shapeSnapshots = self.simulationIR.shapeSnapshots
+            return
+
+        self.initFreeCADObjectIndex()
+        self.initItemPriorityMap()
+        self.shapeSnapshots = {}
+        self.simulationIR = None
+
+    def buildSimulationIR(self):
+        """
+        Build simulation model from object assignment tree, objects priorities and shape snapshots of current generation run.
+        :return: SimulationIR
+        """
+        if self.freeCadObjectsByLabel is None:
+            self.initFreeCADObjectIndex()
+        if self.itemPriorityMap is None:
+            self.initItemPriorityMap()
+
+        simulationIR = SimulationIR(self.freeCadObjectsByLabel, self.freeCadObjectsByName, self.itemPriorityMap, self.shapeSnapshots)
+        itemsByClassName = self.getItemsByClassName()
+        for category, className in SimulationIR.CATEGORIES.items():
+            for [item, currSetting] in itemsByClassName.get(className, []):
+                primitives = []
+                for k in range(item.childCount()):
+                    childName = item.child(k).text(0)
+                    objects = self.getFreeCADObjectsByLabel(childName)
+                    snapshot = self.getShapeSnapshot(objects[0]) if len(objects) > 0 else None
+                    priority = self.getItemPriority(item.parent().text(0) + ", " + item.text(0) + ", " + childName)
+                    primitives.append(IRPrimitive(childName, objects, priority, snapshot))
+                simulationIR.addGroup(category, item.text(0), currSetting, primitives)
+
+        return simulationIR
+
+    def getSimulationIR(self):
+        """
+        Returns simulation model of current generation run, it's built at first use and dropped by initGenerationCaches().
+        """
+        if self.simulationIR is None:
+            self.simulationIR = self.buildSimulationIR()
+        return self.simulationIR
+
+    @staticmethod
+    def generateOpenEMSScriptsInOnePass(scriptGenerators, outputDir=None):
+        """
+        Generate simulation scripts by more generators (ie. octave and python) from one simulation model, objects are indexed,
+        shapes read and STL files exported just once.
+        :param scriptGenerators: list of script generators
+        :param outputDir: simulation output directory
+        """
+        if len(scriptGenerators) == 0:
+            return
+
+        firstGenerator = scriptGenerators[0]
+        firstGenerator.sharedSimulationIR = None
+        firstGenerator.initGenerationCaches()
+        simulationIR = firstGenerator.getSimulationIR()
+
+        try:
+            for scriptGenerator in scriptGenerators:
+                scriptGenerator.sharedSimulationIR = simulationIR
+                scriptGenerator.generateOpenEMSScript(outputDir)
+        finally:
+            for scriptGenerator in scriptGenerators:
+                scriptGenerator.sharedSimulationIR = None
+
+    def getShapeSnapshot(self, obj):
+        """
+        Returns shape data of object captured once during generation run, snapshots are dropped by initGenerationCaches().
+        :param obj: CAD object
+        :return: ShapeSnapshot
+        """
+        snapshot = self.shapeSnapshots.get(obj.Name, None)
+        if snapshot is None:
+            snapshot = ShapeSnapshot(obj)
+            self.shapeSnapshots[obj.Name] = snapshot
+        return snapshot
+
+    def getObjectBrepString(self, obj):
+        """
+        Returns BREP string of object serialized once during generation run, see ShapeSnapshot.getBrepString().
+        """
+        return self.getShapeSnapshot(obj).getBrepString(self.cadHelpers)
+
     #
     #	Returns object priority
-    #		priorityItemName - string which identifies item by its text in priority tree view widget
+    #		priorityItemName - string which identifies item by its text in priority tree view widget ("category, group, object")
     #
     def getItemPriority(self, priorityItemName):
         #
-        #	priority is read from tree view
+        #	priority is read from table built from tree view, if item is not in priority list default value is returned
         #
-        priorityItemValue = 42
-        itemsCount = self.form.objectAssignmentPriorityTreeView.topLevelItemCount()
-        for k in range(itemsCount):
-            priorityItem = self.form.objectAssignmentPriorityTreeView.topLevelItem(k)
-            if priorityItemName in priorityItem.text(0):
-                #
-                #	THIS IS MY FORMULA TO HAVE AT LEAST TWO 0 AT END AND NOT HAVE PRIORITY INDEX 0 BUT START AT 100 AT LEAST!
-                #		ATTENTION: higher number means higher priority so fromual is: (1001 - k)     ...to get item at top of tree view with highest priority numbers!
-                #
-                priorityItemValue = (100 - k) * 100
-                break  # this will break loop SO JUST ONE ITEM FROM PRIORITY LIST IS DELETED
+        if self.itemPriorityMap is None:
+            self.initItemPriorityMap()
+        return self.itemPriorityMap.get(priorityItemName, 42)
+
+    def readSTLExportManifest(self, exportDir):
+        """
+        Returns dictionary STL file name -> geometry fingerprint of files previously exported into given directory.
+        """
+        manifestFileName = os.path.join(exportDir, self.STL_EXPORT_MANIFEST_FILE_NAME)
+        if not os.path.exists(manifestFileName):
+            return {}
+        try:
+            with open(manifestFileName, "r", encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read STL export manifest {manifestFileName}, all objects will be exported: {e}")
+            return {}
+
+    def writeSTLExportManifest(self, exportDir, manifest):
+        manifestFileName = os.path.join(exportDir, self.STL_EXPORT_MANIFEST_FILE_NAME)
+        with open(manifestFileName, "w", encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def exportSTLFiles(self, stlExportJobs):
+        """
+        Export material objects into STL files, parts are independent so CAD interface can export them concurrently.
+        Files which geometry fingerprint is same as stored in manifest in output directory and which still exist are not exported again.
+        :param stlExportJobs: list of (partToExport, exportFileName), file names are given by generated script so they don't depend on export order
+        """
+        if len(stlExportJobs) == 0:
+            return
+
+        manifests = {}
+        jobsToExport = []
+        exportedFingerprints = []
+        for partToExport, exportFileName in stlExportJobs:
+            if self.simulationIR is not None and os.path.abspath(exportFileName) in self.simulationIR.exportedSTLFiles:
+                print("Material object STL already exported in this generation pass: " + exportFileName)
+                continue
+
+            exportDir = os.path.dirname(exportFileName)
+            if not (exportDir in manifests):
+                manifests[exportDir] = self.readSTLExportManifest(exportDir)
+
+            fingerprint = self.cadHelpers.getSTLExportFingerprint(partToExport, self.getObjectBrepString)
+            stlFileName = os.path.basename(exportFileName)
+            if fingerprint is not None and manifests[exportDir].get(stlFileName, None) == fingerprint and os.path.exists(exportFileName):
+                print("Material object STL not changed, skipping export: " + exportFileName)
+                if self.profiler is not None:
+                    self.profiler.addSTLFile(exportFileName, exported=False)
+                continue
+
+            jobsToExport.append((partToExport, exportFileName))
+            exportedFingerprints.append((exportDir, stlFileName, fingerprint))
+
+        if len(jobsToExport) > 0:
+            print(f"Exporting {len(jobsToExport)} material objects as STL using {self.stlExportWorkersCount} workers.")
+            if self.profiler is not None:
+                with self.profiler.section("stl export"):
+                    self.cadHelpers.exportSTLBatch(jobsToExport, self.stlExportWorkersCount, self.getObjectBrepString)
+            else:
+                self.cadHelpers.exportSTLBatch(jobsToExport, self.stlExportWorkersCount, self.getObjectBrepString)
+            for partToExport, exportFileName in jobsToExport:
+                print("Material object exported as STL into: " + exportFileName)
+                if self.profiler is not None:
+                    self.profiler.addSTLFile(exportFileName, exported=True)
+
+        #
+        #   manifest is updated just after all files were successfully exported
+        #
+        for exportDir, stlFileName, fingerprint in exportedFingerprints:
+            if fingerprint is None:
+                manifests[exportDir].pop(stlFileName, None)
+            else:
+                manifests[exportDir][stlFileName] = fingerprint
+        for exportDir, manifest in manifests.items():
+            self.writeSTLExportManifest(exportDir, manifest)
+
+        for partToExport, exportFileName in stlExportJobs:
+            self.registerSectionOutputFile(exportFileName)
+
+        if self.simulationIR is not None:
+            self.simulationIR.exportedSTLFiles.update([os.path.abspath(exportFileName) for partToExport, exportFileName in stlExportJobs])
+
+    def getSectionInputsKey(self, category, items, outputDir=None, extraInputs=None):
+        """
+        Returns hash of everything section script lines depend on: settings items with assigned objects and their priorities, geometry of
+        assigned objects, units and coordinate system. If CAD interface cannot provide geometry key for some object None is returned
+        and section is not cached.
+        :param category: category in object assignment tree
+        :param items: list of [treeItem, settingsItem] as returned by getItemsByClassName()
+        :param outputDir: output directory, files written by section are placed there
+        :param extraInputs: other values section depends on
+        :return: hash string or None
+        """
+        inputsHash = hashlib.sha1()
+        inputsHash.update(repr((self.__class__.__name__, outputDir, self.form.simParamsDeltaUnitList.currentText(), self.getModelCoordsType(), self.pointsSidecarThreshold, extraInputs)).encode('utf-8'))
+
+        for [item, currSetting] in (items if items else []):
+            inputsHash.update(item.text(0).encode('utf-8'))
+            inputsHash.update(json.dumps(currSetting.__dict__, sort_keys=True, default=str).encode('utf-8'))
+            inputsHash.update(repr([item.child(k).text(0) for k in range(item.childCount())]).encode('utf-8'))
+
+            if not (category in SimulationIR.CATEGORIES):
+                continue
+            for primitive in self.getSimulationIR().getPrimitives(category, item.text(0)):
+                inputsHash.update(repr((primitive.label, primitive.priority)).encode('utf-8'))
+                for obj in primitive.objects:
+                    geometryKey = self.cadHelpers.getObjectGeometryKey(obj, brepProvider=self.getObjectBrepString)
+                    if geometryKey is None:
+                        return None
+                    inputsHash.update(repr(geometryKey).encode('utf-8'))
+
+        return inputsHash.hexdigest()
+
+    def getGridSectionInputsKey(self, gridItems, materialItems, outputDir=None):
+        """
+        Returns inputs hash of grid section, it depends on mesh priorities and in case of Auto Mesh grid also on material objects.
+        :param gridItems: list of [treeItem, GridSettingsItem]
+        :param materialItems: list of [treeItem, MaterialSettingsItem]
+        :return: hash string or None
+        """
+        meshPriorities = [self.form.meshPriorityTreeView.topLevelItem(k).text(0) for k in range(self.form.meshPriorityTreeView.topLevelItemCount())]
+        extraInputs = [meshPriorities]
+        if any([gridSettingsInst.getType() == "Auto Mesh" for [gridItem, gridSettingsInst] in (gridItems if gridItems else [])]):
+            materialsKey = self.getSectionInputsKey("Material", materialItems)
+            if materialsKey is None:
+                return None
+            extraInputs.append(materialsKey)
+        return self.getSectionInputsKey("Grid", gridItems, outputDir, extraInputs=extraInputs)
+
+    def getCachedSectionScriptLines(self, sectionName, inputsKey, generateSection):
+        """
+        Returns section script lines from cache if section inputs didn't change since last generation, otherwise generates section and stores it.
+        :param sectionName: section name, one cache entry is kept for each section
+        :param inputsKey: hash returned by getSectionInputsKey(), None means section is always generated
+        :param generateSection: function without parameters which returns section script lines
+        :return: script lines
+        """
+        if inputsKey is None or not self.sectionCacheEnabled:
+            return generateSection()
+
+        inputsKey += self.sectionCache.getStateKey(self)
+        entry = self.sectionCache.lookup(sectionName, inputsKey)
+        if entry is not None:
+            print(f"Section {sectionName} not changed, using script lines from previous generation.")
+            self.sectionCache.restoreState(self, entry.stateAfter)
+            return entry.scriptLines
+
+        self.sectionOutputFiles = []
+        try:
+            scriptLines = generateSection()
+            self.sectionCache.store(sectionName, inputsKey, scriptLines, self.sectionCache.getState(self), self.sectionOutputFiles)
+        finally:
+            self.sectionOutputFiles = None
+        return scriptLines
+
+    def writeCachedSection(self, scriptWriter, sectionName, inputsKey, writeSection):
+        """
+        Same as getCachedSectionScriptLines() for sections which are streamed into script writer, written text is captured on the side
+        and stored in cache if it's not longer than sectionCacheMaxLength.
+        :param scriptWriter: ScriptWriter of generated script
+        :param sectionName: section name, one cache entry is kept for each section
+        :param inputsKey: hash returned by getSectionInputsKey(), None means section is always generated
+        :param writeSection: function with scriptWriter parameter which writes section into it
+        """
+        if inputsKey is None or not self.sectionCacheEnabled:
+            writeSection(scriptWriter)
+            return
+
+        inputsKey += self.sectionCache.getStateKey(self)
+        entry = self.sectionCache.lookup(sectionName, inputsKey)
+        if entry is not None:
+            print(f"Section {sectionName} not changed, using script lines from previous generation.")
+            self.sectionCache.restoreState(self, entry.stateAfter)
+            scriptWriter += entry.scriptLines
+            return
+
+        self.sectionOutputFiles = []
+        scriptWriter.startCapture(self.sectionCacheMaxLength)
+        try:
+            writeSection(scriptWriter)
+            scriptLines = scriptWriter.stopCapture()
+            if scriptLines is not None:
+                self.sectionCache.store(sectionName, inputsKey, scriptLines, self.sectionCache.getState(self), self.sectionOutputFiles)
+            else:
+                print(f"Section {sectionName} is longer than {self.sectionCacheMaxLength} characters, it's not cached.")
+        finally:
+            scriptWriter.stopCapture()
+            self.sectionOutputFiles = None
+
+    def registerSectionOutputFile(self, fileName):
+        """
+        Remember file written by currently generated section, cached section is used just if all its files still exist.
+        """
+        if self.sectionOutputFiles is not None:
+            self.sectionOutputFiles.append(fileName)
+
+    def startGenerationProfiler(self, scriptWriter=None):
+        """
+        Start measurement of generation run, script writer can be assigned to profiler later when output file is opened.
+        """
+        if self.profiler is not None:
+            self.profiler.stopProfile()
+        self.profiler = GenerationProfiler(scriptWriter)
+        return self.profiler
+
+    def finishGenerationProfiler(self, scriptFileName):
+        """
+        Write generation report next to generated script and show summary in status bar.
+        """
+        if self.profiler is None:
+            return
+        try:
+            self.profiler.finish(os.path.splitext(scriptFileName)[0] + "_generation_report.json")
+            summary = self.profiler.getSummary()
+            print(summary)
+            if self.statusBar is not None:
+                self.statusBar.showMessage(summary, 10000)
+        except OSError as e:
+            print(f"Cannot write generation report: {e}")
+        self.profiler = None
+
+    def abortGenerationProfiler(self):
+        """
+        Stop measurement without writing report, used when generation fails.
+        """
+        if self.profiler is not None:
+            self.profiler.stopProfile()
+        self.profiler = None
+
+    def getSidecarDir(self, outputDir=None):
+        """
+        Returns directory where files loaded by generated script are written (STL models, point lists), it's same directory as for generated script.
+        """
+        if outputDir is None:
+            return os.path.dirname(self.cadHelpers.getCurrDocumentFileName())
+        return outputDir
+
+    def isPointsSidecarNeeded(self, points):
+        """
+        :param points: list of coordinates lists [[x...], [y...]] or [[x...], [y...], [z...]]
+        :return: True if points should be saved into sidecar file instead of written into script
+        """
+        return self.pointsSidecarThreshold > 0 and len(points[0]) > self.pointsSidecarThreshold
+
+    def getGridObjectBounds(self, gridSettingsInst, bbCoords):
+        """
+        Returns grid boundaries for object bounding box in drawing units, when grid lines are generated inside object they are moved by grid offset.
+        :param gridSettingsInst: GridSettingsItem
+        :param bbCoords: object bounding box in FreeCAD units
+        :return: xmin, xmax, ymin, ymax, zmin, zmax
+        """
+        sf = self.getFreeCADUnitLength_m() / self.getUnitLengthFromUI_m()
+
+        deltaX = 0
+        deltaY = 0
+        deltaZ = 0
+        if gridSettingsInst.generateLinesInside:
+            gridOffset = gridSettingsInst.getGridOffset()
+            unitsAsNumber = gridSettingsInst.getUnitsAsNumber(gridOffset['units'])
+            if gridSettingsInst.xenabled:
+                deltaX = gridOffset['x'] * unitsAsNumber * (1 / self.getUnitLengthFromUI_m())
+            if gridSettingsInst.yenabled:
+                deltaY = gridOffset['y'] * unitsAsNumber * (1 / self.getUnitLengthFromUI_m())
+            if gridSettingsInst.zenabled:
+                deltaZ = gridOffset['z'] * unitsAsNumber * (1 / self.getUnitLengthFromUI_m())
+
+        xmax = sf * bbCoords.XMax - np.sign(bbCoords.XMax - bbCoords.XMin) * deltaX
+        ymax = sf * bbCoords.YMax - np.sign(bbCoords.YMax - bbCoords.YMin) * deltaY
+        zmax = sf * bbCoords.ZMax - np.sign(bbCoords.ZMax - bbCoords.ZMin) * deltaZ
+        xmin = sf * bbCoords.XMin + np.sign(bbCoords.XMax - bbCoords.XMin) * deltaX
+        ymin = sf * bbCoords.YMin + np.sign(bbCoords.YMax - bbCoords.YMin) * deltaY
+        zmin = sf * bbCoords.ZMin + np.sign(bbCoords.ZMax - bbCoords.ZMin) * deltaZ
+
+        return xmin, xmax, ymin, ymax, zmin, zmax
+
+    def resolveMeshLines(self, items):
+        """
+        Resolve grid settings into final grid lines in plugin. Grids are applied in mesh priority order with same rules as generated script
+        applies them (top priority lines removal, fixed distance, fixed count, smooth mesh, auto mesh).
+        :param items: list of [treeItem, GridSettingsItem] as returned by getItemsByClassName()
+        :return: MeshEngine with resolved lines, None if some grid can be resolved just when script runs (User Defined grid is script code,
+                 smooth mesh with maximal resolution from excitation which is not known)
+        """
+        meshPrioritiesCount = self.form.meshPriorityTreeView.topLevelItemCount()
+        if (not items) or (meshPrioritiesCount == 0):
+            return None
+
+        refUnit = self.getUnitLengthFromUI_m()
+        _v = MeshEngine.getScriptValue
+
+        _assoc = lambda idx: list(map(str.strip, self.form.meshPriorityTreeView.topLevelItem(idx).text(0).split(',')))
+        orderedAssociations = [_assoc(k) for k in reversed(range(meshPrioritiesCount))]
+        gridItems = {gridSettingsNode.text(0): [gridSettingsNode, gridSettingsInst] for [gridSettingsNode, gridSettingsInst] in reversed(items)}
+
+        meshEngine = MeshEngine()
+        for [categoryName, gridName, FreeCADObjectName] in orderedAssociations:
+            if not (gridName in gridItems):
+                continue
+            gridCategoryObj, gridSettingsInst = gridItems[gridName]
+            gridType = gridSettingsInst.getType()
+            enabledAxes = [axis for axis, enabled in zip(MeshEngine.AXES, (gridSettingsInst.xenabled, gridSettingsInst.yenabled, gridSettingsInst.zenabled)) if enabled]
+
+            if (gridType == 'User Defined'):
+                print(f"Mesh engine: grid {gridName} is User Defined, grid lines are resolved by generated script.")
+                return None
+
+            elif (gridType in ['Fixed Distance', 'Fixed Count']):
+                fcObjects = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+                if len(fcObjects) == 0 or not ("Shape" in dir(fcObjects[-1])):
+                    continue
+                bbCoords = self.getShapeSnapshot(fcObjects[-1]).getBoundBox()
+                xmin, xmax, ymin, ymax, zmin, zmax = self.getGridObjectBounds(gridSettingsInst, bbCoords)
+
+                yParam = gridSettingsInst.getXYZ(refUnit)['y']
+                if (gridSettingsInst.coordsType == "cylindrical"):
+                    xmin, xmax, ymin, ymax, zmin, zmax = gridSettingsInst.getCartesianAsCylindricalCoords(bbCoords, xmin, xmax, ymin, ymax, zmin, zmax)
+                    if (gridType == 'Fixed Distance' and gridSettingsInst.unitsAngle == "deg"):
+                        yParam = math.radians(yParam)
+
+                rawBounds = {'x': (xmin, xmax), 'y': (ymin, ymax), 'z': (zmin, zmax)}
+                bounds = {axis: (_v(rawBounds[axis][0]), _v(rawBounds[axis][1])) for axis in MeshEngine.AXES}
+                params = {'x': _v(gridSettingsInst.getXYZ(refUnit)['x']), 'y': _v(yParam), 'z': _v(gridSettingsInst.getXYZ(refUnit)['z'])}
+
+                meshEngine.addRule(f"{gridSettingsInst.getName()} - {FreeCADObjectName} ({gridType})")
+                for axis in enabledAxes:
+                    topPrioritySpan = bounds[axis] if gridSettingsInst.topPriorityLines else None
+                    if (gridType == 'Fixed Distance'):
+                        meshEngine.addLines(axis, MeshEngine.arangeWithEndpoint(bounds[axis][0], bounds[axis][1], params[axis]), topPrioritySpan)
+                    elif gridSettingsInst.getXYZ()[axis] == 1:
+                        meshEngine.addLines(axis, [_v((rawBounds[axis][0] + rawBounds[axis][1]) / 2)], topPrioritySpan)
+                    else:
+                        meshEngine.addLines(axis, MeshEngine.fixedCountLines(bounds[axis][0], bounds[axis][1], params[axis]), topPrioritySpan)
+
+            elif (gridType in ['Smooth Mesh', 'Auto Mesh']):
+                if (gridType == 'Smooth Mesh'):
+                    smoothMeshLines = self.getSmoothMeshLines(gridCategoryObj, gridSettingsInst)
+                else:
+                    smoothMeshLines = self.getAutoMeshLines(gridCategoryObj, gridSettingsInst)
+                if smoothMeshLines is None:
+                    print(f"Mesh engine: maximal resolution for {gridType.lower()} {gridName} is not known, grid lines are resolved by generated script.")
+                    return None
+
+                meshEngine.addRule(f"{gridSettingsInst.getName()} - {', '.join([gridCategoryObj.child(k).text(0) for k in range(gridCategoryObj.childCount())])} ({gridType})")
+                for axis, (fixedLines, lines) in smoothMeshLines.items():
+                    topPrioritySpan = (_v(fixedLines[0]), _v(fixedLines[-1])) if gridSettingsInst.topPriorityLines else None
+                    meshEngine.addLines(axis, lines, topPrioritySpan)
+
+        print(f"Mesh engine: grid lines resolved, lines count {meshEngine.getLinesCount()}")
+        return meshEngine
+
+    def getSmoothMeshLines(self, gridItem, gridSettingsInst):
+        """
+        Returns lines of Smooth Mesh grid, boundaries of all objects assigned to grid are smoothed together into one set of lines for each axis.
+        :param gridItem: grid item in object assignment tree, its children are assigned objects
+        :param gridSettingsInst: GridSettingsItem of Smooth Mesh type
+        :return: dict {axis: (sorted object boundaries, smoothed lines)} for enabled axes with some object, in drawing units,
+                 None if maximal resolution should be taken from excitation and it's not known
+        """
+        refUnit = self.getUnitLengthFromUI_m()
+
+        boundsLists = {axis: [] for axis in MeshEngine.AXES}
+        for k in range(gridItem.childCount()):
+            fcObjects = self.getFreeCADObjectsByLabel(gridItem.child(k).text(0))
+            if len(fcObjects) == 0 or not ("Shape" in dir(fcObjects[-1])):
+                continue
+            xmin, xmax, ymin, ymax, zmin, zmax = self.getGridObjectBounds(gridSettingsInst, self.getShapeSnapshot(fcObjects[-1]).getBoundBox())
+            boundsLists['x'] += [xmax, xmin]
+            boundsLists['y'] += [ymax, ymin]
+            boundsLists['z'] += [zmax, zmin]
+
+        maxRes = {axis: gridSettingsInst.smoothMesh[axis + 'MaxRes'] for axis in MeshEngine.AXES}
+        if (gridSettingsInst.coordsType == "cylindrical" and gridSettingsInst.unitsAngle == "deg"):
+            maxRes['y'] = math.radians(maxRes['y'])
+
+        enabledAxes = [axis for axis, enabled in zip(MeshEngine.AXES, (gridSettingsInst.xenabled, gridSettingsInst.yenabled, gridSettingsInst.zenabled)) if enabled]
+        smoothMeshLines = {}
+        for axis in enabledAxes:
+            fixedLines = sorted(boundsLists[axis])
+            if len(fixedLines) == 0:
+                continue
+
+            #
+            #   max resolution 0 means it's taken from excitation, same as max_res in generated script
+            #
+            axisMaxRes = maxRes[axis]
+            if gridSettingsInst.smoothMesh[axis + 'MaxRes'] == 0:
+                if not getattr(self, "maxGridResolution_m", 0):
+                    return None
+                axisMaxRes = self.maxGridResolution_m / refUnit
+
+            smoothMeshLines[axis] = (fixedLines, MeshEngine.smoothMeshLines(fixedLines, axisMaxRes))
+
+        return smoothMeshLines
+
+    def getAutoMeshLines(self, gridItem, gridSettingsInst):
+        """
+        Returns lines of Auto Mesh grid. Objects assigned to grid define meshed domain, edges of all objects assigned to materials
+        which are inside domain become fixed lines (metal and conducting sheet edges by 1/3-2/3 rule) and space between them is
+        filled by smooth mesh up to max resolution.
+        :param gridItem: grid item in object assignment tree, its children define meshed domain
+        :param gridSettingsInst: GridSettingsItem of Auto Mesh type
+        :return: dict {axis: (sorted fixed lines, final lines)} for enabled axes, in drawing units,
+                 None if maximal resolution should be taken from excitation and it's not known
+        """
+        refUnit = self.getUnitLengthFromUI_m()
+        sf = self.getFreeCADUnitLength_m() / refUnit
+        isCylindrical = gridSettingsInst.coordsType == "cylindrical"
+
+        def getObjectBounds(obj, applyGridOffset):
+            bbCoords = self.getShapeSnapshot(obj).getBoundBox()
+            if applyGridOffset:
+                bounds = self.getGridObjectBounds(gridSettingsInst, bbCoords)
+            else:
+                bounds = (sf * bbCoords.XMin, sf * bbCoords.XMax, sf * bbCoords.YMin, sf * bbCoords.YMax, sf * bbCoords.ZMin, sf * bbCoords.ZMax)
+            if isCylindrical:
+                bounds = gridSettingsInst.getCartesianAsCylindricalCoords(bbCoords, *bounds)
+            return {'x': bounds[0:2], 'y': bounds[2:4], 'z': bounds[4:6]}
+
+        #
+        #   domain is bounding box of all objects assigned to grid
+        #
+        domain = {}
+        for k in range(gridItem.childCount()):
+            fcObjects = self.getFreeCADObjectsByLabel(gridItem.child(k).text(0))
+            if len(fcObjects) == 0 or not ("Shape" in dir(fcObjects[-1])):
+                continue
+            for axis, (minValue, maxValue) in getObjectBounds(fcObjects[-1], True).items():
+                domain[axis] = (min(minValue, domain[axis][0]), max(maxValue, domain[axis][1])) if axis in domain else (minValue, maxValue)
+        if len(domain) == 0:
+            return {}
+
+        maxRes = {axis: gridSettingsInst.autoMesh[axis + 'MaxRes'] for axis in MeshEngine.AXES}
+        if (isCylindrical and gridSettingsInst.unitsAngle == "deg"):
+            maxRes['y'] = math.radians(maxRes['y'])
+        for axis in MeshEngine.AXES:
+            #
+            #   max resolution 0 means it's taken from excitation, same as for smooth mesh
+            #
+            if gridSettingsInst.autoMesh[axis + 'MaxRes'] == 0:
+                if not getattr(self, "maxGridResolution_m", 0):
+                    return None
+                maxRes[axis] = self.maxGridResolution_m / refUnit
+        edgeRes = {axis: maxRes[axis] / max(gridSettingsInst.autoMesh.get('edgeResDivider', 4), 1) for axis in MeshEngine.AXES}
+
+        #
+        #   edges of material objects
+        #
+        edgeLinesLists = {axis: [np.array(domain[axis], dtype=np.float64)] for axis in MeshEngine.AXES}
+        for [materialItem, materialSettingsInst] in self.getCategoryItems("Material"):
+            isMetal = getattr(materialSettingsInst, "type", "") in ["metal", "conducting sheet"]
+            for k in range(materialItem.childCount()):
+                fcObjects = self.getFreeCADObjectsByLabel(materialItem.child(k).text(0))
+                if len(fcObjects) == 0 or not ("Shape" in dir(fcObjects[-1])):
+                    continue
+                for axis, (minValue, maxValue) in getObjectBounds(fcObjects[-1], False).items():
+                    edgeLinesLists[axis].append(MeshEngine.getEdgeLines(minValue, maxValue, edgeRes[axis], isMetal))
+
+        enabledAxes = [axis for axis, enabled in zip(MeshEngine.AXES, (gridSettingsInst.xenabled, gridSettingsInst.yenabled, gridSettingsInst.zenabled)) if enabled]
+        autoMeshLines = {}
+        for axis in enabledAxes:
+            domainMin, domainMax = domain[axis]
+
+            #
+            #   lines of neighbouring edges closer than half of edge resolution are merged, domain boundaries are kept as they are
+            #
+            minDistance = edgeRes[axis] / 2
+            edgeLines = MeshEngine.mergeCloseLines(np.concatenate(edgeLinesLists[axis]), minDistance)
+            edgeLines = edgeLines[(edgeLines > domainMin + minDistance) & (edgeLines < domainMax - minDistance)]
+            fixedLines = np.concatenate(([domainMin], edgeLines, [domainMax]))
+
+            #
+            #   space between fixed lines is smoothed up to max resolution, then cells next to small edge cells are graded so
+            #   neighbouring cells sizes differ by at most smooth mesh ratio
+            #
+            autoMeshLines[axis] = (fixedLines, MeshEngine.gradeLines(MeshEngine.smoothMeshLines(fixedLines, maxRes[axis])))
+
+        return autoMeshLines
+
+    def getNF2FFMeshLines(self, items):
+        """
+        Grid lines added by generated script at boundaries of NF2FF boxes, same as lines written by getNF2FFDefinitionsScriptLines().
+        :param items: list of [treeItem, ProbeSettingsItem]
+        :return: dict {'x': lines, 'y': lines, 'z': lines} in drawing units
+        """
+        sf = self.getFreeCADUnitLength_m() / self.getUnitLengthFromUI_m()  # scaling factor for FreeCAD units to drawing units
+        nf2ffLines = {axis: [] for axis in MeshEngine.AXES}
+
+        for [item, currSetting] in (items if items else []):
+            if currSetting.getType() != 'nf2ff box':
+                continue
+            for k in range(item.childCount()):
+                for obj in self.getFreeCADObjectsByLabel(item.child(k).text(0)):
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
+                    nf2ffLines["x"] += [MeshEngine.getScriptValue(sf * bbCoords.XMin), MeshEngine.getScriptValue(sf * bbCoords.XMax)]
+                    nf2ffLines["y"] += [MeshEngine.getScriptValue(sf * bbCoords.YMin), MeshEngine.getScriptValue(sf * bbCoords.YMax)]
+                    nf2ffLines["z"] += [MeshEngine.getScriptValue(sf * bbCoords.ZMin), MeshEngine.getScriptValue(sf * bbCoords.ZMax)]
+
+        return nf2ffLines
+
+    def getExcitationSettings(self):
+        """
+        Returns settings of excitation used by simulation (first item in Excitation category), None if there is none.
+        Unlike getExcitationScriptLines() nothing is printed and no message is shown, so it can be used by preview and estimate.
+        """
+        excitationItems = self.getCategoryItems("Excitation")
+        return excitationItems[0][1] if len(excitationItems) > 0 else None
+
+    @staticmethod
+    def getExcitationMaxGridResolution_m(excitationSettings):
+        """
+        Maximal grid resolution given by excitation, 1/20 of wavelength at maximal excited frequency, same as max_res in generated script.
+        :param excitationSettings: ExcitationSettingsItem or None
+        :return: resolution in meters, 0 if excitation doesn't define it (custom excitation or no excitation)
+        """
+        if excitationSettings is None:
+            return 0
+
+        units = excitationSettings.getUnitsAsNumber(excitationSettings.units)
+        excitationType = excitationSettings.getType()
+        if excitationType == 'sinusodial':
+            maxFrequency = float(excitationSettings.sinusodial['f0']) * units
+        elif excitationType == 'gaussian':
+            maxFrequency = (float(excitationSettings.gaussian['f0']) + float(excitationSettings.gaussian['fc'])) * units
+        elif excitationType == 'step':
+            maxFrequency = float(excitationSettings.step['fm']) * units
+        elif excitationType == 'dirac':
+            maxFrequency = float(excitationSettings.dirac['fm']) * units
+        else:
+            return 0
+
+        return CommonScriptLinesGenerator.C0 / (maxFrequency * 20) if maxFrequency > 0 else 0
+
+    def getFinalMeshLines(self):
+        """
+        Final grid lines as they end up in simulation: grids resolved by MeshEngine with priorities, lines at NF2FF boxes boundaries
+        which generated script adds after grid section and when enabled in GUI minimal gridlines spacing applied same way as generated
+        script does it.
+        :return: dict {'x': lines, 'y': lines, 'z': lines} in drawing units, None if grid cannot be resolved in plugin
+        """
+        self.initGenerationCaches()
+
+        #
+        #   excitation sets maximal grid resolution used by smooth mesh grids
+        #
+        self.maxGridResolution_m = self.getExcitationMaxGridResolution_m(self.getExcitationSettings())
+
+        meshEngine = self.resolveMeshLines(self.getCategoryItems("Grid"))
+        if meshEngine is None:
+            return None
+
+        nf2ffLines = self.getNF2FFMeshLines(self.getCategoryItems("Probe"))
+        meshLines = {axis: np.unique(np.concatenate((meshEngine.getLines(axis), nf2ffLines[axis]))) for axis in MeshEngine.AXES}
+        if self.form.genParamMinGridSpacingEnable.isChecked():
+            minSpacing = {
+                "x": self.form.genParamMinGridSpacingX.value() / 1000 / self.getUnitLengthFromUI_m(),
+                "y": self.form.genParamMinGridSpacingY.value() / 1000 / self.getUnitLengthFromUI_m(),
+                "z": self.form.genParamMinGridSpacingZ.value() / 1000 / self.getUnitLengthFromUI_m(),
+            }
+            meshLines = {axis: MeshEngine.removeCloseLines(lines, minSpacing[axis]) for axis, lines in meshLines.items()}
+
+        return meshLines
+
+    def estimateSimulationCost(self):
+        """
+        Estimate simulation cost from final grid lines, maximal timesteps and excitation set in GUI.
+        :return: dict returned by SimulationCostEstimator.estimate(), None if grid cannot be resolved in plugin
+        """
+        meshLines = self.getFinalMeshLines()
+        if meshLines is None:
+            return None
 
-        return priorityItemValue
+        return SimulationCostEstimator().estimate(
+            meshLines,
+            self.getUnitLengthFromUI_m(),
+            self.getModelCoordsType(),
+            self.form.simParamsMaxTimesteps.value(),
+            self.getExcitationSettings()
+        )
 
     #
     #   Returns current FreeCAD file:
@@ -172,7 +972,9 @@ class CommonScriptLinesGenerator:
         normDir = ""
         elevation = 0.0
         points = [[],[]]
-        bbCoords = freeCadObj.Shape.BoundBox
+        shapeSnapshot = self.getShapeSnapshot(freeCadObj)
+        bbCoords = shapeSnapshot.getBoundBox()
+        orderedVertexes = shapeSnapshot.getOrderedVertexes()
 
         if (_r(bbCoords.XMin) == _r(bbCoords.XMax)):
             normDir = "x"
@@ -194,23 +996,23 @@ class CommonScriptLinesGenerator:
         """
 
         if normDir == 'x':
-            for v in freeCadObj.Shape.OrderedVertexes:
+            for v in orderedVertexes:
                 points[0].append(_r(v.Y))
                 points[1].append(_r(v.Z))
-            points[0].append(_r(freeCadObj.Shape.OrderedVertexes[0].Y))
-            points[1].append(_r(freeCadObj.Shape.OrderedVertexes[0].Z))
+            points[0].append(_r(orderedVertexes[0].Y))
+            points[1].append(_r(orderedVertexes[0].Z))
         elif normDir == 'y':
-            for v in freeCadObj.Shape.OrderedVertexes:
+            for v in orderedVertexes:
                 points[0].append(_r(v.X))
                 points[1].append(_r(v.Z))
-            points[0].append(_r(freeCadObj.Shape.OrderedVertexes[0].X))
-            points[1].append(_r(freeCadObj.Shape.OrderedVertexes[0].Z))
+            points[0].append(_r(orderedVertexes[0].X))
+            points[1].append(_r(orderedVertexes[0].Z))
         elif normDir == 'z':
-            for v in freeCadObj.Shape.OrderedVertexes:
+            for v in orderedVertexes:
                 points[0].append(_r(v.X))
                 points[1].append(_r(v.Y))
-            points[0].append(_r(freeCadObj.Shape.OrderedVertexes[0].X))
-            points[1].append(_r(freeCadObj.Shape.OrderedVertexes[0].Y))
+            points[0].append(_r(orderedVertexes[0].X))
+            points[1].append(_r(orderedVertexes[0].Y))
 
         return normDir, elevation, points
 
@@ -220,47 +1022,49 @@ class CommonScriptLinesGenerator:
         elevation = ""
         facesList = []
 
-        bbCoords = freeCadObj.Shape.BoundBox
+        shapeSnapshot = self.getShapeSnapshot(freeCadObj)
+        bbCoords = shapeSnapshot.getBoundBox()
+        facesVertexes = shapeSnapshot.getFacesVertexes()
 
-        if (len(freeCadObj.Shape.Faces) > 0):
+        if (len(facesVertexes) > 0):
 
             if (_r(bbCoords.XMin) == _r(bbCoords.XMax)):
                 normDir = "x"
                 elevation = bbCoords.XMin
 
-                for face in freeCadObj.Shape.Faces:
+                for faceVertexes in facesVertexes:
                     points = [[], []]
-                    for vertex in face.Vertexes:
+                    for vertex in faceVertexes:
                         points[0].append(_r(vertex.Y))
                         points[1].append(_r(vertex.Z))
-                    points[0].append(_r(face.Vertexes[0].Y))
-                    points[1].append(_r(face.Vertexes[0].Z))
+                    points[0].append(_r(faceVertexes[0].Y))
+                    points[1].append(_r(faceVertexes[0].Z))
                     facesList.append(points)
 
             elif (_r(bbCoords.YMin) == _r(bbCoords.YMax)):
                 normDir = "y"
                 elevation = bbCoords.YMin
 
-                for face in freeCadObj.Shape.Faces:
+                for faceVertexes in facesVertexes:
                     points = [[], []]
-                    for vertex in face.Vertexes:
+                    for vertex in faceVertexes:
                         points[0].append(_r(vertex.X))
                         points[1].append(_r(vertex.Z))
-                    points[0].append(_r(face.Vertexes[0].X))
-                    points[1].append(_r(face.Vertexes[0].Z))
+                    points[0].append(_r(faceVertexes[0].X))
+                    points[1].append(_r(faceVertexes[0].Z))
                     facesList.append(points)
 
             elif (_r(bbCoords.ZMin) == _r(bbCoords.ZMax)):
                 normDir = "z"
                 elevation = bbCoords.ZMin
 
-                for face in freeCadObj.Shape.Faces:
+                for faceVertexes in facesVertexes:
                     points = [[], []]
-                    for vertex in face.Vertexes:
+                    for vertex in faceVertexes:
                         points[0].append(_r(vertex.X))
                         points[1].append(_r(vertex.Y))
-                    points[0].append(_r(face.Vertexes[0].X))
-                    points[1].append(_r(face.Vertexes[0].Y))
+                    points[0].append(_r(faceVertexes[0].X))
+                    points[1].append(_r(faceVertexes[0].Y))
                     facesList.append(points)
 
         else:
@@ -0,0 +1,147 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+import io
+import json
+import time
+import struct
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+class GenerationProfiler:
+    """
+    Collects wall time, number of objects and emitted script size of each section of generated simulation script and number of triangles
+    of exported STL files. Report is written as JSON next to generated script.
+
+    If environment variable OPENEMS_GENERATION_PROFILE is set whole generation run is also profiled by cProfile, statistics are
+    written into .prof file next to report and top functions are printed to console.
+
+    Sections can be nested (ie. STL export inside materials), nested section has "parent" in report and its time is subtracted
+    from "selfTime" of parent, summary ranks just top level sections so time is not counted twice.
+    """
+
+    PROFILE_ENV_VARIABLE = "OPENEMS_GENERATION_PROFILE"
+
+    def __init__(self, scriptWriter=None):
+        self.scriptWriter = scriptWriter
+        self.sections = []
+        self.sectionStack = []          # [name, time of nested sections] of currently measured sections
+        self.stlFiles = []
+        self.startTime = time.perf_counter()
+        self.totalTime = None
+
+        self.profile = None
+        if os.environ.get(self.PROFILE_ENV_VARIABLE, "") not in ("", "0"):
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    @contextmanager
+    def section(self, name, items=None):
+        """
+        Measure one script section.
+        :param name: section name used in report
+        :param items: list of [treeItem, settingsItem] as returned by getItemsByClassName(), number of settings items and objects assigned to them is reported
+        """
+        writtenLengthStart = self.scriptWriter.writtenLength if self.scriptWriter is not None else 0
+        parentName = self.sectionStack[-1][0] if len(self.sectionStack) > 0 else None
+        stackEntry = [name, 0.0]
+        self.sectionStack.append(stackEntry)
+        startTime = time.perf_counter()
+        try:
+            yield
+        finally:
+            sectionTime = time.perf_counter() - startTime
+            self.sectionStack.pop()
+            if len(self.sectionStack) > 0:
+                self.sectionStack[-1][1] += sectionTime
+
+            sectionInfo = {
+                "name": name,
+                "time": sectionTime,
+                "selfTime": sectionTime - stackEntry[1],
+                "bytes": (self.scriptWriter.writtenLength - writtenLengthStart) if self.scriptWriter is not None else 0,
+            }
+            if parentName is not None:
+                sectionInfo["parent"] = parentName
+            if items is not None:
+                sectionInfo["items"] = len(items)
+                sectionInfo["objects"] = sum([item.childCount() for item, settingsItem in items])
+            self.sections.append(sectionInfo)
+
+    def addSTLFile(self, fileName, exported):
+        """
+        :param fileName: STL file name
+        :param exported: False if export was skipped as file didn't change
+        """
+        self.stlFiles.append({
+            "file": os.path.basename(fileName),
+            "exported": exported,
+            "triangles": GenerationProfiler.getSTLTrianglesCount(fileName),
+        })
+
+    @staticmethod
+    def getSTLTrianglesCount(fileName):
+        """
+        Returns number of triangles in binary or ASCII STL file, None if file cannot be read.
+        """
+        try:
+            fileSize = os.path.getsize(fileName)
+            with open(fileName, "rb") as f:
+                header = f.read(84)
+                if len(header) == 84:
+                    trianglesCount = struct.unpack("<I", header[80:84])[0]
+                    if 84 + 50 * trianglesCount == fileSize:
+                        return trianglesCount
+                f.seek(0)
+                return sum([line.count(b"facet normal") for line in f])
+        except OSError:
+            return None
+
+    def finish(self, reportFileName):
+        """
+        Stop measurement and write report, returns report dictionary.
+        """
+        self.totalTime = time.perf_counter() - self.startTime
+        self.stopProfile()
+        report = {
+            "totalTime": self.totalTime,
+            "scriptBytes": self.scriptWriter.writtenLength if self.scriptWriter is not None else 0,
+            "sections": self.sections,
+            "stlFiles": self.stlFiles,
+            "stlTriangles": sum([stlFile["triangles"] or 0 for stlFile in self.stlFiles]),
+        }
+
+        if self.profile is not None:
+            profileFileName = os.path.splitext(reportFileName)[0] + ".prof"
+            self.profile.dump_stats(profileFileName)
+            report["profile"] = os.path.basename(profileFileName)
+
+            statsOutput = io.StringIO()
+            pstats.Stats(self.profile, stream=statsOutput).sort_stats("cumulative").print_stats(25)
+            print(statsOutput.getvalue())
+
+        with open(reportFileName, "w", encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"Generation report written to: {reportFileName}")
+
+        return report
+
+    def stopProfile(self):
+        """
+        Disable cProfile, called when report is written or generation failed.
+        """
+        if self.profile is not None:
+            self.profile.disable()
+
+    def getSummary(self, sectionsCount=3):
+        """
+        Returns short text for status bar with total time and slowest top level sections, nested sections are included in their parent.
+        """
+        topLevelSections = [sectionInfo for sectionInfo in self.sections if "parent" not in sectionInfo]
+        slowestSections = sorted(topLevelSections, key=lambda sectionInfo: sectionInfo["time"], reverse=True)[:sectionsCount]
+        summary = f"Generated in {self.totalTime:.2f}s"
+        if len(slowestSections) > 0:
+            summary += " (" + ", ".join([f"{sectionInfo['name']} {sectionInfo['time']:.2f}s" for sectionInfo in slowestSections]) + ")"
+        return summary
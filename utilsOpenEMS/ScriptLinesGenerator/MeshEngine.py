@@ -0,0 +1,390 @@
+#   author: Lubomir Jagos
+#
+#
+import numpy as np
+
+from utilsOpenEMS.GlobalFunctions.GlobalFunctions import _r
+
+class IntervalSet:
+    """
+    Union of closed intervals kept as sorted disjoint intervals, overlapping and touching intervals are merged when added.
+    """
+
+    def __init__(self):
+        self.starts = np.array([], dtype=np.float64)
+        self.stops = np.array([], dtype=np.float64)
+
+    def add(self, start, stop):
+        #
+        #   intervals overlapping or touching <start, stop> are merged with it into one interval
+        #
+        first = int(np.searchsorted(self.stops, start, side="left"))
+        last = int(np.searchsorted(self.starts, stop, side="right"))
+        if first < last:
+            start = min(start, self.starts[first])
+            stop = max(stop, self.stops[last - 1])
+        self.starts = np.concatenate((self.starts[:first], [start], self.starts[last:]))
+        self.stops = np.concatenate((self.stops[:first], [stop], self.stops[last:]))
+
+    def contains(self, values):
+        """
+        :return: boolean numpy array, True for values inside some interval including its boundaries
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(self.starts) == 0:
+            return np.zeros(values.shape, dtype=bool)
+        indexes = np.searchsorted(self.starts, values, side="right") - 1
+        return (indexes >= 0) & (values <= self.stops[np.maximum(indexes, 0)])
+
+class MeshEngine:
+    """
+    Grid lines of simulation resolved in plugin, so final sorted lines for each axis are known at export time and can be written
+    into script directly.
+
+    Grid rules are added in mesh priority order from lowest to highest. Rule with top priority lines removes lines of all lower priority
+    rules inside its span, this is resolved at once per axis: rules are visited from highest priority and union of top priority spans
+    visited so far decides which lines of next rule are kept, so each line is tested once against sorted intervals instead of deleting
+    lines from whole array for each rule.
+
+    All coordinates are in drawing units (simulation unit set in GUI).
+    """
+
+    AXES = ("x", "y", "z")
+
+    #
+    #   ratio of neighbouring cells is reported as exceeded just when it's above limit by more than this relative tolerance,
+    #   shrinking cells to fit interval exactly leaves tiny excess which is not worth a warning
+    #
+    RATIO_WARNING_TOLERANCE = 0.01
+
+    def __init__(self):
+        self.axisRules = {axis: [] for axis in MeshEngine.AXES}
+        self.lines = {}
+        self.rules = []
+
+    @staticmethod
+    def getScriptValue(value):
+        """
+        Value as it's written into generated script, generators round coordinates by _r() and print them by {:g} format.
+        """
+        return float("{0:g}".format(_r(value)))
+
+    @staticmethod
+    def arangeWithEndpoint(start, stop, step):
+        """
+        Same as arangeWithEndpoint() in generated python script, endpoint is included when it's hit exactly by step.
+        """
+        if start == stop:
+            return np.array([start], dtype=np.float64)
+
+        lines = np.arange(start, stop, step, dtype=np.float64)
+        if len(lines) > 0 and lines[-1] + step == stop:
+            lines = np.append(lines, stop)
+        return lines
+
+    @staticmethod
+    def fixedCountLines(start, stop, count):
+        """
+        Lines of Fixed Count grid, just one line is placed in the middle.
+        """
+        if count == 1:
+            return np.array([(start + stop) / 2], dtype=np.float64)
+        return np.linspace(start, stop, int(count))
+
+    @staticmethod
+    def getGradedSteps(res, maxRes, ratio):
+        """
+        Cell sizes growing from res by ratio while they are smaller than maxRes.
+        """
+        if res * ratio >= maxRes:
+            return np.array([], dtype=np.float64)
+        stepsCount = int(np.ceil(np.log(maxRes / res) / np.log(ratio))) - 1
+        steps = res * ratio ** np.arange(1, stepsCount + 1)
+        return steps[steps < maxRes]
+
+    @staticmethod
+    def getMaxStepsRatio(steps, startRes, stopRes):
+        """
+        Biggest ratio of neighbouring cells, including cells of size startRes and stopRes next to steps.
+        """
+        cells = np.concatenate(([startRes], steps, [stopRes]))
+        return float(np.max(np.maximum(cells[1:] / cells[:-1], cells[:-1] / cells[1:])))
+
+    @staticmethod
+    def getSpreadSteps(length, startRes, stopRes, maxRes, maxCount):
+        """
+        Steps filling interval which is too short to grade from startRes to stopRes by required ratio. For each cells count steps
+        are interpolated geometrically between startRes and stopRes and scaled to interval length, so difference between resolutions
+        is spread evenly over all cells, count with the smallest ratio of neighbouring cells is used.
+        :return: steps, their max ratio of neighbouring cells
+        """
+        bestSteps = None
+        bestRatio = np.inf
+        for count in range(1, maxCount + 1):
+            steps = startRes * (stopRes / startRes) ** (np.arange(1, count + 1) / (count + 1))
+            steps = steps * (length / steps.sum())
+            if steps.max() > maxRes * (1 + 1e-9):
+                continue
+            stepsRatio = MeshEngine.getMaxStepsRatio(steps, startRes, stopRes)
+            if stepsRatio < bestRatio:
+                bestSteps = steps
+                bestRatio = stepsRatio
+        return bestSteps, bestRatio
+
+    @staticmethod
+    def isRatioExceeded(stepsRatio, ratio):
+        return stepsRatio > ratio * (1 + MeshEngine.RATIO_WARNING_TOLERANCE)
+
+    @staticmethod
+    def printRatioWarnings(ratioWarnings, ratio):
+        """
+        Print one summary warning for all intervals where ratio of neighbouring cells was exceeded, instead of line for each interval.
+        :param ratioWarnings: list of (start, stop, used ratio) collected by smoothRange()
+        """
+        if len(ratioWarnings) == 0:
+            return
+        start, stop, worstRatio = max(ratioWarnings, key=lambda item: item[2])
+        print(f"Smooth mesh warning: {len(ratioWarnings)} interval(s) too short to grade cells by ratio {ratio:g}, "
+              f"worst used ratio {worstRatio:.3g} in interval <{start:g}, {stop:g}>.")
+
+    @staticmethod
+    def smoothRange(start, stop, startRes, stopRes, maxRes, ratio, ratioWarnings=None):
+        """
+        Lines filling interval <start, stop>, cells grow from startRes and stopRes by at most ratio up to maxRes.
+
+        If interval is too short to grade from startRes to stopRes by ratio (ie. big cell on one side and small one on the other),
+        both limits cannot be met, then ratio is exceeded but spread evenly over all cells of interval, cells are still not bigger
+        than maxRes and warning is reported.
+        :param ratioWarnings: list where (start, stop, used ratio) is appended when ratio is exceeded, if None warning is printed
+        :return: lines including start and stop
+        """
+        length = stop - start
+        leftSteps = MeshEngine.getGradedSteps(startRes, maxRes, ratio)
+        rightSteps = MeshEngine.getGradedSteps(stopRes, maxRes, ratio)
+
+        if leftSteps.sum() + rightSteps.sum() <= length:
+            #
+            #   both gradings fit into interval, middle is filled by cells of max resolution
+            #
+            middleCount = int(np.ceil((length - leftSteps.sum() - rightSteps.sum()) / maxRes))
+            steps = np.concatenate((leftSteps, np.full(middleCount, maxRes), rightSteps[::-1]))
+        else:
+            #
+            #   gradings overlap, smaller steps from both sides are taken first until they cover interval
+            #
+            allSteps = np.concatenate((leftSteps, rightSteps))
+            sides = np.concatenate((np.zeros(len(leftSteps), dtype=int), np.ones(len(rightSteps), dtype=int)))
+            order = np.argsort(allSteps, kind="stable")
+            stepsCount = max(int(np.searchsorted(np.cumsum(allSteps[order]), length)) + 1, 2)
+            chosen = order[:stepsCount]
+            steps = np.concatenate((np.sort(allSteps[chosen[sides[chosen] == 0]]), np.sort(allSteps[chosen[sides[chosen] == 1]])[::-1]))
+
+        #
+        #   cells are shrunk uniformly to fit interval exactly, ratio of neighbouring cells doesn't change
+        #
+        steps = steps * (length / steps.sum())
+
+        #
+        #   shrinking cells can break ratio to cells outside interval, then shortfall is spread over all cells instead
+        #
+        stepsRatio = MeshEngine.getMaxStepsRatio(steps, startRes, stopRes)
+        if stepsRatio > ratio * (1 + 1e-9):
+            maxCount = len(steps) + int(np.ceil(abs(np.log(startRes / stopRes)) / np.log(ratio))) + 2
+            spreadSteps, spreadRatio = MeshEngine.getSpreadSteps(length, startRes, stopRes, maxRes, maxCount)
+            if spreadRatio < stepsRatio:
+                steps = spreadSteps
+                stepsRatio = spreadRatio
+            if MeshEngine.isRatioExceeded(stepsRatio, ratio):
+                if ratioWarnings is None:
+                    print(f"Smooth mesh warning: interval <{start:g}, {stop:g}> is too short to grade cells from {startRes:g} to {stopRes:g} by ratio {ratio:g}, used ratio {stepsRatio:.3g}.")
+                else:
+                    ratioWarnings.append((start, stop, stepsRatio))
+
+        return np.concatenate(([start], start + np.cumsum(steps[:-1]), [stop]))
+
+    @staticmethod
+    def smoothMeshLines(lines, maxRes, ratio=1.5):
+        """
+        Native implementation of smooth mesh, same purpose as CSXCAD SmoothMeshLines. Given lines are kept, intervals longer than maxRes
+        are filled by lines so no cell is bigger than maxRes and cells next to fixed lines grow from neighbouring cell size by at most ratio.
+        :param lines: fixed lines which smooth mesh must contain
+        :param maxRes: maximal distance between lines
+        :param ratio: maximal ratio of neighbouring cells sizes
+        :return: smoothed lines as sorted numpy array
+        """
+        lines = np.unique(np.asarray(lines, dtype=np.float64))
+        if len(lines) < 2 or maxRes <= 0:
+            return lines
+
+        gaps = np.diff(lines)
+        oversized = np.flatnonzero(gaps > maxRes)
+        if len(oversized) == 0:
+            return lines
+
+        #
+        #   resolution at both ends of interval is given by neighbouring cell, outside of lines and next to other oversized interval
+        #   it's maxRes as that interval is filled by cells of max resolution
+        #
+        neighbourRes = np.minimum(gaps, maxRes)
+        startRes = np.concatenate(([maxRes], neighbourRes[:-1]))[oversized]
+        stopRes = np.concatenate((neighbourRes[1:], [maxRes]))[oversized]
+        uniform = (startRes * ratio >= maxRes) & (stopRes * ratio >= maxRes)
+
+        newLines = [lines]
+
+        #
+        #   intervals without grading are split into equal cells all at once
+        #
+        uniformIndexes = oversized[uniform]
+        if len(uniformIndexes) > 0:
+            counts = np.ceil(gaps[uniformIndexes] / maxRes).astype(int)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            newLines.append(np.repeat(lines[uniformIndexes], counts) + offsets * np.repeat(gaps[uniformIndexes] / counts, counts))
+
+        ratioWarnings = []
+        for k, res1, res2 in zip(oversized[~uniform], startRes[~uniform], stopRes[~uniform]):
+            newLines.append(MeshEngine.smoothRange(lines[k], lines[k + 1], res1, res2, maxRes, ratio, ratioWarnings))
+        MeshEngine.printRatioWarnings(ratioWarnings, ratio)
+
+        return np.unique(np.concatenate(newLines))
+
+    @staticmethod
+    def gradeLines(lines, ratio=1.5, maxIterations=10):
+        """
+        Intervals which are more than ratio times bigger than neighbouring cell are filled by lines growing from smaller neighbour,
+        smoothMeshLines() does this just for intervals bigger than maxRes.
+        :return: sorted numpy array of lines, given lines are kept
+        """
+        lines = np.unique(np.asarray(lines, dtype=np.float64))
+        for k in range(maxIterations):
+            if len(lines) < 3:
+                return lines
+            violating, stepsRatios = MeshEngine.getRatioViolations(lines, ratio, 1e-9)
+            if len(violating) == 0:
+                return lines
+
+            #
+            #   intervals are refined again in next iteration, so just ratio of final lines is reported
+            #
+            newLines = [lines]
+            gaps = np.diff(lines)
+            for n in violating:
+                res1 = min(gaps[n - 1] if n > 0 else np.inf, gaps[n])
+                res2 = min(gaps[n + 1] if n + 1 < len(gaps) else np.inf, gaps[n])
+                newLines.append(MeshEngine.smoothRange(lines[n], lines[n + 1], res1, res2, gaps[n], ratio, []))
+            lines = np.unique(np.concatenate(newLines))
+
+        violating, stepsRatios = MeshEngine.getRatioViolations(lines, ratio, MeshEngine.RATIO_WARNING_TOLERANCE)
+        MeshEngine.printRatioWarnings([(lines[n], lines[n + 1], stepsRatio) for n, stepsRatio in zip(violating, stepsRatios)], ratio)
+        return lines
+
+    @staticmethod
+    def getRatioViolations(lines, ratio, tolerance):
+        """
+        Cells which are more than ratio times bigger than some neighbouring cell.
+        :return: indexes of cells, their ratio to smaller neighbour
+        """
+        if len(lines) < 3:
+            return np.array([], dtype=int), np.array([], dtype=np.float64)
+        gaps = np.diff(lines)
+        neighbourRes = np.minimum(np.concatenate(([np.inf], gaps[:-1])), np.concatenate((gaps[1:], [np.inf])))
+        violating = np.flatnonzero(gaps > ratio * neighbourRes * (1 + tolerance))
+        return violating, gaps[violating] / neighbourRes[violating]
+
+    @staticmethod
+    def getEdgeLines(minValue, maxValue, edgeRes, isMetal):
+        """
+        Fixed lines for object edges in one axis. Metal edges follow 1/3-2/3 rule, line is placed 1/3 of edge resolution inside metal
+        and 2/3 outside, so field singularity at edge is sampled correctly. Metal thinner than edge resolution gets one line in its middle.
+        Dielectric edges get line exactly on boundary.
+        :return: numpy array of lines
+        """
+        if not isMetal:
+            return np.array([minValue, maxValue], dtype=np.float64)
+        if maxValue - minValue < edgeRes:
+            return np.array([(minValue + maxValue) / 2], dtype=np.float64)
+        return np.array([
+            minValue - 2.0 * edgeRes / 3.0, minValue + edgeRes / 3.0,
+            maxValue - edgeRes / 3.0, maxValue + 2.0 * edgeRes / 3.0
+        ], dtype=np.float64)
+
+    @staticmethod
+    def mergeCloseLines(lines, minDistance):
+        """
+        Lines closer than minDistance are replaced by their mean, chains of close lines are merged into one line.
+        :return: sorted numpy array of lines
+        """
+        lines = np.unique(np.asarray(lines, dtype=np.float64))
+        if len(lines) < 2 or minDistance <= 0:
+            return lines
+        groups = np.concatenate(([0], np.cumsum(np.diff(lines) >= minDistance)))
+        return np.bincount(groups, weights=lines) / np.bincount(groups)
+
+    @staticmethod
+    def removeCloseLines(lines, minSpacing):
+        """
+        Same as removeCloseLines() in generated script for minimal gridline spacing, in each run of lines closer than minSpacing
+        every second line is removed, this repeats until no lines are too close.
+        :return: sorted numpy array of lines
+        """
+        lines = np.unique(np.asarray(lines, dtype=np.float64))
+        close = np.diff(lines) <= minSpacing
+        while close.any():
+            k = np.arange(len(close))
+            runStart = np.maximum.accumulate(np.where(close & ~np.concatenate(([False], close[:-1])), k, 0))
+            lines = lines[~np.concatenate(([False], close & ((k - runStart) % 2 == 0)))]
+            close = np.diff(lines) <= minSpacing
+        return lines
+
+    @staticmethod
+    def decimateLines(lines, maxCount):
+        """
+        Level of detail for drawing, when there are more lines than maxCount (ie. pixels of view) just first line in each of maxCount
+        equal bins is kept, so dense parts of grid stay dense in preview. First and last line are always kept.
+        :return: sorted numpy array of lines
+        """
+        lines = np.unique(np.asarray(lines, dtype=np.float64))
+        if len(lines) <= maxCount or maxCount < 2:
+            return lines
+        span = lines[-1] - lines[0]
+        bins = np.minimum(np.floor((lines - lines[0]) / span * (maxCount - 1)), maxCount - 2)
+        binsFirstIndexes = np.unique(bins, return_index=True)[1]
+        return np.unique(np.concatenate((lines[binsFirstIndexes], [lines[-1]])))
+
+    def addRule(self, description):
+        """
+        Description of applied grid rule, written as comment into generated script.
+        """
+        self.rules.append(description)
+
+    def addLines(self, axis, lines, topPrioritySpan=None):
+        """
+        Add lines of grid rule, rules must be added from lowest to highest priority.
+        :param lines: grid lines
+        :param topPrioritySpan: (min, max) if rule removes lower priority lines in this range, None otherwise
+        """
+        self.axisRules[axis].append((np.asarray(lines, dtype=np.float64), topPrioritySpan))
+        self.lines.pop(axis, None)
+
+    def resolveLines(self, axis):
+        """
+        Resolve priorities of rules added for axis, line of rule is kept if it's not inside span of some higher priority top priority rule.
+        """
+        higherPrioritySpans = IntervalSet()
+        keptLines = []
+        for lines, topPrioritySpan in reversed(self.axisRules[axis]):
+            keptLines.append(lines[~higherPrioritySpans.contains(lines)])
+            if topPrioritySpan is not None:
+                higherPrioritySpans.add(min(topPrioritySpan), max(topPrioritySpan))
+        return np.unique(np.concatenate(keptLines)) if len(keptLines) > 0 else np.array([], dtype=np.float64)
+
+    def getLines(self, axis):
+        """
+        :return: final grid lines for axis sorted and without duplicates, as openEMS uses them
+        """
+        if not (axis in self.lines):
+            self.lines[axis] = self.resolveLines(axis)
+        return self.lines[axis]
+
+    def getLinesCount(self):
+        return {axis: len(self.getLines(axis)) for axis in MeshEngine.AXES}
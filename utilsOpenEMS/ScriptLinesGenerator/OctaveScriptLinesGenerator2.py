@@ -13,6 +13,9 @@ from utilsOpenEMS.GuiHelpers.GuiHelpers import GuiHelpers
 from utilsOpenEMS.GuiHelpers.FactoryCadInterface import FactoryCadInterface
 
 from utilsOpenEMS.ScriptLinesGenerator.CommonScriptLinesGenerator import CommonScriptLinesGenerator
+from utilsOpenEMS.ScriptLinesGenerator.ScriptWriter import ScriptWriter
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine
+from utilsOpenEMS.ScriptLinesGenerator.SimulationIR import IRPrimitive
 
 class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
@@ -22,6 +25,61 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
     def __init__(self, form, statusBar = None):
         super(OctaveScriptLinesGenerator2, self).__init__(form, statusBar)
 
+    def getPointsScriptLines(self, points, sidecarName, outputDir=None):
+        """
+        Returns script lines which set variable points to given point list. Points are written as one matrix literal, if there is more of them
+        than pointsSidecarThreshold they are saved into binary file of little endian doubles (column after column) which is read by generated script.
+        :param points: list of coordinates lists [[x...], [y...]] or [[x...], [y...], [z...]]
+        :param sidecarName: base name of sidecar file, suffix _points.bin is added
+        :param outputDir: directory where simulation script is generated
+        :return: script lines
+        """
+        if self.isPointsSidecarNeeded(points):
+            sidecarFileName = sidecarName + "_points.bin"
+            np.array(points, dtype='<f8').T.tofile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+            self.registerSectionOutputFile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+            genScript = f"fid = fopen([currDir '/{sidecarFileName}'], 'r');\n"
+            genScript += f"points = fread(fid, [{len(points)}, Inf], 'double', 0, 'ieee-le');\n"
+            genScript += "fclose(fid);\n"
+            return genScript
+
+        genScript = "points = [\n"
+        for coords in points:
+            genScript += "    " + " ".join([str(c) for c in coords]) + ";\n"
+        genScript += "];\n"
+        return genScript
+
+    def getResolvedMeshLinesScriptLines(self, meshEngine, outputDir=None):
+        """
+        Returns script lines which set final grid lines resolved by MeshEngine. Axis with more lines than pointsSidecarThreshold is saved
+        into binary file of little endian doubles which is read by generated script.
+        :param meshEngine: MeshEngine with resolved grid lines
+        :param outputDir: directory where simulation script is generated
+        :return: script lines
+        """
+        genScript = ""
+        for rule in meshEngine.rules:
+            genScript += "%% GRID - " + rule + "\n"
+
+        linesCount = meshEngine.getLinesCount()
+        genScript += f"% grid lines resolved by plugin mesh engine, lines count x: {linesCount['x']}, y: {linesCount['y']}, z: {linesCount['z']}\n"
+
+        for axis in MeshEngine.AXES:
+            lines = meshEngine.getLines(axis)
+            if self.isPointsSidecarNeeded([lines]):
+                sidecarFileName = f"mesh_{axis}_lines.bin"
+                lines.astype('<f8').tofile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+                self.registerSectionOutputFile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+                genScript += f"fid = fopen([currDir '/{sidecarFileName}'], 'r');\n"
+                genScript += f"mesh.{axis} = fread(fid, [1, Inf], 'double', 0, 'ieee-le');\n"
+                genScript += "fclose(fid);\n"
+            else:
+                genScript += f"mesh.{axis} = [" + " ".join([str(c) for c in lines]) + "];\n"
+        genScript += "CSX = DefineRectGrid(CSX, unit, mesh);\n"
+        genScript += "\n"
+
+        return genScript
+
     def getOctaveExecCommand(self, mFileName, options=""):
         cmd = self.form.octaveExecCommandList.currentText()
         cmd = cmd.format(opt=options, filename=mFileName)
@@ -72,8 +130,13 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         return genScript
 
-    def getMaterialDefinitionsScriptLines(self, items, outputDir=None, generateObjects=True):
-        genScript = ""
+    def getMaterialDefinitionsScriptLines(self, items, outputDir=None, generateObjects=True, scriptWriter=None):
+        """
+        Generates materials and geometry script lines, this is biggest section as it contains all polygon and curve points.
+        :param scriptWriter: if set, lines are written directly into it and empty string is returned
+        :return: script lines as string
+        """
+        genScript = ScriptWriter() if scriptWriter is None else scriptWriter
 
         genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
         genScript += "% MATERIALS AND GEOMETRY\n"
@@ -86,7 +149,9 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "\n"
 
         if not items:
-            return genScript
+            return genScript.getvalue() if scriptWriter is None else ""
+
+        stlExportJobs = []      #list of (partToExport, exportFileName), STL files are exported after all material lines are generated
 
         for [item, currSetting] in items:
 
@@ -118,17 +183,14 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
             # now export material children, if it's object export as STL, if it's curve export as curve
             if (generateObjects):
-                for k in range(item.childCount()):
-                    childName = item.child(k).text(0)
+                for primitive in self.getSimulationIR().getPrimitives("Material", item.text(0)):
+                    childName = primitive.label
 
                     #
-                    #	getting item priority
+                    #	item priority and reference to FreeCAD object are resolved in simulation model
                     #
-                    objModelPriorityItemName = item.parent().text(0) + ", " + item.text(0) + ", " + childName
-                    objModelPriority = self.getItemPriority(objModelPriorityItemName)
-
-                    # getting reference to FreeCAD object
-                    freeCadObj = [i for i in self.cadHelpers.getObjects() if (i.Label) == childName][0]
+                    objModelPriority = primitive.priority
+                    freeCadObj = primitive.obj
 
                     #
                     #   HERE IS OBJECT GENERATOR THERE ARE FEW SPECIAL CASES WHICH ARE HANDLED FIRST AND IF OBJECT IS NORMAL STRUCTURE AT THE END IS GENERATED AS .stl FILR:
@@ -143,7 +205,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                         #
                         genScript += "%conducting sheet object\n"
                         genScript += f"%object Label: {freeCadObj.Label}\n"
-                        bbCoords = freeCadObj.Shape.BoundBox
+                        bbCoords = primitive.getBoundBox()
 
                         if (freeCadObj.Name.find("Sketch") > -1):
                             #
@@ -152,13 +214,11 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
                             normDir, elevation, points = self.getSketchPointsForConductingSheet(freeCadObj)
                             if not normDir.startswith("ERROR"):
-                                genScript += "points = [];\n"
                                 if len(points[0])  == 0:
+                                    genScript += "points = [];\n"
                                     genScript += "%% ERROR, no points for polygon for conducting sheet nothing generated"
                                 else:
-                                    for k in range(len(points[0])):
-                                        genScript += f"points(1,{k+1}) = {points[0][k]};\n"
-                                        genScript += f"points(2,{k+1}) = {points[1][k]};\n"
+                                    genScript += self.getPointsScriptLines(points, childName, outputDir)
                                 genScript += "\n"
 
                                 genScript += f"CSX = AddPolygon(CSX, '{currSetting.getName()}', {str(objModelPriority)}, '{normDir}', {elevation}, points);\n"
@@ -176,12 +236,8 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
                             normDir, elevation, facesList = self.getFacePointsForConductingSheet(freeCadObj)
                             if normDir != "":
-                                for face in facesList:
-                                    genScript += "points = [];\n"
-                                    for pointIndex in range(len(face[0])):
-                                        genScript += f"points(1,{pointIndex+1}) = {face[0][pointIndex]};"
-                                        genScript += f"points(2,{pointIndex+1}) = {face[1][pointIndex]};"
-                                        genScript += "\n"
+                                for faceIndex, face in enumerate(facesList):
+                                    genScript += self.getPointsScriptLines(face, f"{childName}_face{faceIndex}", outputDir)
                                     genScript += f"CSX = AddPolygon(CSX, '{currSetting.getName()}', {str(objModelPriority)}, '{normDir}', {_r(elevation)}, points);\n"
                             else:
                                 genScript += f"%\tObject has no faces, conducting sheet is generated based on object bounding box since it's planar.\n"
@@ -200,24 +256,19 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                             genScript += f"CSX = AddBox(CSX,'{currSetting.getName()}',{str(objModelPriority)},[{_r(bbCoords.XMin)} {_r(bbCoords.YMax)} {_r(bbCoords.ZMin)}],[{_r(bbCoords.XMax)} {_r(bbCoords.YMax)} {_r(bbCoords.ZMax)}]);\n"
                             genScript += f"CSX = AddBox(CSX,'{currSetting.getName()}',{str(objModelPriority)},[{_r(bbCoords.XMax)} {_r(bbCoords.YMin)} {_r(bbCoords.ZMin)}],[{_r(bbCoords.XMax)} {_r(bbCoords.YMax)} {_r(bbCoords.ZMax)}]);\n"
 
-                    elif (freeCadObj.Name.find("Discretized_Edge") > -1):
+                    elif (primitive.kind == IRPrimitive.KIND_CURVE):
                         #
                         #	Adding discretized curve
                         #
 
-                        curvePoints = freeCadObj.Points
-                        genScript += "points = [];\n"
-                        for k in range(0, len(curvePoints)):
-                            genScript += "points(1," + str(k + 1) + ") = " + str(curvePoints[k].x) + ";"
-                            genScript += "points(2," + str(k + 1) + ") = " + str(curvePoints[k].y) + ";"
-                            genScript += "points(3," + str(k + 1) + ") = " + str(curvePoints[k].z) + ";"
-                            genScript += "\n"
+                        points = primitive.getCurvePoints()
+                        genScript += self.getPointsScriptLines(points, childName, outputDir)
 
                         genScript += "CSX = AddCurve(CSX,'" + currSetting.getName() + "'," + str(
                             objModelPriority) + ", points);\n"
                         print("Curve added to generated script using its points.")
 
-                    elif (freeCadObj.Name.find("Sketch") > -1):
+                    elif (primitive.kind == IRPrimitive.KIND_SKETCH):
                         #
                         #	Adding JUST LINE SEGMENTS FROM SKETCH, THIS NEED TO BE IMPROVED TO PROPERLY GENERATE CURVE FROM SKETCH,
                         #	there can be circle, circle arc and maybe something else in sketch geometry
@@ -239,27 +290,11 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                                 genScript += "CSX = AddCurve(CSX,'" + currSetting.getName() + "'," + str(objModelPriority) + ", points);\n"
                         """
 
-                        genScript += "points = [];\n"
-                        for v in freeCadObj.Shape.OrderedVertexes:
-                            genScript += f"points(1,2) = {_r(v.X)};"
-                            genScript += f"points(2,2) = {_r(v.Y)};"
-                            genScript += f"points(3,2) = {_r(v.Z)};"
-                            genScript += "CSX = AddCurve(CSX,'" + currSetting.getName() + "'," + str(objModelPriority) + ", points);\n"
-                            genScript += "\n"
-
-                        #   HERE IS MADE ASSUMPTION THAT:
-                        #       We suppose in sketch there are no mulitple closed sketches
-                        #
-                        #   Add first vertex into list
-                        #
-                        genScript += "points = [];\n"
-                        v = freeCadObj.Shape.OrderedVertexes[0]
-                        if len(freeCadObj.OpenVertices) == 0:
-                            genScript += f"points(1,2) = {_r(v.X)};"
-                            genScript += f"points(2,2) = {_r(v.Y)};"
-                            genScript += f"points(3,2) = {_r(v.Z)};"
-                            genScript += f"CSX = AddCurve(CSX,'{currSetting.getName()}',{objModelPriority}, points);\n"
-                            genScript += "\n"
+                        #   outline points, closed sketch has first vertex repeated at the end
+                        points = primitive.getSketchPoints()
+                        genScript += self.getPointsScriptLines(points, childName, outputDir)
+                        genScript += f"CSX = AddCurve(CSX,'{currSetting.getName()}',{objModelPriority}, points);\n"
+                        genScript += "\n"
 
                         print("Line segments from sketch added.")
 
@@ -269,7 +304,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                         #
 
                         currDir, baseName = self.getCurrDir()
-                        stlModelFileName = childName + "_gen_model.stl"
+                        stlModelFileName = primitive.stlFileName
 
                         genScript += "CSX = ImportSTL(CSX, '" + currSetting.getName() + "', " + str(
                             objModelPriority) + ", [currDir '/" + stlModelFileName + "'], 'Transform', {'Scale', fc_unit/unit});\n"
@@ -286,7 +321,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                         # going through each concrete material items and generate their .stl files
 
                         currDir = os.path.dirname(self.cadHelpers.getCurrDocumentFileName())
-                        partToExport = [i for i in self.cadHelpers.getObjects() if (i.Label) == childName]
+                        partToExport = primitive.objects
 
                         #output directory path construction, if there is no parameter for output dir then output is in current freecad file dir
                         if (not outputDir is None):
@@ -294,12 +329,13 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                         else:
                             exportFileName = f"{currDir}/{stlModelFileName}"
 
-                        self.cadHelpers.exportSTL(partToExport, exportFileName)
-                        print("Material object exported as STL into: " + exportFileName)
+                        stlExportJobs.append((partToExport, exportFileName))
 
             genScript += "\n"
 
-        return genScript
+        self.exportSTLFiles(stlExportJobs)
+
+        return genScript.getvalue() if scriptWriter is None else ""
 
     def getCartesianOrCylindricalScriptLinesFromStartStop(self, bbCoords, startPointName=None, stopPointName=None):
         genScript = "";
@@ -406,19 +442,18 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
             print(f"#PORT - {currSetting.getName()} - {currSetting.getType()}")
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
                 genScript += "%% PORT - " + currSetting.getName() + " - " + childName + "\n"
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 # print(freecadObjects)
                 for obj in freecadObjects:
                     print(f"\t{obj.Label}")
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
                     print(f'\t\t{bbCoords}')
 
                     #
@@ -797,17 +832,16 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
             print(f"#PROBE - {currSetting.getName()} - {currSetting.getType()}")
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
                 genScript += "%% PROBE - " + currSetting.getName() + " - " + childName + "\n"
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 for obj in freecadObjects:
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
 
                     #
                     # PROBE openEMS GENERATION INTO VARIABLE
@@ -950,17 +984,16 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += "% LUMPED PARTS " + currentSetting.getName() + "\n"
 
             # traverse through all children item for this particular lumped part settings
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
                 print(f"#LUMPED PART {currentSetting.getType()} - {currentSetting.getName()}")
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
                 for obj in freecadObjects:
                     # obj = FreeCAD Object class
 
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
 
                     genScript += self.getCartesianOrCylindricalScriptLinesFromStartStop(bbCoords, "lumpedPartStart", "lumpedPartStop")
 
@@ -1021,16 +1054,15 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         for [item, currSetting] in items:
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 # print(freecadObjects)
                 for obj in freecadObjects:
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
 
                     #THIS HERE MUST BE !!!EXACTLY SAME!!! AS GRIDLINES IN PROBES, otherwise near field is not captured
                     if (currSetting.getType() == 'nf2ff box'):
@@ -1061,7 +1093,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         return genScript
 
-    def getOrderedGridDefinitionsScriptLines(self, items):
+    def getOrderedGridDefinitionsScriptLines(self, items, outputDir=None):
         genScript = ""
         meshPrioritiesCount = self.form.meshPriorityTreeView.topLevelItemCount()
 
@@ -1077,12 +1109,19 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
         genScript += "\n"
 
+        #
+        #   grid lines resolved in plugin are written as final arrays, otherwise script resolves them when it runs
+        #
+        meshEngine = self.resolveMeshLines(items) if self.meshEngineEnabled else None
+        if meshEngine is not None:
+            genScript += self.getResolvedMeshLinesScriptLines(meshEngine, outputDir)
+            return genScript
+
         # Create lists and dict to be able to resolve ordered list of (grid settings instance <-> FreeCAD object) associations.
         # In its current form, this implies user-defined grid lines have to be associated with the simulation volume.
         _assoc = lambda idx: list(map(str.strip, self.form.meshPriorityTreeView.topLevelItem(idx).text(0).split(',')))
         orderedAssociations = [_assoc(k) for k in reversed(range(meshPrioritiesCount))]
         gridSettingsNodeNames = [gridSettingsNode.text(0) for [gridSettingsNode, gridSettingsInst] in items]
-        fcObjects = {obj.Label: obj for obj in self.cadHelpers.getObjects()}
 
         for gridSettingsNodeName in gridSettingsNodeNames:
             print("Grid type : " + gridSettingsNodeName)
@@ -1102,11 +1141,30 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
             #Grid category object from GUI
             gridCategoryObj = items[itemListIdx][0]
 
+            #
+            #   Auto Mesh lines are computed in plugin from material objects edges, they are written into script as they are
+            #
+            if (gridSettingsInst.getType() == "Auto Mesh"):
+                genScript += "%% GRID - " + gridSettingsInst.getName() + " - AUTO MESH GROUP (" + gridSettingsInst.getType() + ")\n"
+                autoMeshLines = self.getAutoMeshLines(gridCategoryObj, gridSettingsInst)
+                if autoMeshLines is None:
+                    genScript += "% WARNING auto mesh max resolution is taken from excitation which doesn't define it, no lines generated\n"
+                    print(f"Auto Mesh - max resolution for {gridName} is not known, no lines generated.")
+                else:
+                    for axis, (fixedLines, lines) in autoMeshLines.items():
+                        if gridSettingsInst.topPriorityLines:
+                            genScript += "mesh.{0}(mesh.{0} >= {1:g} & mesh.{0} <= {2:g}) = [];\n".format(axis, _r(fixedLines[0]), _r(fixedLines[-1]))
+                        genScript += "mesh.{0} = [mesh.{0} {1}];\n".format(axis, " ".join(["{0:g}".format(_r(line)) for line in lines]))
+                    genScript += "CSX = DefineRectGrid(CSX, unit, mesh);\n"
+                genScript += "\n"
+                continue
+
             #
             #   Fixed Distance, Fixed Count mesh boundaries coords obtain
             #
             if (gridSettingsInst.getType() in ['Fixed Distance', 'Fixed Count', 'User Defined']):
-                fcObject = fcObjects.get(FreeCADObjectName, None)
+                fcObjectsWithLabel = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+                fcObject = fcObjectsWithLabel[-1] if len(fcObjectsWithLabel) > 0 else None
                 if (not fcObject):
                     print("Failed to resolve '{}'.".format(FreeCADObjectName))
                     continue
@@ -1116,7 +1174,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                 if (not "Shape" in dir(fcObject)):
                     continue
 
-                bbCoords = fcObject.Shape.BoundBox
+                bbCoords = self.getShapeSnapshot(fcObject).getBoundBox()
 
                 deltaX = 0
                 deltaY = 0
@@ -1157,7 +1215,8 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                 for k in range(gridCategoryObj.childCount()):
                     FreeCADObjectName = gridCategoryObj.child(k).text(0)
 
-                    fcObject = fcObjects.get(FreeCADObjectName, None)
+                    fcObjectsWithLabel = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+                    fcObject = fcObjectsWithLabel[-1] if len(fcObjectsWithLabel) > 0 else None
                     if (not fcObject):
                         print("Smooth Mesh - Failed to resolve '{}'.".format(FreeCADObjectName))
                         continue
@@ -1167,7 +1226,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                     if (not "Shape" in dir(fcObject)):
                         continue
 
-                    bbCoords = fcObject.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(fcObject).getBoundBox()
 
                     deltaX = 0
                     deltaY = 0
@@ -1351,35 +1410,28 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
             genScript += "% MINIMAL GRIDLINES SPACING, removing gridlines which are closer as defined in GUI\n"
             genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
-            genScript += 'mesh.x = sort(mesh.x);\n'
-            genScript += 'mesh.y = sort(mesh.y);\n'
-            genScript += 'mesh.z = sort(mesh.z);\n'
-            genScript += '\n'
-            genScript += 'for k = 1:length(mesh.x)-1\n'
-            genScript += '  if (mesh.x(k) ~= inf && abs(mesh.x(k+1)-mesh.x(k)) <= ' + str(minSpacingX) + ')\n'
-            genScript += '    display(["Removnig line at x: " num2str(mesh.x(k+1))]);\n'
-            genScript += '    mesh.x(k+1) = inf;\n'
-            genScript += '   end\n'
-            genScript += 'end\n'
-            genScript += '\n'
-            genScript += 'for k = 1:length(mesh.y)-1\n'
-            genScript += '  if (mesh.y(k) ~= inf && abs(mesh.y(k+1)-mesh.y(k)) <= ' + str(minSpacingY) + ')\n'
-            genScript += '    display(["Removnig line at y: " num2str(mesh.y(k+1))]);\n'
-            genScript += '    mesh.y(k+1) = inf;\n'
-            genScript += '   end\n'
+            genScript += '%\n'
+            genScript += '% Lines closer than minSpacing are removed at once, in each run of close lines every second one is removed (as previous line\n'
+            genScript += '% is kept), this repeats until no lines are too close.\n'
+            genScript += '%\n'
+            genScript += f'minSpacing.x = {minSpacingX};\n'
+            genScript += f'minSpacing.y = {minSpacingY};\n'
+            genScript += f'minSpacing.z = {minSpacingZ};\n'
+            genScript += "for axisName = {'x', 'y', 'z'}\n"
+            genScript += '  linesCount = length(mesh.(axisName{1}));\n'
+            genScript += '  lines = unique(mesh.(axisName{1}));\n'
+            genScript += '  lines = lines(:).\';\n'
+            genScript += '  close = diff(lines) <= minSpacing.(axisName{1});\n'
+            genScript += '  while any(close)\n'
+            genScript += '    k = 1:length(close);\n'
+            genScript += '    runStart = cummax((close & ~[false close(1:end-1)]) .* k);\n'
+            genScript += '    lines([false (close & mod(k - runStart, 2) == 0)]) = [];\n'
+            genScript += '    close = diff(lines) <= minSpacing.(axisName{1});\n'
+            genScript += '  end\n'
+            genScript += '  mesh.(axisName{1}) = lines;\n'
+            genScript += '  display(["Minimal gridline spacing: removed " num2str(linesCount - length(lines)) " lines in " axisName{1}]);\n'
             genScript += 'end\n'
             genScript += '\n'
-            genScript += 'for k = 1:length(mesh.z)-1\n'
-            genScript += '  if (mesh.z(k) ~= inf && abs(mesh.z(k+1)-mesh.z(k)) <= ' + str(minSpacingZ) + ')\n'
-            genScript += '    display(["Removnig line at z: " num2str(mesh.z(k+1))]);\n'
-            genScript += '    mesh.z(k+1) = inf;\n'
-            genScript += '   end\n'
-            genScript += 'end\n'
-            genScript += '\n'
-            genScript += 'mesh.x(isinf(mesh.x)) = [];\n'
-            genScript += 'mesh.y(isinf(mesh.y)) = [];\n'
-            genScript += 'mesh.z(isinf(mesh.z)) = [];\n'
-            genScript += '\n'
             genScript += 'CSX = DefineRectGrid(CSX, unit, mesh);\n'
             genScript += '\n'
 
@@ -1444,7 +1496,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                     if not definitionsOnly:
                         genScript += "FDTD = SetSinusExcite( FDTD, f0 );\n"
                     genScript += "max_res = c0 / f0 / 20;\n"
-                    self.maxGridResolution_m = 3e8 / (currSetting.sinusodial['f0'] * currSetting.getUnitsAsNumber(currSetting.units) * 20)
+                    self.maxGridResolution_m = self.getExcitationMaxGridResolution_m(currSetting)
                     pass
                 elif (currSetting.getType() == 'gaussian'):
                     genScript += "f0 = " + str(currSetting.gaussian['f0']) + "*" + str(
@@ -1454,8 +1506,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                     if not definitionsOnly:
                         genScript += "FDTD = SetGaussExcite( FDTD, f0, fc );\n"
                     genScript += "max_res = c0 / (f0 + fc) / 20;\n"
-                    self.maxGridResolution_m = 3e8 / ((currSetting.gaussian['f0'] + currSetting.gaussian[
-                        'fc']) * currSetting.getUnitsAsNumber(currSetting.units) * 20)
+                    self.maxGridResolution_m = self.getExcitationMaxGridResolution_m(currSetting)
                     pass
                 elif (currSetting.getType() == 'custom'):
                     f0 = currSetting.custom['f0'] * currSetting.getUnitsAsNumber(currSetting.units)
@@ -1466,7 +1517,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
                         genScript += "FDTD = SetCustomExcite( FDTD, f0, '" + currSetting.custom['functionStr'].replace(
                             'f0', str(f0)) + "' );\n"
                     genScript += "max_res = 0;\n"
-                    self.maxGridResolution_m = 0
+                    self.maxGridResolution_m = self.getExcitationMaxGridResolution_m(currSetting)
                     pass
                 elif (currSetting.getType() == 'dirac'):
                     if not definitionsOnly:
@@ -1525,115 +1576,142 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         # List categories and items.
 
-        itemsByClassName = self.getItemsByClassName()
+        profiler = self.startGenerationProfiler()
 
-        # Write script header.
+        #
+        #   profiler is stopped also when generation fails, so cProfile doesn't stay enabled
+        #
+        try:
+            with profiler.section("object index"):
+                self.initGenerationCaches()
+                itemsByClassName = self.getItemsByClassName()
 
-        genScript = ""
+            # Write script header, script is written into file section by section as it's generated.
 
-        genScript += "% OpenEMS FDTD Analysis Automation Script\n"
-        genScript += "%\n"
+            with ScriptWriter(fileName) as genScript:
+                profiler.scriptWriter = genScript
 
-        genScript += self.getInitScriptLines()
+                genScript += "% OpenEMS FDTD Analysis Automation Script\n"
+                genScript += "%\n"
 
-        genScript += "%% switches & options\n"
-        genScript += "postprocessing_only = " + ('1' if self.form.generateJustPreviewCheckbox.isChecked() else '0')+ ";\n"
-        genScript += "draw_3d_pattern = 0; % this may take a while...\n"
-        genScript += "use_pml = 0;         % use pml boundaries instead of mur\n"
-        genScript += "\n"
-        genScript += "currDir = strrep(pwd(), '\\', '\\\\');\n"
-        genScript += "display(currDir);\n"
-        genScript += "\n"
+                genScript += self.getInitScriptLines()
 
-        genScript += "% --no-simulation : dry run to view geometry, validate settings, no FDTD computations\n"
-        genScript += "% --debug-PEC     : generated PEC skeleton (use ParaView to inspect)\n"
-        openEMS_opt = []
-        if self.form.generateDebugPECCheckbox.isChecked():
-            openEMS_opt.append('--debug-PEC')
-        if self.form.generateJustPreviewCheckbox.isChecked():
-            openEMS_opt.append('--no-simulation')
-        genScript += "openEMS_opts = '" + " ".join(openEMS_opt) + "';\n"
-        genScript += "\n"
+                genScript += "%% switches & options\n"
+                genScript += "postprocessing_only = " + ('1' if self.form.generateJustPreviewCheckbox.isChecked() else '0')+ ";\n"
+                genScript += "draw_3d_pattern = 0; % this may take a while...\n"
+                genScript += "use_pml = 0;         % use pml boundaries instead of mur\n"
+                genScript += "\n"
+                genScript += "currDir = strrep(pwd(), '\\', '\\\\');\n"
+                genScript += "display(currDir);\n"
+                genScript += "\n"
 
-        # Write simulation settings.
+                genScript += "% --no-simulation : dry run to view geometry, validate settings, no FDTD computations\n"
+                genScript += "% --debug-PEC     : generated PEC skeleton (use ParaView to inspect)\n"
+                openEMS_opt = []
+                if self.form.generateDebugPECCheckbox.isChecked():
+                    openEMS_opt.append('--debug-PEC')
+                if self.form.generateJustPreviewCheckbox.isChecked():
+                    openEMS_opt.append('--no-simulation')
+                genScript += "openEMS_opts = '" + " ".join(openEMS_opt) + "';\n"
+                genScript += "\n"
 
-        genScript += "%% prepare simulation folder\n"
-        genScript += "Sim_Path = 'simulation_output';\n"
+                # Write simulation settings.
 
-        #genScript += "Sim_CSX = '" + os.path.splitext(os.path.basename(self.cadHelpers.getCurrDocumentFileName()))[0] + ".xml';\n"
-        genScript += "Sim_CSX = '" + nameBase + ".xml';\n"
+                genScript += "%% prepare simulation folder\n"
+                genScript += "Sim_Path = 'simulation_output';\n"
 
-        genScript += "[status, message, messageid] = rmdir( Sim_Path, 's' ); % clear previous directory\n"
-        genScript += "[status, message, messageid] = mkdir( Sim_Path ); % create empty simulation folder\n"
-        genScript += "\n"
+                #genScript += "Sim_CSX = '" + os.path.splitext(os.path.basename(self.cadHelpers.getCurrDocumentFileName()))[0] + ".xml';\n"
+                genScript += "Sim_CSX = '" + nameBase + ".xml';\n"
 
-        genScript += "%% setup FDTD parameter & excitation function\n"
-        genScript += "max_timesteps = " + str(self.form.simParamsMaxTimesteps.value()) + ";\n"
-        genScript += "min_decrement = " + str(self.form.simParamsMinDecrement.value()) + "; % 10*log10(min_decrement) dB  (i.e. 1E-5 means -50 dB)\n"
+                genScript += "[status, message, messageid] = rmdir( Sim_Path, 's' ); % clear previous directory\n"
+                genScript += "[status, message, messageid] = mkdir( Sim_Path ); % create empty simulation folder\n"
+                genScript += "\n"
 
-        if (self.getModelCoordsType() == "cylindrical"):
-            genScript += "FDTD = InitFDTD( 'NrTS', max_timesteps, 'EndCriteria', min_decrement, 'CoordSystem', 1);\n"
-        else:
-            genScript += "FDTD = InitFDTD( 'NrTS', max_timesteps, 'EndCriteria', min_decrement);\n"
+                genScript += "%% setup FDTD parameter & excitation function\n"
+                genScript += "max_timesteps = " + str(self.form.simParamsMaxTimesteps.value()) + ";\n"
+                genScript += "min_decrement = " + str(self.form.simParamsMinDecrement.value()) + "; % 10*log10(min_decrement) dB  (i.e. 1E-5 means -50 dB)\n"
 
-        genScript += "\n"
+                if (self.getModelCoordsType() == "cylindrical"):
+                    genScript += "FDTD = InitFDTD( 'NrTS', max_timesteps, 'EndCriteria', min_decrement, 'CoordSystem', 1);\n"
+                else:
+                    genScript += "FDTD = InitFDTD( 'NrTS', max_timesteps, 'EndCriteria', min_decrement);\n"
 
-        print("======================== REPORT BEGIN ========================\n")
+                genScript += "\n"
 
-        self.reportFreeCADItemSettings(itemsByClassName.get("FreeCADSettingsItem", None))
+                print("======================== REPORT BEGIN ========================\n")
 
-        # Write boundary conditions definitions.
-        genScript += self.getBoundaryConditionsScriptLines()
+                self.reportFreeCADItemSettings(itemsByClassName.get("FreeCADSettingsItem", None))
 
-        # Write coordinate system definitions.
-        genScript += self.getCoordinateSystemScriptLines()
+                # Write boundary conditions definitions.
+                with profiler.section("boundary conditions"):
+                    genScript += self.getBoundaryConditionsScriptLines()
 
-        # Write excitation definition.
-        genScript += self.getExcitationScriptLines()
+                # Write coordinate system definitions.
+                with profiler.section("coordinate system"):
+                    genScript += self.getCoordinateSystemScriptLines()
 
-        # Write material definitions.
-        genScript += self.getMaterialDefinitionsScriptLines(itemsByClassName.get("MaterialSettingsItem", None), outputDir)
+                # Write excitation definition.
+                with profiler.section("excitation"):
+                    genScript += self.getCachedSectionScriptLines("excitation", self.getSectionInputsKey("Excitation", self.getCategoryItems("Excitation")),
+                                                                  lambda: self.getExcitationScriptLines())
 
-        # Write grid definitions.
-        genScript += self.getOrderedGridDefinitionsScriptLines(itemsByClassName.get("GridSettingsItem", None))
+                # Write material definitions.
+                with profiler.section("materials", itemsByClassName.get("MaterialSettingsItem", None)):
+                    materialItems = itemsByClassName.get("MaterialSettingsItem", None)
+                    self.writeCachedSection(genScript, "materials", self.getSectionInputsKey("Material", materialItems, outputDir),
+                                            lambda scriptWriter: self.getMaterialDefinitionsScriptLines(materialItems, outputDir, scriptWriter=scriptWriter))
 
-        # Write port definitions, due microstrip ports it must be defined after grid.
-        genScript += self.getPortDefinitionsScriptLines(itemsByClassName.get("PortSettingsItem", None))
+                # Write grid definitions.
+                with profiler.section("grid", itemsByClassName.get("GridSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("grid", self.getGridSectionInputsKey(itemsByClassName.get("GridSettingsItem", None), itemsByClassName.get("MaterialSettingsItem", None), outputDir),
+                                                                  lambda: self.getOrderedGridDefinitionsScriptLines(itemsByClassName.get("GridSettingsItem", None), outputDir))
 
-        # Write lumped part definitions.
-        genScript += self.getLumpedPartDefinitionsScriptLines(itemsByClassName.get("LumpedPartSettingsItem", None))
+                # Write port definitions, due microstrip ports it must be defined after grid.
+                with profiler.section("ports", itemsByClassName.get("PortSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("ports", self.getSectionInputsKey("Port", itemsByClassName.get("PortSettingsItem", None)),
+                                                                  lambda: self.getPortDefinitionsScriptLines(itemsByClassName.get("PortSettingsItem", None)))
 
-        # Write probes definitions
-        genScript += self.getProbeDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None))
+                # Write lumped part definitions.
+                with profiler.section("lumped parts", itemsByClassName.get("LumpedPartSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("lumped parts", self.getSectionInputsKey("LumpedPart", itemsByClassName.get("LumpedPartSettingsItem", None)),
+                                                                  lambda: self.getLumpedPartDefinitionsScriptLines(itemsByClassName.get("LumpedPartSettingsItem", None)))
 
-        # Write NF2FF probe grid definitions.
-        genScript += self.getNF2FFDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None))
+                # Write probes definitions
+                with profiler.section("probes", itemsByClassName.get("ProbeSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("probes", self.getSectionInputsKey("Probe", itemsByClassName.get("ProbeSettingsItem", None)),
+                                                                  lambda: self.getProbeDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None)))
 
-        # Write scriptlines which removes gridline too close, must be enabled in GUI, it's checking checkbox inside
-        genScript += self.getMinimalGridlineSpacingScriptLines()
+                # Write NF2FF probe grid definitions.
+                with profiler.section("nf2ff boxes", itemsByClassName.get("ProbeSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("nf2ff boxes", self.getSectionInputsKey("Probe", itemsByClassName.get("ProbeSettingsItem", None)),
+                                                                  lambda: self.getNF2FFDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None)))
 
-        print("======================== REPORT END ========================\n")
+                # Write scriptlines which removes gridline too close, must be enabled in GUI, it's checking checkbox inside
+                with profiler.section("minimal gridline spacing"):
+                    genScript += self.getMinimalGridlineSpacingScriptLines()
 
-        # Finalize script.
+                print("======================== REPORT END ========================\n")
 
-        genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
-        genScript += "% RUN\n"
-        genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
+                # Finalize script.
 
-        genScript += "WriteOpenEMS( [Sim_Path '/' Sim_CSX], FDTD, CSX );\n"
-        genScript += "CSXGeomPlot( [Sim_Path '/' Sim_CSX] );\n"
-        genScript += "\n"
-        genScript += "if (postprocessing_only==0)\n"
-        genScript += "    %% run openEMS\n"
-        genScript += "    RunOpenEMS( Sim_Path, Sim_CSX, openEMS_opts );\n"
-        genScript += "end\n"
+                genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
+                genScript += "% RUN\n"
+                genScript += "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n"
 
-        f = open(fileName, "w", encoding='utf-8')
-        f.write(genScript)
-        f.close()
+                genScript += "WriteOpenEMS( [Sim_Path '/' Sim_CSX], FDTD, CSX );\n"
+                genScript += "CSXGeomPlot( [Sim_Path '/' Sim_CSX] );\n"
+                genScript += "\n"
+                genScript += "if (postprocessing_only==0)\n"
+                genScript += "    %% run openEMS\n"
+                genScript += "    RunOpenEMS( Sim_Path, Sim_CSX, openEMS_opts );\n"
+                genScript += "end\n"
+        except:
+            self.abortGenerationProfiler()
+            raise
 
         # Show message or update status bar to inform user that exporting has finished.
 
+        self.finishGenerationProfiler(fileName)
         self.guiHelpers.displayMessage('Simulation script written to: ' + fileName, forceModal=True)
         print('Simulation script written to: ' + fileName)
 
@@ -1664,6 +1742,7 @@ class OctaveScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write boundary conditions definitions.
@@ -1808,6 +1887,7 @@ DumpFF2VTK([Sim_Path '/3D_Pattern_Efield_normalized.vtk'],E_far_normalized,theta
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write coordinate system definitions.
@@ -1906,6 +1986,7 @@ dlmwrite(filename, s11_dB, '-append', 'delimiter', ';');
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write coordinate system definitions.
@@ -2016,6 +2097,7 @@ dlmwrite(filename, s11_dB, '-append', 'delimiter', ';');
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write coordinate system definitions.
@@ -13,6 +13,9 @@ from utilsOpenEMS.GuiHelpers.GuiHelpers import GuiHelpers
 from utilsOpenEMS.GuiHelpers.FactoryCadInterface import FactoryCadInterface
 
 from utilsOpenEMS.ScriptLinesGenerator.CommonScriptLinesGenerator import CommonScriptLinesGenerator
+from utilsOpenEMS.ScriptLinesGenerator.ScriptWriter import ScriptWriter
+from utilsOpenEMS.ScriptLinesGenerator.MeshEngine import MeshEngine
+from utilsOpenEMS.ScriptLinesGenerator.SimulationIR import IRPrimitive
 
 _log = logging.getLogger("freecad-openems")
 class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
@@ -23,6 +26,60 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
     def __init__(self, form, statusBar = None):
         super(PythonScriptLinesGenerator2, self).__init__(form, statusBar)
 
+    def getPointsScriptLines(self, points, sidecarName, outputDir=None):
+        """
+        Returns script lines which set variable points to given point list. Points are written as one list literal, if there is more of them
+        than pointsSidecarThreshold they are saved into .npy file which is loaded by generated script.
+        :param points: list of coordinates lists [[x...], [y...]] or [[x...], [y...], [z...]]
+        :param sidecarName: base name of sidecar file, suffix _points.npy is added
+        :param outputDir: directory where simulation script is generated
+        :return: script lines
+        """
+        if self.isPointsSidecarNeeded(points):
+            sidecarFileName = sidecarName + "_points.npy"
+            np.save(os.path.join(self.getSidecarDir(outputDir), sidecarFileName), np.array(points, dtype=np.float64))
+            self.registerSectionOutputFile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+            return f"points = np.load(os.path.join(currDir, '{sidecarFileName}'))\n"
+
+        genScript = "points = [\n"
+        for coords in points:
+            genScript += "    [" + ", ".join([str(c) for c in coords]) + "],\n"
+        genScript += "]\n"
+        return genScript
+
+    def getResolvedMeshLinesScriptLines(self, meshEngine, outputDir=None):
+        """
+        Returns script lines which set final grid lines resolved by MeshEngine. Axis with more lines than pointsSidecarThreshold is saved
+        into .npy file which is loaded by generated script.
+        :param meshEngine: MeshEngine with resolved grid lines
+        :param outputDir: directory where simulation script is generated
+        :return: script lines
+        """
+        genScript = ""
+        for rule in meshEngine.rules:
+            genScript += "## GRID - " + rule + "\n"
+
+        linesCount = meshEngine.getLinesCount()
+        genScript += f"# grid lines resolved by plugin mesh engine, lines count x: {linesCount['x']}, y: {linesCount['y']}, z: {linesCount['z']}\n"
+
+        for axis in MeshEngine.AXES:
+            lines = meshEngine.getLines(axis)
+            if self.isPointsSidecarNeeded([lines]):
+                sidecarFileName = f"mesh_{axis}_lines.npy"
+                np.save(os.path.join(self.getSidecarDir(outputDir), sidecarFileName), lines)
+                self.registerSectionOutputFile(os.path.join(self.getSidecarDir(outputDir), sidecarFileName))
+                genScript += f"mesh.{axis} = np.load(os.path.join(currDir, '{sidecarFileName}'))\n"
+            else:
+                genScript += f"mesh.{axis} = np.array([" + ", ".join([str(c) for c in lines]) + "])\n"
+        genScript += "\n"
+
+        genScript += "openEMS_grid.AddLine('x', mesh.x)\n"
+        genScript += "openEMS_grid.AddLine('y', mesh.y)\n"
+        genScript += "openEMS_grid.AddLine('z', mesh.z)\n"
+        genScript += "\n"
+
+        return genScript
+
     def getCoordinateSystemScriptLines(self):
         genScript = ""
 
@@ -53,8 +110,13 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         return genScript
 
-    def getMaterialDefinitionsScriptLines(self, items, outputDir=None, generateObjects=True):
-        genScript = ""
+    def getMaterialDefinitionsScriptLines(self, items, outputDir=None, generateObjects=True, scriptWriter=None):
+        """
+        Generates materials and geometry script lines, this is biggest section as it contains all polygon and curve points.
+        :param scriptWriter: if set, lines are written directly into it and empty string is returned
+        :return: script lines as string
+        """
+        genScript = ScriptWriter() if scriptWriter is None else scriptWriter
 
         genScript += "#######################################################################################################################################\n"
         genScript += "# MATERIALS AND GEOMETRY\n"
@@ -67,10 +129,11 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "\n"
 
         if not items:
-            return genScript
+            return genScript.getvalue() if scriptWriter is None else ""
 
         materialCounter = -1    #increment of this variable is at beginning f for loop so start at 0
         simObjectCounter = 0
+        stlExportJobs = []      #list of (partToExport, exportFileName), STL files are exported after all material lines are generated
 
         # now export material children, if it's object export as STL, if it's curve export as curve
         if (generateObjects):
@@ -133,18 +196,15 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                     print("\t" + childName)
 
                 # now export material children, if it's object export as STL, if it's curve export as curve
-                for k in range(item.childCount()):
+                for primitive in self.getSimulationIR().getPrimitives("Material", item.text(0)):
                     simObjectCounter += 1               #counter for objects
-                    childName = item.child(k).text(0)
+                    childName = primitive.label
 
                     #
-                    #	getting item priority
+                    #	item priority and reference to FreeCAD object are resolved in simulation model
                     #
-                    objModelPriorityItemName = item.parent().text(0) + ", " + item.text(0) + ", " + childName
-                    objModelPriority = self.getItemPriority(objModelPriorityItemName)
-
-                    # getting reference to FreeCAD object
-                    freeCadObj = [i for i in self.cadHelpers.getObjects() if (i.Label) == childName][0]
+                    objModelPriority = primitive.priority
+                    freeCadObj = primitive.obj
 
                     #
                     #   HERE IS OBJECT GENERATOR THERE ARE FEW SPECIAL CASES WHICH ARE HANDLED FIRST AND IF OBJECT IS NORMAL STRUCTURE AT THE END IS GENERATED AS .stl FILR:
@@ -159,7 +219,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                         #
                         genScript += "##conducting sheet object\n"
                         genScript += f"#object Label: {freeCadObj.Label}\n"
-                        bbCoords = freeCadObj.Shape.BoundBox
+                        bbCoords = primitive.getBoundBox()
 
                         if (freeCadObj.Name.find("Sketch") > -1):
                             #
@@ -168,13 +228,11 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
                             normDir, elevation, points = self.getSketchPointsForConductingSheet(freeCadObj)
                             if not normDir.startswith("ERROR"):
-                                genScript += "points = [[],[]]\n"
                                 if len(points[0])  == 0:
+                                    genScript += "points = [[],[]]\n"
                                     genScript += "## ERROR, no points for polygon for conducting sheet nothing generated"
                                 else:
-                                    for k in range(len(points[0])):
-                                        genScript += f"points[0].append({points[0][k]})\n"
-                                        genScript += f"points[1].append({points[1][k]})\n"
+                                    genScript += self.getPointsScriptLines(points, childName, outputDir)
                                 genScript += "\n"
 
                                 genScript += f"{materialPythonVariable}.AddPolygon(points, '{normDir}', {elevation}, priority={objModelPriority})\n"
@@ -192,12 +250,8 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
                             normDir, elevation, facesList = self.getFacePointsForConductingSheet(freeCadObj)
                             if normDir != "":
-                                for face in facesList:
-                                    genScript += f"points = [[],[]]\n"
-                                    for pointIndex in range(len(face[0])):
-                                        genScript += f"points[0].append({face[0][pointIndex]})\n"
-                                        genScript += f"points[1].append({face[1][pointIndex]})\n"
-                                        genScript += "\n"
+                                for faceIndex, face in enumerate(facesList):
+                                    genScript += self.getPointsScriptLines(face, f"{childName}_face{faceIndex}", outputDir)
                                     genScript += f"{materialPythonVariable}.AddPolygon(points, '{normDir}', {elevation}, priority={objModelPriority})\n"
                                     genScript += "\n"
                             else:
@@ -219,31 +273,24 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                             genScript += f"{materialPythonVariable}.AddBox([{_r(bbCoords.XMax)}, {_r(bbCoords.YMin)}, {_r(bbCoords.ZMin)}], [{_r(bbCoords.XMax)}, {_r(bbCoords.YMax)}, {_r(bbCoords.ZMax)}], priority={objModelPriority})\n"
                             genScript += "\n"
 
-                    elif (freeCadObj.Name.find("Discretized_Edge") > -1):
+                    elif (primitive.kind == IRPrimitive.KIND_CURVE):
                         #
                         #	Adding discretized curve
                         #
 
-                        curvePoints = freeCadObj.Points
-                        genScript += "points = [[],[],[]]\n"
-                        for k in range(0, len(curvePoints)):
-                            genScript += f"points[0].append({_r(curvePoints[k].x)})\n"
-                            genScript += f"points[1].append({_r(curvePoints[k].y)})\n"
-                            genScript += f"points[2].append({_r(curvePoints[k].z)})\n"
-                            genScript += "\n"
+                        points = [[_r(coord) for coord in axisPoints] for axisPoints in primitive.getCurvePoints()]
+                        genScript += self.getPointsScriptLines(points, childName, outputDir)
 
                         genScript += f"{materialPythonVariable}.AddCurve(points, priority={objModelPriority})\n"
                         genScript += "\n"
                         print("Curve added to generated script using its points.")
 
-                    elif (freeCadObj.Name.find("Sketch") > -1):
+                    elif (primitive.kind == IRPrimitive.KIND_SKETCH):
                         #
                         #	Adding JUST LINE SEGMENTS FROM SKETCH, THIS NEED TO BE IMPROVED TO PROPERLY GENERATE CURVE FROM SKETCH,
                         #	there can be circle, circle arc and maybe something else in sketch geometry
                         #
 
-                        genScript += "points = [[],[],[]]\n"
-
                         """
                         # WRONG SINCE StartPoint, EndPoint are defined in XY and not in absolute coordinates
                         for geometryObj in freeCadObj.Geometry:
@@ -259,23 +306,10 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                                 genScript += "\n"
                         """
 
-                        for v in freeCadObj.Shape.OrderedVertexes:
-                            genScript += f"points[0].append({_r(v.X)})\n"
-                            genScript += f"points[1].append({_r(v.Y)})\n"
-                            genScript += f"points[2].append({_r(v.Z)})\n"
-                            genScript += "\n"
-
-                        #   HERE IS MADE ASSUMPTION THAT:
-                        #       We suppose in sketch there are no mulitple closed sketches
-                        #
-                        #   Add first vertex into list
-                        #
-                        v = freeCadObj.Shape.OrderedVertexes[0]
-                        if len(freeCadObj.OpenVertices) == 0:
-                            genScript += f"points[0].append({_r(v.X)})\n"
-                            genScript += f"points[1].append({_r(v.Y)})\n"
-                            genScript += f"points[2].append({_r(v.Z)})\n"
-                            genScript += "\n"
+                        #   outline points, closed sketch has first vertex repeated at the end
+                        points = primitive.getSketchPoints()
+                        genScript += self.getPointsScriptLines(points, childName, outputDir)
+                        genScript += "\n"
 
                         genScript += f"{materialPythonVariable}.AddCurve(points, priority={objModelPriority})\n"
                         genScript += "\n"
@@ -287,7 +321,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                         #
 
                         currDir, baseName = self.getCurrDir()
-                        stlModelFileName = childName + "_gen_model.stl"
+                        stlModelFileName = primitive.stlFileName
 
                         #genScript += "CSX = ImportSTL( CSX, '" + currSetting.getName() + "'," + str(
                         #    objModelPriority) + ", [currDir '/" + stlModelFileName + "'],'Transform',{'Scale', fc_unit/unit} );\n"
@@ -305,7 +339,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                         # going through each concrete material items and generate their .stl files
 
                         currDir = os.path.dirname(self.cadHelpers.getCurrDocumentFileName())
-                        partToExport = [i for i in self.cadHelpers.getObjects() if (i.Label) == childName]
+                        partToExport = primitive.objects
 
                         #output directory path construction, if there is no parameter for output dir then output is in current freecad file dir
                         if (not outputDir is None):
@@ -313,14 +347,15 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                         else:
                             exportFileName = os.path.join(currDir, stlModelFileName)
 
-                        self.cadHelpers.exportSTL(partToExport, exportFileName)
-                        print("Material object exported as STL into: " + stlModelFileName)
+                        stlExportJobs.append((partToExport, exportFileName))
 
                 genScript += "\n"   #newline after each COMPLETE material category code generated
 
             genScript += "\n"
 
-        return genScript
+        self.exportSTLFiles(stlExportJobs)
+
+        return genScript.getvalue() if scriptWriter is None else ""
 
     def getCartesianOrCylindricalScriptLinesFromStartStop(self, bbCoords, startPointName=None, stopPointName=None):
         genScript = "";
@@ -436,18 +471,17 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
             print(f"#PORT - {currSetting.getName()} - {currSetting.getType()}")
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
                 genScript += "## PORT - " + currSetting.getName() + " - " + childName + "\n"
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 # print(freecadObjects)
                 for obj in freecadObjects:
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
                     print('\tFreeCAD lumped port BoundBox: ' + str(bbCoords))
 
                     #
@@ -639,19 +673,18 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
             print(f"#PROBE - {currSetting.getName()} - {currSetting.getType()}")
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
                 genScript += "# PROBE - " + currSetting.getName() + " - " + childName + "\n"
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 # print(freecadObjects)
                 for obj in freecadObjects:
                     print(f"\t{obj.Label}")
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
                     print(f"\t\t{bbCoords}")
 
                     #
@@ -805,18 +838,17 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += "# LUMPED PARTS " + currentSetting.getName() + "\n"
 
             # traverse through all children item for this particular lumped part settings
-            objs = self.cadHelpers.getObjects()
             objsExport = []
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
                 print("#LUMPED PART " + currentSetting.getType())
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
                 for obj in freecadObjects:
                     # obj = FreeCAD Object class
 
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
 
                     genScript += self.getCartesianOrCylindricalScriptLinesFromStartStop(bbCoords, "lumpedPartStart", "lumpedPartStop")
 
@@ -868,16 +900,15 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         for [item, currSetting] in items:
 
-            objs = self.cadHelpers.getObjects()
             for k in range(item.childCount()):
                 childName = item.child(k).text(0)
 
-                freecadObjects = [i for i in objs if (i.Label) == childName]
+                freecadObjects = self.getFreeCADObjectsByLabel(childName)
 
                 # print(freecadObjects)
                 for obj in freecadObjects:
                     # BOUNDING BOX
-                    bbCoords = obj.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(obj).getBoundBox()
 
                     if (currSetting.getType() == 'nf2ff box'):
                         nf2ff_gridlines['x'].append("{0:g}".format(_r(sf * bbCoords.XMin)))
@@ -913,7 +944,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         return genScript
 
-    def getOrderedGridDefinitionsScriptLines(self, items):
+    def getOrderedGridDefinitionsScriptLines(self, items, outputDir=None):
         genScript = ""
         meshPrioritiesCount = self.form.meshPriorityTreeView.topLevelItemCount()
 
@@ -929,12 +960,19 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "#######################################################################################################################################\n"
         genScript += "\n"
 
+        #
+        #   grid lines resolved in plugin are written as final arrays, otherwise script resolves them when it runs
+        #
+        meshEngine = self.resolveMeshLines(items) if self.meshEngineEnabled else None
+        if meshEngine is not None:
+            genScript += self.getResolvedMeshLinesScriptLines(meshEngine, outputDir)
+            return genScript
+
         # Create lists and dict to be able to resolve ordered list of (grid settings instance <-> FreeCAD object) associations.
         # In its current form, this implies user-defined grid lines have to be associated with the simulation volume.
         _assoc = lambda idx: list(map(str.strip, self.form.meshPriorityTreeView.topLevelItem(idx).text(0).split(',')))
         orderedAssociations = [_assoc(k) for k in reversed(range(meshPrioritiesCount))]
         gridSettingsNodeNames = [gridSettingsNode.text(0) for [gridSettingsNode, gridSettingsInst] in items]
-        fcObjects = {obj.Label: obj for obj in self.cadHelpers.getObjects()}
 
         for gridSettingsNodeName in gridSettingsNodeNames:
             print("Grid type : " + gridSettingsNodeName)
@@ -954,11 +992,29 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             #Grid category object from GUI
             gridCategoryObj = items[itemListIdx][0]
 
+            #
+            #   Auto Mesh lines are computed in plugin from material objects edges, they are written into script as they are
+            #
+            if (gridSettingsInst.getType() == "Auto Mesh"):
+                genScript += "## GRID - " + gridSettingsInst.getName() + " - AUTO MESH GROUP (" + gridSettingsInst.getType() + ")\n"
+                autoMeshLines = self.getAutoMeshLines(gridCategoryObj, gridSettingsInst)
+                if autoMeshLines is None:
+                    genScript += "## WARNING auto mesh max resolution is taken from excitation which doesn't define it, no lines generated\n"
+                    print(f"Auto Mesh - max resolution for {gridName} is not known, no lines generated.")
+                else:
+                    for axis, (fixedLines, lines) in autoMeshLines.items():
+                        if gridSettingsInst.topPriorityLines:
+                            genScript += "mesh.{0} = np.delete(mesh.{0}, np.argwhere((mesh.{0} >= {1:g}) & (mesh.{0} <= {2:g})))\n".format(axis, _r(fixedLines[0]), _r(fixedLines[-1]))
+                        genScript += "mesh.{0} = np.concatenate((mesh.{0}, np.array([{1}])))\n".format(axis, ", ".join(["{0:g}".format(_r(line)) for line in lines]))
+                genScript += "\n"
+                continue
+
             #
             #   Fixed Distance, Fixed Count mesh boundaries coords obtain
             #
             if (gridSettingsInst.getType() in ['Fixed Distance', 'Fixed Count', 'User Defined']):
-                fcObject = fcObjects.get(FreeCADObjectName, None)
+                fcObjectsWithLabel = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+                fcObject = fcObjectsWithLabel[-1] if len(fcObjectsWithLabel) > 0 else None
                 if (not fcObject):
                     print("Failed to resolve '{}'.".format(FreeCADObjectName))
                     continue
@@ -968,7 +1024,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                 if (not "Shape" in dir(fcObject)):
                     continue
 
-                bbCoords = fcObject.Shape.BoundBox
+                bbCoords = self.getShapeSnapshot(fcObject).getBoundBox()
 
                 deltaX = 0
                 deltaY = 0
@@ -1009,7 +1065,8 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                 for k in range(gridCategoryObj.childCount()):
                     FreeCADObjectName = gridCategoryObj.child(k).text(0)
 
-                    fcObject = fcObjects.get(FreeCADObjectName, None)
+                    fcObjectsWithLabel = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+                    fcObject = fcObjectsWithLabel[-1] if len(fcObjectsWithLabel) > 0 else None
                     if (not fcObject):
                         print("Smooth Mesh - Failed to resolve '{}'.".format(FreeCADObjectName))
                         continue
@@ -1019,7 +1076,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
                     if (not "Shape" in dir(fcObject)):
                         continue
 
-                    bbCoords = fcObject.Shape.BoundBox
+                    bbCoords = self.getShapeSnapshot(fcObject).getBoundBox()
 
                     deltaX = 0
                     deltaY = 0
@@ -1212,7 +1269,6 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
         _assoc = lambda idx: list(map(str.strip, self.form.meshPriorityTreeView.topLevelItem(idx).text(0).split(',')))
         orderedAssociations = [_assoc(k) for k in reversed(range(meshPrioritiesCount))]
         gridSettingsNodeNames = [gridSettingsNode.text(0) for [gridSettingsNode, gridSettingsInst] in items]
-        fcObjects = {obj.Label: obj for obj in self.cadHelpers.getObjects()}
 
         for gridSettingsNodeName in gridSettingsNodeNames:
             print("Grid type : " + gridSettingsNodeName)
@@ -1227,7 +1283,8 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             itemListIdx = gridSettingsNodeNames.index(gridName)
             gridSettingsInst = items[itemListIdx][1]
 
-            fcObject = fcObjects.get(FreeCADObjectName, None)
+            fcObjectsWithLabel = self.getFreeCADObjectsByLabel(FreeCADObjectName)
+            fcObject = fcObjectsWithLabel[-1] if len(fcObjectsWithLabel) > 0 else None
             if (not fcObject):
                 print("Failed to resolve '{}'.".format(FreeCADObjectName))
                 continue
@@ -1411,7 +1468,6 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
         # maximum grid resolution is generated into script but NOT USED IN OCTAVE SCRIPT, instead is also calculated here into python variable and used in bounding box correction
 
         units = currSetting.getUnitsAsNumber(currSetting.units)
-        c_ = 3e8
 
         print("#name: " + currSetting.getName())
         print("#type: " + source_type)
@@ -1452,7 +1508,6 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += _write_sinusoid_values(f0, units)
             if not definitionsOnly:
                 genScript += _write_sinusoid_function()
-            self.maxGridResolution_m = c_ / (f0 * units * 20)
 
         elif (source_type == 'gaussian'):
             f0 = currSetting.gaussian['f0']
@@ -1460,7 +1515,6 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += _write_gaussian_values(f0=f0, fc=fc, units=units)
             if not definitionsOnly:
                 genScript += _write_gaussian_function()
-            self.maxGridResolution_m = c_ / (f0 * units * 20)
 
         elif (source_type == 'custom'):
             f0 = currSetting.custom['f0']
@@ -1468,25 +1522,27 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += _write_custom_values(f0=f0, units=units)
             if not definitionsOnly:
                 genScript += _write_custom_function(f0=f0, units=units, function=functionStr)
-            self.maxGridResolution_m = 0
 
         elif (source_type == "step"):
             fm = currSetting.step['fm']
             genScript += _write_step_values(fm=fm, units=units)
             if not definitionsOnly:
                 genScript += _write_step_function()
-            self.maxGridResolution_m = c_ / (fm * units * 20)
 
         elif (source_type == "dirac"):
             fm = currSetting.dirac['fm']
             genScript += _write_dirac_values(fm=fm, units=units)
             if not definitionsOnly:
                 genScript += _write_dirac_function()
-            self.maxGridResolution_m = c_ / (fm * units * 20)
 
         else:
             self.guiHelpers.displayMessage(f"Error: Excitation {source_type} is unknown")
 
+        #
+        #   grids resolved in plugin use same maximal resolution as max_res in generated script
+        #
+        self.maxGridResolution_m = self.getExcitationMaxGridResolution_m(currSetting)
+
         _log.debug(genScript)
         genScript += "\n"
         return genScript
@@ -1532,25 +1588,24 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
             genScript += 'openEMS_grid.ClearLines("y")\n'
             genScript += 'openEMS_grid.ClearLines("z")\n'
             genScript += '\n'
-            genScript += 'for k in range(len(mesh.x)-1):\n'
-            genScript += '\tif (not np.isinf(mesh.x[k]) and abs(mesh.x[k+1]-mesh.x[k]) <= ' + str(minSpacingX) + '):\n'
-            genScript += '\t\tprint("Removnig line at x: " + str(mesh.x[k+1]))\n'
-            genScript += '\t\tmesh.x[k+1] = np.inf\n'
-            genScript += '\n'
-            genScript += 'for k in range(len(mesh.y)-1):\n'
-            genScript += '\tif (not np.isinf(mesh.y[k]) and abs(mesh.y[k+1]-mesh.y[k]) <= ' + str(minSpacingY) + '):\n'
-            genScript += '\t\tprint("Removnig line at y: " + str(mesh.y[k+1]))\n'
-            genScript += '\t\tmesh.y[k+1] = np.inf\n'
+            genScript += '#\n'
+            genScript += '# Lines closer than minSpacing are removed at once, in each run of close lines every second one is removed (as previous line\n'
+            genScript += '# is kept), this repeats until no lines are too close.\n'
+            genScript += '#\n'
+            genScript += 'def removeCloseLines(lines, minSpacing):\n'
+            genScript += '\tlines = np.unique(lines)\n'
+            genScript += '\tclose = np.diff(lines) <= minSpacing\n'
+            genScript += '\twhile close.any():\n'
+            genScript += '\t\tk = np.arange(len(close))\n'
+            genScript += '\t\trunStart = np.maximum.accumulate(np.where(close & ~np.concatenate(([False], close[:-1])), k, 0))\n'
+            genScript += '\t\tlines = lines[~np.concatenate(([False], close & ((k - runStart) % 2 == 0)))]\n'
+            genScript += '\t\tclose = np.diff(lines) <= minSpacing\n'
+            genScript += '\treturn lines\n'
             genScript += '\n'
-            genScript += 'for k in range(len(mesh.z)-1):\n'
-            genScript += '\tif (not np.isinf(mesh.z[k]) and abs(mesh.z[k+1]-mesh.z[k]) <= ' + str(minSpacingZ) + '):\n'
-            genScript += '\t\tprint("Removnig line at z: " + str(mesh.z[k+1]))\n'
-            genScript += '\t\tmesh.z[k+1] = np.inf\n'
-            genScript += '\n'
-
-            genScript += 'mesh.x = mesh.x[~np.isinf(mesh.x)]\n'
-            genScript += 'mesh.y = mesh.y[~np.isinf(mesh.y)]\n'
-            genScript += 'mesh.z = mesh.z[~np.isinf(mesh.z)]\n'
+            genScript += f'for axisName, minSpacing in [("x", {minSpacingX}), ("y", {minSpacingY}), ("z", {minSpacingZ})]:\n'
+            genScript += '\tlinesCount = len(getattr(mesh, axisName))\n'
+            genScript += '\tsetattr(mesh, axisName, removeCloseLines(getattr(mesh, axisName), minSpacing))\n'
+            genScript += '\tprint(f"Minimal gridline spacing: removed {linesCount - len(getattr(mesh, axisName))} lines in {axisName}")\n'
             genScript += '\n'
 
             genScript += "openEMS_grid.AddLine('x', mesh.x)\n"
@@ -1592,122 +1647,149 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
 
         # List categories and items.
 
-        itemsByClassName = self.getItemsByClassName()
-
-        # Write script header.
-
-        genScript = ""
-
-        genScript += "# OpenEMS FDTD Analysis Automation Script\n"
-        genScript += "#\n"
-
-        genScript += self.getInitScriptLines()
-
-        genScript += "## switches & options\n"
-        genScript += "draw_3d_pattern = 0  # this may take a while...\n"
-        genScript += "use_pml = 0          # use pml boundaries instead of mur\n"
-        genScript += "\n"
-        genScript += "currDir = os.getcwd()\n"
-        genScript += "print(currDir)\n"
-        genScript += "\n"
-
-        genScript += "# setup_only : dry run to view geometry, validate settings, no FDTD computations\n"
-        genScript += "# debug_pec  : generated PEC skeleton (use ParaView to inspect)\n"
-        genScript += f"debug_pec = {'True' if self.form.generateDebugPECCheckbox.isChecked() else 'False'}\n"
-        genScript += f"setup_only = {'True' if self.form.generateJustPreviewCheckbox.isChecked() else 'False'}\n"
-        genScript += "\n"
-
-        # Write simulation settings.
-
-        genScript += "## prepare simulation folder\n"
-        genScript += "Sim_Path = os.path.join(currDir, 'simulation_output')\n"
-        genScript += "Sim_CSX = '" + os.path.splitext(os.path.basename(self.cadHelpers.getCurrDocumentFileName()))[0] + ".xml'\n"
-
-        genScript += "if os.path.exists(Sim_Path):\n"
-        genScript += "\tshutil.rmtree(Sim_Path)   # clear previous directory\n"
-        genScript += "\tos.mkdir(Sim_Path)    # create empty simulation folder\n"
-        genScript += "\n"
-
-        genScript += "## setup FDTD parameter & excitation function\n"
-        genScript += "max_timesteps = " + str(self.form.simParamsMaxTimesteps.value()) + "\n"
-        genScript += "min_decrement = " + str(self.form.simParamsMinDecrement.value()) + " # 10*log10(min_decrement) dB  (i.e. 1E-5 means -50 dB)\n"
-
-        if (self.getModelCoordsType() == "cylindrical"):
-            genScript += "CSX = CSXCAD.ContinuousStructure(CoordSystem=1)\n"
-            genScript += "FDTD = openEMS(NrTS=max_timesteps, EndCriteria=min_decrement, CoordSystem=1)\n"
-        else:
-            genScript += "CSX = CSXCAD.ContinuousStructure()\n"
-            genScript += "FDTD = openEMS(NrTS=max_timesteps, EndCriteria=min_decrement)\n"
-
-        genScript += "FDTD.SetCSX(CSX)\n"
-        genScript += "\n"
-
-        print("======================== REPORT BEGIN ========================\n")
-
-        self.reportFreeCADItemSettings(itemsByClassName.get("FreeCADSettingsItem", None))
-
-        # Write boundary conditions definitions.
-        genScript += self.getBoundaryConditionsScriptLines()
-
-        # Write coordinate system definitions.
-        genScript += self.getCoordinateSystemScriptLines()
+        profiler = self.startGenerationProfiler()
 
-        # Write excitation definition.
-        genScript += self.getExcitationScriptLines()
+        #
+        #   profiler is stopped also when generation fails, so cProfile doesn't stay enabled
+        #
+        try:
+            with profiler.section("object index"):
+                self.initGenerationCaches()
+                itemsByClassName = self.getItemsByClassName()
 
-        # Write material definitions.
-        genScript += self.getMaterialDefinitionsScriptLines(itemsByClassName.get("MaterialSettingsItem", None), outputDir)
+            # Write _OpenEMS.py script file to current directory.
+            currDir, nameBase = self.getCurrDir()
 
-        # Write grid definitions.
-        genScript += self.getOrderedGridDefinitionsScriptLines(itemsByClassName.get("GridSettingsItem", None))
+            if (not outputDir is None):
+                fileName = f"{outputDir}/{nameBase}_openEMS.py"
+            else:
+                fileName = f"{currDir}/{nameBase}_openEMS.py"
 
-        # Write port definitions.
-        genScript += self.getPortDefinitionsScriptLines(itemsByClassName.get("PortSettingsItem", None))
+            # Write script header, script is written into file section by section as it's generated.
 
-        # Write lumped part definitions.
-        genScript += self.getLumpedPartDefinitionsScriptLines(itemsByClassName.get("LumpedPartSettingsItem", None))
+            with ScriptWriter(fileName) as genScript:
+                profiler.scriptWriter = genScript
 
-        # Write probes definitions
-        genScript += self.getProbeDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None))
+                genScript += "# OpenEMS FDTD Analysis Automation Script\n"
+                genScript += "#\n"
 
-        # Write NF2FF probe grid definitions.
-        genScript += self.getNF2FFDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None))
+                genScript += self.getInitScriptLines()
 
-        # Write scriptlines which removes gridline too close, must be enabled in GUI, it's checking checkbox inside
-        genScript += self.getMinimalGridlineSpacingScriptLines()
+                genScript += "## switches & options\n"
+                genScript += "draw_3d_pattern = 0  # this may take a while...\n"
+                genScript += "use_pml = 0          # use pml boundaries instead of mur\n"
+                genScript += "\n"
+                genScript += "currDir = os.getcwd()\n"
+                genScript += "print(currDir)\n"
+                genScript += "\n"
 
-        print("======================== REPORT END ========================\n")
+                genScript += "# setup_only : dry run to view geometry, validate settings, no FDTD computations\n"
+                genScript += "# debug_pec  : generated PEC skeleton (use ParaView to inspect)\n"
+                genScript += f"debug_pec = {'True' if self.form.generateDebugPECCheckbox.isChecked() else 'False'}\n"
+                genScript += f"setup_only = {'True' if self.form.generateJustPreviewCheckbox.isChecked() else 'False'}\n"
+                genScript += "\n"
 
-        # Finalize script.
+                # Write simulation settings.
 
-        genScript += "#######################################################################################################################################\n"
-        genScript += "# RUN\n"
-        genScript += "#######################################################################################################################################\n"
-
-        genScript += "### Run the simulation\n"
-        genScript += "CSX_file = os.path.join(Sim_Path, Sim_CSX)\n"
-        genScript += "if not os.path.exists(Sim_Path):\n"
-        genScript += "\tos.mkdir(Sim_Path)\n"
-        genScript += "CSX.Write2XML(CSX_file)\n"
-        genScript += "from CSXCAD import AppCSXCAD_BIN\n"
-        genScript += "os.system(AppCSXCAD_BIN + ' \"{}\"'.format(CSX_file))\n"
-        genScript += "\n"
-        genScript += "FDTD.Run(Sim_Path, verbose=3, cleanup=True, setup_only=setup_only, debug_pec=debug_pec)\n"
+                genScript += "## prepare simulation folder\n"
+                genScript += "Sim_Path = os.path.join(currDir, 'simulation_output')\n"
+                genScript += "Sim_CSX = '" + os.path.splitext(os.path.basename(self.cadHelpers.getCurrDocumentFileName()))[0] + ".xml'\n"
 
-        # Write _OpenEMS.py script file to current directory.
-        currDir, nameBase = self.getCurrDir()
+                genScript += "if os.path.exists(Sim_Path):\n"
+                genScript += "\tshutil.rmtree(Sim_Path)   # clear previous directory\n"
+                genScript += "\tos.mkdir(Sim_Path)    # create empty simulation folder\n"
+                genScript += "\n"
 
-        if (not outputDir is None):
-            fileName = f"{outputDir}/{nameBase}_openEMS.py"
-        else:
-            fileName = f"{currDir}/{nameBase}_openEMS.py"
+                genScript += "## setup FDTD parameter & excitation function\n"
+                genScript += "max_timesteps = " + str(self.form.simParamsMaxTimesteps.value()) + "\n"
+                genScript += "min_decrement = " + str(self.form.simParamsMinDecrement.value()) + " # 10*log10(min_decrement) dB  (i.e. 1E-5 means -50 dB)\n"
 
-        f = open(fileName, "w", encoding='utf-8')
-        f.write(genScript)
-        f.close()
+                if (self.getModelCoordsType() == "cylindrical"):
+                    genScript += "CSX = CSXCAD.ContinuousStructure(CoordSystem=1)\n"
+                    genScript += "FDTD = openEMS(NrTS=max_timesteps, EndCriteria=min_decrement, CoordSystem=1)\n"
+                else:
+                    genScript += "CSX = CSXCAD.ContinuousStructure()\n"
+                    genScript += "FDTD = openEMS(NrTS=max_timesteps, EndCriteria=min_decrement)\n"
+
+                genScript += "FDTD.SetCSX(CSX)\n"
+                genScript += "\n"
+
+                print("======================== REPORT BEGIN ========================\n")
+
+                self.reportFreeCADItemSettings(itemsByClassName.get("FreeCADSettingsItem", None))
+
+                # Write boundary conditions definitions.
+                with profiler.section("boundary conditions"):
+                    genScript += self.getBoundaryConditionsScriptLines()
+
+                # Write coordinate system definitions.
+                with profiler.section("coordinate system"):
+                    genScript += self.getCoordinateSystemScriptLines()
+
+                # Write excitation definition.
+                with profiler.section("excitation"):
+                    genScript += self.getCachedSectionScriptLines("excitation", self.getSectionInputsKey("Excitation", self.getCategoryItems("Excitation")),
+                                                                  lambda: self.getExcitationScriptLines())
+
+                # Write material definitions.
+                with profiler.section("materials", itemsByClassName.get("MaterialSettingsItem", None)):
+                    materialItems = itemsByClassName.get("MaterialSettingsItem", None)
+                    self.writeCachedSection(genScript, "materials", self.getSectionInputsKey("Material", materialItems, outputDir),
+                                            lambda scriptWriter: self.getMaterialDefinitionsScriptLines(materialItems, outputDir, scriptWriter=scriptWriter))
+
+                # Write grid definitions.
+                with profiler.section("grid", itemsByClassName.get("GridSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("grid", self.getGridSectionInputsKey(itemsByClassName.get("GridSettingsItem", None), itemsByClassName.get("MaterialSettingsItem", None), outputDir),
+                                                                  lambda: self.getOrderedGridDefinitionsScriptLines(itemsByClassName.get("GridSettingsItem", None), outputDir))
+
+                # Write port definitions.
+                with profiler.section("ports", itemsByClassName.get("PortSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("ports", self.getSectionInputsKey("Port", itemsByClassName.get("PortSettingsItem", None)),
+                                                                  lambda: self.getPortDefinitionsScriptLines(itemsByClassName.get("PortSettingsItem", None)))
+
+                # Write lumped part definitions.
+                with profiler.section("lumped parts", itemsByClassName.get("LumpedPartSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("lumped parts", self.getSectionInputsKey("LumpedPart", itemsByClassName.get("LumpedPartSettingsItem", None)),
+                                                                  lambda: self.getLumpedPartDefinitionsScriptLines(itemsByClassName.get("LumpedPartSettingsItem", None)))
+
+                # Write probes definitions
+                with profiler.section("probes", itemsByClassName.get("ProbeSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("probes", self.getSectionInputsKey("Probe", itemsByClassName.get("ProbeSettingsItem", None)),
+                                                                  lambda: self.getProbeDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None)))
+
+                # Write NF2FF probe grid definitions.
+                with profiler.section("nf2ff boxes", itemsByClassName.get("ProbeSettingsItem", None)):
+                    genScript += self.getCachedSectionScriptLines("nf2ff boxes", self.getSectionInputsKey("Probe", itemsByClassName.get("ProbeSettingsItem", None)),
+                                                                  lambda: self.getNF2FFDefinitionsScriptLines(itemsByClassName.get("ProbeSettingsItem", None)))
+
+                # Write scriptlines which removes gridline too close, must be enabled in GUI, it's checking checkbox inside
+                with profiler.section("minimal gridline spacing"):
+                    genScript += self.getMinimalGridlineSpacingScriptLines()
+
+                print("======================== REPORT END ========================\n")
+
+                # Finalize script.
+
+                genScript += "#######################################################################################################################################\n"
+                genScript += "# RUN\n"
+                genScript += "#######################################################################################################################################\n"
+
+                genScript += "### Run the simulation\n"
+                genScript += "CSX_file = os.path.join(Sim_Path, Sim_CSX)\n"
+                genScript += "if not os.path.exists(Sim_Path):\n"
+                genScript += "\tos.mkdir(Sim_Path)\n"
+                genScript += "CSX.Write2XML(CSX_file)\n"
+                genScript += "from CSXCAD import AppCSXCAD_BIN\n"
+                genScript += "os.system(AppCSXCAD_BIN + ' \"{}\"'.format(CSX_file))\n"
+                genScript += "\n"
+                genScript += "FDTD.Run(Sim_Path, verbose=3, cleanup=True, setup_only=setup_only, debug_pec=debug_pec)\n"
+        except:
+            self.abortGenerationProfiler()
+            raise
 
         # Show message or update status bar to inform user that exporting has finished.
 
+        self.finishGenerationProfiler(fileName)
         self.guiHelpers.displayMessage('Simulation script written to: ' + fileName, forceModal=True)
         print('Simulation script written to: ' + fileName)
 
@@ -1743,6 +1825,7 @@ class PythonScriptLinesGenerator2(CommonScriptLinesGenerator):
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write boundary conditions definitions.
@@ -1950,6 +2033,7 @@ generatorFunc_DumpFF2VTK(E_far_normalized, nf2ff.theta, nf2ff.phi, os.path.join(
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write coordinate system definitions.
@@ -2061,6 +2145,7 @@ with open(filename, 'w', newline='') as csvfile:
         genScript += "\n"
 
         # List categories and items.
+        self.initGenerationCaches()
         itemsByClassName = self.getItemsByClassName()
 
         # Write coordinate system definitions.
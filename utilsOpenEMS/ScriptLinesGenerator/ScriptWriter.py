@@ -0,0 +1,118 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+
+class ScriptWriter:
+    """
+    Output buffer for generated simulation scripts. Script sections are appended by write() or by += operator same way as they were
+    appended to string before, text is collected in list of chunks and if writer has output file it's flushed into it each time
+    buffered text exceeds bufferSize, so generated script is never held in memory as one big string.
+
+    If fileName is None writer just collects text in memory and getvalue() returns it.
+
+    Text written between startCapture() and stopCapture() is also kept aside so it can be stored in section cache while it's streamed
+    into file, capture is dropped when it exceeds given length so big sections are not held in memory.
+
+    File is written under temporary name and renamed to fileName when close() is called, so when generation fails previous
+    script stays untouched.
+    """
+
+    def __init__(self, fileName=None, bufferSize=1024*1024, encoding='utf-8'):
+        self.fileName = fileName
+        self.bufferSize = bufferSize
+        self.chunks = []
+        self.bufferedLength = 0
+        self.writtenLength = 0
+
+        self.capturing = False
+        self.capturedChunks = None
+        self.capturedLength = 0
+        self.captureMaxLength = None
+
+        self.f = None
+        if not fileName is None:
+            self.tmpFileName = fileName + ".part"
+            self.f = open(self.tmpFileName, "w", encoding=encoding)
+
+    def write(self, text):
+        if not text:
+            return
+        self.chunks.append(text)
+        self.bufferedLength += len(text)
+        self.writtenLength += len(text)
+        if self.capturing and self.capturedChunks is not None:
+            self.capturedChunks.append(text)
+            self.capturedLength += len(text)
+            if self.captureMaxLength is not None and self.capturedLength > self.captureMaxLength:
+                self.capturedChunks = None
+        if not self.f is None and self.bufferedLength >= self.bufferSize:
+            self.flush()
+
+    def __iadd__(self, text):
+        self.write(text)
+        return self
+
+    def flush(self):
+        if self.f is None:
+            return
+        self.f.write("".join(self.chunks))
+        self.chunks = []
+        self.bufferedLength = 0
+
+    def getvalue(self):
+        """
+        Returns text which was not flushed yet into file, for in memory writer it's everything written into it.
+        """
+        return "".join(self.chunks)
+
+    def startCapture(self, maxLength=None):
+        """
+        Start keeping copy of written text.
+        :param maxLength: if more characters are written copy is dropped and stopCapture() returns None
+        """
+        self.capturing = True
+        self.capturedChunks = []
+        self.capturedLength = 0
+        self.captureMaxLength = maxLength
+
+    def stopCapture(self):
+        """
+        :return: text written since startCapture(), None if it exceeded maxLength
+        """
+        capturedText = "".join(self.capturedChunks) if self.capturedChunks is not None else None
+        self.capturing = False
+        self.capturedChunks = None
+        self.capturedLength = 0
+        return capturedText
+
+    def close(self):
+        """
+        Flush remaining text and move file to its final name.
+        """
+        if self.f is None:
+            return
+        self.flush()
+        self.f.close()
+        self.f = None
+        os.replace(self.tmpFileName, self.fileName)
+
+    def discard(self):
+        """
+        Close file and remove it without touching file with final name, used when script generation failed.
+        """
+        if self.f is None:
+            return
+        self.f.close()
+        self.f = None
+        os.remove(self.tmpFileName)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.close()
+        else:
+            self.discard()
+        return False
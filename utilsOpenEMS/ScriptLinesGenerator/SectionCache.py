@@ -0,0 +1,60 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+import copy
+
+class SectionCacheEntry:
+    def __init__(self, inputsKey, scriptLines, stateAfter, outputFiles):
+        self.inputsKey = inputsKey
+        self.scriptLines = scriptLines
+        self.stateAfter = stateAfter
+        self.outputFiles = outputFiles
+
+class SectionCache:
+    """
+    Script lines of generated sections kept between generation runs. Each section is stored with hash of its inputs, when section is
+    generated again with same inputs its cached lines are spliced into script instead of generating them.
+
+    Sections also fill generator members used by later sections (ie. port indexes used by postprocessing, max grid resolution used
+    by grid), these are stored with section and restored on cache hit. Their values before section are part of section inputs.
+    """
+
+    #
+    #   generator members which sections write and later sections read
+    #
+    STATE_ATTRIBUTES = ["internalPortIndexNamesList", "internalMaterialIndexNamesList", "internalNF2FFIndexNamesList", "maxGridResolution_m"]
+
+    def __init__(self):
+        self.entries = {}
+        self.hitsCount = 0
+        self.missesCount = 0
+
+    def getState(self, generator):
+        return {attributeName: copy.deepcopy(getattr(generator, attributeName, None)) for attributeName in SectionCache.STATE_ATTRIBUTES}
+
+    def getStateKey(self, generator):
+        return repr(sorted([(attributeName, sorted(value.items()) if isinstance(value, dict) else value) for attributeName, value in self.getState(generator).items()]))
+
+    def restoreState(self, generator, state):
+        for attributeName, value in state.items():
+            if value is None and not hasattr(generator, attributeName):
+                continue
+            setattr(generator, attributeName, copy.deepcopy(value))
+
+    def lookup(self, sectionName, inputsKey):
+        """
+        :return: SectionCacheEntry if section was generated with same inputs and all files it wrote still exist, otherwise None
+        """
+        entry = self.entries.get(sectionName, None)
+        if entry is None or entry.inputsKey != inputsKey or not all([os.path.exists(fileName) for fileName in entry.outputFiles]):
+            self.missesCount += 1
+            return None
+        self.hitsCount += 1
+        return entry
+
+    def store(self, sectionName, inputsKey, scriptLines, stateAfter, outputFiles):
+        self.entries[sectionName] = SectionCacheEntry(inputsKey, scriptLines, stateAfter, outputFiles)
+
+    def clear(self):
+        self.entries = {}
@@ -0,0 +1,90 @@
+#   author: Lubomir Jagos
+#
+#
+from collections import namedtuple
+
+#
+#   Vertex coordinates copied from CAD shape, has same X, Y, Z members as FreeCAD vertex so it can be used in place of it.
+#
+SnapshotVertex = namedtuple("SnapshotVertex", ["X", "Y", "Z"])
+
+class SnapshotBoundBox:
+    """
+    Bounding box copied from CAD shape, has same XMin, ..., ZMax members as FreeCAD BoundBox.
+    Each call of ShapeSnapshot.getBoundBox() returns new instance so caller can modify it (ie. ports are overwriting it by port start/stop).
+    """
+
+    def __init__(self, XMin, YMin, ZMin, XMax, YMax, ZMax):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.ZMin = ZMin
+        self.XMax = XMax
+        self.YMax = YMax
+        self.ZMax = ZMax
+
+    @property
+    def XLength(self):
+        return self.XMax - self.XMin
+
+    @property
+    def YLength(self):
+        return self.YMax - self.YMin
+
+    @property
+    def ZLength(self):
+        return self.ZMax - self.ZMin
+
+    def __repr__(self):
+        return f"BoundBox ({self.XMin}, {self.YMin}, {self.ZMin}, {self.XMax}, {self.YMax}, {self.ZMax})"
+
+class ShapeSnapshot:
+    """
+    Shape data of one CAD object captured once during generation run. FreeCAD returns new copy of shape for each obj.Shape access and
+    recomputes vertices and faces lists each time, snapshot reads them just at first use and then serves cached values to all script sections.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.shape = None
+        self.boundBoxCoords = None
+        self.orderedVertexes = None
+        self.facesVertexes = None
+        self.brepString = None
+
+    def getShape(self):
+        if self.shape is None:
+            self.shape = self.obj.Shape
+        return self.shape
+
+    def getBoundBox(self):
+        """
+        :return: SnapshotBoundBox, new instance for each call
+        """
+        if self.boundBoxCoords is None:
+            bb = self.getShape().BoundBox
+            self.boundBoxCoords = (bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax)
+        return SnapshotBoundBox(*self.boundBoxCoords)
+
+    def getOrderedVertexes(self):
+        """
+        :return: list of SnapshotVertex in same order as shape OrderedVertexes
+        """
+        if self.orderedVertexes is None:
+            self.orderedVertexes = [SnapshotVertex(v.X, v.Y, v.Z) for v in self.getShape().OrderedVertexes]
+        return self.orderedVertexes
+
+    def getBrepString(self, cadHelpers):
+        """
+        :return: shape with global placement serialized as BREP by CAD interface, same string is used for STL fingerprint and STL export
+        """
+        if self.brepString is None:
+            self.brepString = cadHelpers.getObjectBrepString(self.obj)
+        return self.brepString
+
+    def getFacesVertexes(self):
+        """
+        :return: list of faces, each face is list of SnapshotVertex
+        """
+        if self.facesVertexes is None:
+            self.facesVertexes = [[SnapshotVertex(v.X, v.Y, v.Z) for v in face.Vertexes] for face in self.getShape().Faces]
+        return self.facesVertexes
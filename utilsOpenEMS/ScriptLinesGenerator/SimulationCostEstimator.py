@@ -0,0 +1,122 @@
+#   author: Lubomir Jagos
+#
+#
+import os
+import math
+import numpy as np
+
+class SimulationCostEstimator:
+    """
+    Rough estimate of openEMS simulation cost from final grid lines and excitation, computed before simulation is started:
+    number of cells, smallest cell per axis, CFL timestep, number of timesteps, memory and runtime.
+
+    Real number of timesteps isn't known before simulation, openEMS runs until field energy drops by end criteria (min_decrement)
+    or maximal timesteps (NrTS) is reached. Estimate gives range: lower bound is duration of excitation pulse, as energy can't decay before
+    excitation ends, upper bound is maximal timesteps.
+
+    Runtime is computed from cells updates per second, default value is for multithreaded openEMS engine on common desktop CPU,
+    it can be calibrated by environment variable OPENEMS_CELLS_PER_SECOND (measured as number of cells * timesteps / run time).
+    """
+
+    C0 = 299792458.0
+
+    #
+    #   openEMS engine keeps E and H field (6 floats) and 4 operator coefficients for each of them (12 floats) per cell in single precision,
+    #   extensions and dumps need more, this is lower bound
+    #
+    BYTES_PER_CELL = 18 * 4
+
+    DEFAULT_CELLS_PER_SECOND = 100e6
+
+    def __init__(self, cellsPerSecond=None):
+        if cellsPerSecond is None:
+            cellsPerSecond = float(os.environ.get("OPENEMS_CELLS_PER_SECOND", SimulationCostEstimator.DEFAULT_CELLS_PER_SECOND))
+        self.cellsPerSecond = cellsPerSecond
+
+    @staticmethod
+    def getExcitationLength_s(excitationSettings):
+        """
+        Length of excitation signal as openEMS generates it, for gaussian pulse it's 2*9/(2*pi*fc), dirac and step last one timestep.
+        :param excitationSettings: ExcitationSettingsItem
+        :return: length in seconds, None if excitation is running whole simulation (sinusodial, custom) or unknown
+        """
+        if excitationSettings is None:
+            return None
+
+        units = excitationSettings.getUnitsAsNumber(excitationSettings.units)
+        if excitationSettings.getType() == 'gaussian':
+            fc = float(excitationSettings.gaussian['fc']) * units
+            if fc <= 0:
+                return None
+            return 2.0 * 9.0 / (2.0 * math.pi * fc)
+        elif excitationSettings.getType() in ['dirac', 'step']:
+            return 0.0
+        return None
+
+    def estimate(self, meshLines, unit_m, coordsType, maxTimesteps, excitationSettings=None):
+        """
+        :param meshLines: dict {'x': lines, 'y': lines, 'z': lines} with final grid lines in drawing units
+        :param unit_m: drawing unit in meters
+        :param coordsType: rectangular or cylindrical, for cylindrical y lines are angles in radians
+        :param maxTimesteps: maximal number of timesteps set in GUI
+        :param excitationSettings: ExcitationSettingsItem
+        :return: dict with estimated values, None if some axis has less than 2 lines
+        """
+        lines = {axis: np.unique(np.asarray(meshLines[axis], dtype=np.float64)) for axis in ("x", "y", "z")}
+        if any([len(axisLines) < 2 for axisLines in lines.values()]):
+            return None
+
+        cellsCount = {axis: len(axisLines) - 1 for axis, axisLines in lines.items()}
+        smallestCell = {axis: float(np.min(np.diff(axisLines))) * unit_m for axis, axisLines in lines.items()}
+
+        #
+        #   in cylindrical coordinates y is angle, smallest cell in this direction is arc on smallest nonzero radius
+        #
+        if coordsType == "cylindrical":
+            radiuses = lines["x"][lines["x"] > 0]
+            smallestCell["y"] = float(radiuses[0] * np.min(np.diff(lines["y"]))) * unit_m if len(radiuses) > 0 else smallestCell["x"]
+
+        totalCells = cellsCount["x"] * cellsCount["y"] * cellsCount["z"]
+        timestep = 1.0 / (SimulationCostEstimator.C0 * math.sqrt(sum([1.0 / smallestCell[axis] ** 2 for axis in ("x", "y", "z")])))
+
+        excitationLength = SimulationCostEstimator.getExcitationLength_s(excitationSettings)
+        excitationDurationTimesteps = maxTimesteps if excitationLength is None else min(maxTimesteps, int(math.floor(excitationLength / timestep)) + 1)
+
+        return {
+            "cellsCount": cellsCount,
+            "totalCells": totalCells,
+            "smallestCell_m": smallestCell,
+            "timestep_s": timestep,
+            "maxTimesteps": maxTimesteps,
+            "excitationDurationTimesteps": excitationDurationTimesteps,
+            "memory_B": totalCells * SimulationCostEstimator.BYTES_PER_CELL,
+            "minRuntime_s": totalCells * excitationDurationTimesteps / self.cellsPerSecond,
+            "maxRuntime_s": totalCells * maxTimesteps / self.cellsPerSecond,
+            "cellsPerSecond": self.cellsPerSecond,
+        }
+
+    @staticmethod
+    def formatDuration(seconds):
+        if seconds < 60:
+            return f"{seconds:.1f} s"
+        if seconds < 3600:
+            return f"{seconds / 60:.1f} min"
+        return f"{seconds / 3600:.1f} h"
+
+    @staticmethod
+    def getReport(estimate):
+        """
+        :return: estimate as text shown to user
+        """
+        cellsCount = estimate["cellsCount"]
+        smallestCell = estimate["smallestCell_m"]
+        report = ""
+        report += f"Cells: {cellsCount['x']} x {cellsCount['y']} x {cellsCount['z']} = {estimate['totalCells']:,}\n"
+        report += f"Smallest cell: x {smallestCell['x']*1e3:.4g} mm, y {smallestCell['y']*1e3:.4g} mm, z {smallestCell['z']*1e3:.4g} mm\n"
+        report += f"CFL timestep: {estimate['timestep_s']:.4g} s\n"
+        report += f"Timesteps: {estimate['excitationDurationTimesteps']:,} to {estimate['maxTimesteps']:,}\n"
+        report += "    (lower bound is excitation pulse duration, simulation runs until energy drops by end criteria, at most max. timesteps)\n"
+        report += f"Memory: {estimate['memory_B'] / 1024**2:.1f} MB (field and operator arrays)\n"
+        report += f"Runtime: {SimulationCostEstimator.formatDuration(estimate['minRuntime_s'])} to {SimulationCostEstimator.formatDuration(estimate['maxRuntime_s'])}"
+        report += f" (at {estimate['cellsPerSecond']/1e6:.0f} MC/s)\n"
+        return report
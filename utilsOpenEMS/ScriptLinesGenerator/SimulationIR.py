@@ -0,0 +1,117 @@
+#   author: Lubomir Jagos
+#
+#
+from utilsOpenEMS.GlobalFunctions.GlobalFunctions import _r
+
+class IRPrimitive:
+    """
+    CAD object assigned to settings item, with its priority and geometry data which script generators need. Geometry is read from shape
+    snapshot just once and then shared by all language backends.
+    """
+
+    KIND_SOLID = "solid"
+    KIND_SKETCH = "sketch"
+    KIND_CURVE = "curve"
+
+    def __init__(self, label, objects, priority, snapshot):
+        self.label = label
+        self.objects = objects
+        self.obj = objects[0] if len(objects) > 0 else None
+        self.priority = priority
+        self.snapshot = snapshot
+
+        if self.obj is None:
+            self.kind = None
+        elif self.obj.Name.find("Discretized_Edge") > -1:
+            self.kind = IRPrimitive.KIND_CURVE
+        elif self.obj.Name.find("Sketch") > -1:
+            self.kind = IRPrimitive.KIND_SKETCH
+        else:
+            self.kind = IRPrimitive.KIND_SOLID
+
+        self.stlFileName = label + "_gen_model.stl"
+
+        self.curvePoints = None
+        self.sketchPoints = None
+
+    def getBoundBox(self):
+        """
+        :return: new bounding box instance for each call, caller can modify it
+        """
+        return self.snapshot.getBoundBox()
+
+    def getCurvePoints(self):
+        """
+        :return: discretized edge points as [[x...], [y...], [z...]] in FreeCAD units, not rounded
+        """
+        if self.curvePoints is None:
+            curvePoints = self.obj.Points
+            self.curvePoints = [[p.x for p in curvePoints], [p.y for p in curvePoints], [p.z for p in curvePoints]]
+        return self.curvePoints
+
+    def getSketchPoints(self):
+        """
+        :return: sketch outline points as [[x...], [y...], [z...]] rounded, closed sketch has first point repeated at the end
+        """
+        if self.sketchPoints is None:
+            #
+            #   HERE IS MADE ASSUMPTION THAT:
+            #       We suppose in sketch there are no mulitple closed sketches
+            #
+            sketchVertexes = list(self.snapshot.getOrderedVertexes())
+            if len(self.obj.OpenVertices) == 0:
+                sketchVertexes.append(sketchVertexes[0])
+            self.sketchPoints = [[_r(v.X) for v in sketchVertexes], [_r(v.Y) for v in sketchVertexes], [_r(v.Z) for v in sketchVertexes]]
+        return self.sketchPoints
+
+class IRSettingsGroup:
+    """
+    Settings item (material, port, grid, ...) with primitives assigned to it in object assignment tree.
+    """
+
+    def __init__(self, category, settings, primitives):
+        self.category = category
+        self.settings = settings
+        self.primitives = primitives
+
+class SimulationIR:
+    """
+    Simulation model built once from GUI settings and CAD document and rendered by Python and Octave script generators.
+
+    It owns lookup tables and shape snapshots of one generation run so when both scripts are generated in one pass, objects are indexed,
+    priorities resolved and shape geometry read just once. Material primitives with their curve and sketch points are kept here,
+    STL files are exported just by first generator which needs them.
+    """
+
+    #
+    #   categories in object assignment tree and settings item classes which belongs to them
+    #
+    CATEGORIES = {
+        "Material": "MaterialSettingsItem",
+        "Port": "PortSettingsItem",
+        "Probe": "ProbeSettingsItem",
+        "LumpedPart": "LumpedPartSettingsItem",
+        "Grid": "GridSettingsItem",
+    }
+
+    def __init__(self, freeCadObjectsByLabel, freeCadObjectsByName, itemPriorityMap, shapeSnapshots):
+        self.freeCadObjectsByLabel = freeCadObjectsByLabel
+        self.freeCadObjectsByName = freeCadObjectsByName
+        self.itemPriorityMap = itemPriorityMap
+        self.shapeSnapshots = shapeSnapshots
+
+        self.groups = {category: {} for category in SimulationIR.CATEGORIES.keys()}
+        self.exportedSTLFiles = set()
+
+    def addGroup(self, category, name, settings, primitives):
+        self.groups[category][name] = IRSettingsGroup(category, settings, primitives)
+
+    def getGroup(self, category, name):
+        return self.groups[category].get(name, None)
+
+    def getPrimitives(self, category, name):
+        """
+        :return: list of IRPrimitive assigned to settings item, empty list if there is no such item
+        """
+        group = self.getGroup(category, name)
+        return [] if group is None else group.primitives
@@ -6,6 +6,9 @@ import numpy as np
 #	Fixed Count    - fixed number per axes
 #	Fixed Distance - gridlines have fixed distance between them
 #	User Defined   - user has to provide coordinates where lines should be
+#	Smooth Mesh    - boundaries of all assigned objects are smoothed together up to max resolution
+#	Auto Mesh      - assigned objects define meshed domain, lines are derived from edges of all material objects inside it,
+#	                 metal edges use 1/3-2/3 rule, space between them is smoothed up to max resolution
 #
 class GridSettingsItem(SettingsItem):
 
@@ -40,7 +43,7 @@ class GridSettingsItem(SettingsItem):
 
     def __init__(self, name="", type="", gridOffset=None, fixedCount=None, fixedDistance=None,
                  userDefined=None, units="mm", unitsAngle="deg", xenabled=False, yenabled=False, zenabled=False,
-                 smoothMeshDefault=None,
+                 smoothMeshDefault=None, autoMeshDefault=None,
                  coordsType='rectangular'):
 
         self.name = name
@@ -55,6 +58,7 @@ class GridSettingsItem(SettingsItem):
         self.fixedCount = {'x': 0, 'y': 0, 'z': 0} if fixedCount is None else fixedCount
         self.fixedDistance = {'x': 0, 'y': 0, 'z': 0} if fixedDistance is None else fixedDistance
         self.smoothMesh = {'xMaxRes': 0, 'yMaxRes': 0, 'zMaxRes': 0} if smoothMeshDefault is None else smoothMeshDefault
+        self.autoMesh = {'xMaxRes': 0, 'yMaxRes': 0, 'zMaxRes': 0, 'edgeResDivider': 4} if autoMeshDefault is None else autoMeshDefault
         self.userDefined = {'data': ""} if userDefined is None else userDefined
 
         self.generateLinesInside = False
@@ -73,6 +77,15 @@ class GridSettingsItem(SettingsItem):
             return self.userDefined['data']
         if (self.type == "Smooth Mesh"):
             return self.smoothMesh
+        if (self.type == "Auto Mesh"):
+            return self.autoMesh
+
+    def isGroupType(self):
+        """
+        :return: True if grid lines are computed from all assigned objects together (Smooth Mesh, Auto Mesh), such grid has one entry
+                 in mesh priority list for whole group
+        """
+        return self.type in ["Smooth Mesh", "Auto Mesh"]
 
     def getUnitAsScriptLine(self):
         return str(self.getUnitsAsNumber(self.units))